@@ -0,0 +1,36 @@
+"""Add follow-up decision cache
+
+Revision ID: 3f1c2a7d9b40
+Revises: 9e6b857a43d2
+Create Date: 2026-10-18 09:12:41.118305
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a7d9b40"
+down_revision: str | None = "9e6b857a43d2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "followupdecision",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("followup", sa.String(), nullable=True),
+        sa.Column("latency_ms", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("followupdecision")
@@ -0,0 +1,29 @@
+"""Add user token version
+
+Revision ID: 4f1c9e7a2b30
+Revises: 8d3f6b2a9c17
+Create Date: 2026-10-18 19:05:31.204417
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f1c9e7a2b30"
+down_revision: str | None = "8d3f6b2a9c17"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("user", sa.Column("token_version", sa.Integer(), server_default=sa.text("0"), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("user", "token_version")
@@ -0,0 +1,41 @@
+"""Add answer analysis
+
+Revision ID: 8d3f6b2a9c17
+Revises: e2a97c4d1b58
+Create Date: 2026-10-18 17:42:08.553019
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d3f6b2a9c17"
+down_revision: str | None = "e2a97c4d1b58"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "answeranalysis",
+        sa.Column("answer_id", sa.UUID(), nullable=False),
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("sentiment", sa.String(length=16), nullable=False),
+        sa.Column("themes", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["answer_id"], ["surveyanswer.id"]),
+        sa.PrimaryKeyConstraint("answer_id"),
+    )
+    op.create_index("ix_answeranalysis_key", "answeranalysis", ["key"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_answeranalysis_key", table_name="answeranalysis")
+    op.drop_table("answeranalysis")
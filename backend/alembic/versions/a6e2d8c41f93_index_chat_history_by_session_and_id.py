@@ -0,0 +1,53 @@
+"""Index chat history by session and id
+
+Revision ID: a6e2d8c41f93
+Revises: 4f1c9e7a2b30
+Create Date: 2026-10-18 21:12:47.630128
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a6e2d8c41f93"
+down_revision: str | None = "4f1c9e7a2b30"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The new index also serves session_id lookups, so it replaces the old one
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_history_session_id_id",
+            "chat_history",
+            ["session_id", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_chat_history_session_id", table_name="chat_history", postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_history_session_id",
+            "chat_history",
+            ["session_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_chat_history_session_id_id",
+            table_name="chat_history",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
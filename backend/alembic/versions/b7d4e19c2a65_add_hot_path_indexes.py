@@ -0,0 +1,60 @@
+"""Add hot path indexes
+
+Revision ID: b7d4e19c2a65
+Revises: 3f1c2a7d9b40
+Create Date: 2026-10-18 14:37:05.260913
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d4e19c2a65"
+down_revision: str | None = "3f1c2a7d9b40"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (index name, table, columns, partial index predicate)
+INDEXES: list[tuple[str, str, list[str], str | None]] = [
+    ("ix_event_org_id", "event", ["org_id"], None),
+    ("ix_organization_name", "organization", ["name"], None),
+    ("ix_orgalloweddomain_org_id", "orgalloweddomain", ["org_id"], None),
+    ("ix_orgalloweddomain_domain", "orgalloweddomain", ["domain"], None),
+    ("ix_survey_org_id", "survey", ["org_id"], None),
+    ("ix_surveyinstance_org_id", "surveyinstance", ["org_id"], None),
+    ("ix_surveyinstance_event_id", "surveyinstance", ["event_id"], None),
+    ("ix_surveyinstance_survey_id", "surveyinstance", ["survey_id"], None),
+    ("ix_link_org_id", "link", ["org_id"], None),
+    ("ix_link_survey_instance_id", "link", ["survey_instance_id"], None),
+    ("ix_surveyresponse_instance_started", "surveyresponse", ["survey_instance_id", "started_at", "id"], None),
+    ("ix_surveyresponse_survey_started", "surveyresponse", ["survey_id", "started_at", "id"], None),
+    ("ix_surveyresponse_unfinished", "surveyresponse", ["started_at"], "finished_at IS NULL"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY does not block writes but cannot run inside a transaction.
+    # If a build fails it leaves an INVALID index behind; drop it and rerun the upgrade.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,30 @@
+"""Add compiled flow to surveys
+
+Revision ID: c5a81f3e7d02
+Revises: b7d4e19c2a65
+Create Date: 2026-10-18 14:27:05.514382
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5a81f3e7d02"
+down_revision: str | None = "b7d4e19c2a65"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("survey", sa.Column("compiled_flow", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("survey", "compiled_flow")
@@ -0,0 +1,70 @@
+"""Add question rollups
+
+Revision ID: e2a97c4d1b58
+Revises: c5a81f3e7d02
+Create Date: 2026-10-18 16:05:12.408217
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a97c4d1b58"
+down_revision: str | None = "c5a81f3e7d02"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Indexes the rollup refresher uses to find recent activity: (index name, table, columns, partial index predicate)
+INDEXES: list[tuple[str, str, list[str], str | None]] = [
+    ("ix_surveyanswer_created_at", "surveyanswer", ["created_at"], None),
+    ("ix_surveyresponse_finished", "surveyresponse", ["finished_at"], "finished_at IS NOT NULL"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "questionrollup",
+        sa.Column("survey_instance_id", sa.UUID(), nullable=False),
+        sa.Column("question_idx", sa.Integer(), nullable=False),
+        sa.Column("reached", sa.Integer(), nullable=False),
+        sa.Column("answered", sa.Integer(), nullable=False),
+        sa.Column("scored", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Float(), nullable=False),
+        sa.Column("distribution", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("followups", sa.Integer(), nullable=False),
+        sa.Column("followups_answered", sa.Integer(), nullable=False),
+        sa.Column("refreshed_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["survey_instance_id"], ["surveyinstance.id"]),
+        sa.PrimaryKeyConstraint("survey_instance_id", "question_idx"),
+    )
+    op.create_index("ix_questionrollup_refreshed_at", "questionrollup", ["refreshed_at"], unique=False)
+
+    # CREATE INDEX CONCURRENTLY does not block writes but cannot run inside a transaction.
+    # If a build fails it leaves an INVALID index behind; drop it and rerun the upgrade.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    op.drop_index("ix_questionrollup_refreshed_at", table_name="questionrollup")
+    op.drop_table("questionrollup")
@@ -4,6 +4,7 @@ from app.routers import (
     auth,
     chat,
     events,
+    metrics,
     org_domains,
     organizations,
     public,
@@ -26,3 +27,4 @@ api_router.include_router(survey_flow.router, prefix="/survey-flow", tags=["surv
 api_router.include_router(public.router, prefix="/l", tags=["public"])
 api_router.include_router(stats.router, tags=["stats"])
 api_router.include_router(chat.router, prefix="/chat", tags=["Chat"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
@@ -0,0 +1,74 @@
+from typing import Any, NamedTuple, cast
+from uuid import UUID
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.organization import Organization
+from app.models.user import User
+
+
+class CachedUser(NamedTuple):
+    """Column values of an authenticated user and of their organization."""
+
+    user: dict[str, Any]
+    organization: dict[str, Any]
+
+    @property
+    def token_version(self) -> int:
+        return cast(int, self.user["token_version"])
+
+    @property
+    def org_id(self) -> UUID:
+        return cast(UUID, self.user["org_id"])
+
+
+_users: LRUCache[UUID, CachedUser] = LRUCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def _columns(obj: Any) -> dict[str, Any]:
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(type(obj)).column_attrs}
+
+
+def get(user_id: UUID) -> CachedUser | None:
+    return _users.get(user_id)
+
+
+def store(user: User) -> CachedUser:
+    """Remember a user loaded together with their organization."""
+    cached = CachedUser(user=_columns(user), organization=_columns(user.organization))
+    _users.set(user.id, cached)
+    return cached
+
+
+async def attach(db: AsyncSession, cached: CachedUser) -> User:
+    """
+    Rebuild the cached user and organization as persistent objects of ``db`` without querying.
+
+    Every request gets its own instances, so changes a handler makes never leak into
+    the cache or another request; ``current_user.organization`` is already loaded.
+    """
+    user = User(**cached.user)
+    user.organization = Organization(**cached.organization)
+    make_transient_to_detached(user.organization)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+def invalidate_user(user_id: UUID) -> None:
+    _users.pop(user_id)
+
+
+def invalidate_organization(org_id: UUID) -> int:
+    """Drop the users of an organization so the next request sees its new values."""
+    return _users.pop_where(lambda _, cached: cached.org_id == org_id)
+
+
+def get_auth_cache_stats() -> dict[str, Any]:
+    return {"entries": len(_users), "hits": _users.hits, "misses": _users.misses, "hit_rate": _users.hit_rate}
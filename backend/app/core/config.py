@@ -1,3 +1,6 @@
+from typing import Self
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -12,10 +15,27 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "reventa"
     DATABASE_URL: str | None = None
+    DATABASE_READ_REPLICA_URL: str | None = None  # Read-only routes use it when set
+
+    # Database engine settings
+    DB_ECHO: bool = False  # Log every SQL statement; development only
+    DB_POOL_SIZE: int = 10  # Connections kept open per worker
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under load, closed when returned
+    DB_MAX_CONNECTIONS: int | None = None  # Budget across all workers; caps pool size plus overflow
+    WEB_CONCURRENCY: int = 1  # Uvicorn worker processes sharing DB_MAX_CONNECTIONS
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this; -1 never
+    DB_POOL_PRE_PING: bool = True  # Check connections on checkout so dropped ones are replaced
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements cached per connection
+    DB_PGBOUNCER: bool = False  # Transaction-pooling PgBouncer: no cached or named prepared statements
 
     # Security settings
     SECRET_KEY: str = "your-secret-key"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # Cost factor; older hashes are rehashed on the next login
+    PASSWORD_HASH_MAX_WORKERS: int = 2  # Threads hashing passwords per worker; further logins queue
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000  # Authenticated users (with their organization) kept per worker
+    AUTH_CACHE_TTL_SECONDS: float = 60.0  # Bounds how long changes made on another worker go unnoticed
 
     # CORS settings
     BACKEND_CORS_ORIGINS: list[str] = ["http://localhost:3000"]  # Default to local frontend
@@ -24,7 +44,101 @@ class Settings(BaseSettings):
     # Chat settings
     OPENAI_API_KEY: str = "sk-your-api-key"
     CHAT_MODEL: str = "gpt-4o-mini"
-    CHAT_MEMORY_TYPE: str = "buffer"  # "buffer" or "postgres"
+    CHAT_MEMORY_TYPE: str = "buffer"  # "buffer", "postgres" or "summary" (postgres, older turns summarized)
+    CHAT_HISTORY_WINDOW: int = 20  # Most recent messages of a session loaded into the "postgres" memory
+    CHAT_SUMMARY_KEEP_TURNS: int = 4  # Latest turns the "summary" memory sends verbatim; older ones are summarized
+    CHAT_SUMMARY_MAX_TOKENS: int = 2000  # Prompt budget for the summary plus the verbatim turns
+    CHAT_SUMMARY_TIMEOUT_SECONDS: float = 30.0  # Budget for one summarizing LLM call
+
+    # LLM provider settings
+    LLM_PROVIDER: str = "openai"  # "openai", "stub" (local, no network) or "replay" (calls from LLM_RECORDING_PATH)
+    LLM_RECORDING_PATH: str = ""  # JSONL of calls; the openai provider appends to it when set, "replay" reads it
+    LLM_STUB_LATENCY_MS: float = 800.0  # Median latency of stub calls
+    LLM_STUB_LATENCY_SIGMA: float = 0.5  # Spread of the log-normal stub latency; 0 makes it constant
+    LLM_STUB_ERROR_RATE: float = 0.0  # Share of stub calls that fail
+    LLM_STUB_TIMEOUT_RATE: float = 0.0  # Share of stub calls that hang for LLM_STUB_HANG_SECONDS and time out
+    LLM_STUB_HANG_SECONDS: float = 30.0
+    LLM_STUB_FOLLOWUP_RATE: float = 0.25  # Share of answers the stub asks a follow-up question for
+    LLM_STUB_SEED: int = 0  # The same seed and prompts give the same replies, latencies and failures
+
+    # Follow-up question settings
+    FOLLOWUP_MAX_CONCURRENCY: int = 32  # Concurrent LLM calls per worker
+    FOLLOWUP_TIMEOUT_SECONDS: float = 5.0  # Budget for queueing plus the LLM call
+    FOLLOWUP_DEADLINE_MS: int = 0  # Advance without the follow-up after this long; 0 waits for it
+    FOLLOWUP_LATE_MODE: str = "offer"  # "offer" late follow-ups via the API or "drop" them
+    LLM_MAX_CONNECTIONS: int = 64
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 32
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    FOLLOWUP_CACHE_MAX_ENTRIES: int = 10_000
+    FOLLOWUP_CACHE_TTL_SECONDS: float = 86_400.0
+    FOLLOWUP_CACHE_SHARED: bool = False  # Also share decisions between workers through Postgres
+
+    # Public submission settings
+    SUBMIT_DURABILITY: str = "sync"  # "sync" commits before acknowledging, "write_behind" once queued
+    SUBMIT_FLUSH_INTERVAL_MS: int = 50  # Longest a queued submission waits for its batch
+    SUBMIT_FLUSH_MAX_ROWS: int = 500  # Submissions written per batch
+    SUBMIT_QUEUE_MAX_SIZE: int = 10_000  # Beyond this, submissions are committed synchronously
+    SUBMIT_RETRY_BACKOFF_MS: int = 100  # First wait before rewriting a batch the database could not take; doubles
+    SUBMIT_RETRY_MAX_SECONDS: float = 300.0  # Longest a batch is retried while the database is unreachable
+
+    # Bulk ingestion settings
+    BULK_INGEST_MAX_RESPONSES: int = 1000  # Responses accepted per bulk request
+    BULK_INSERT_ROWS: int = 1000  # Rows per multi-row INSERT; asyncpg caps a statement at 32,767 parameters
+
+    # Link minting settings
+    LINK_MINT_MAX_LINKS: int = 10_000  # Links per bulk minting request
+    QR_RENDER_PROCESSES: int = 2  # Processes rendering QR codes per worker; 0 renders in a thread instead
+    QR_RENDER_BATCH: int = 100  # QR codes per task handed to a render process
+    # Link URLs end in random UUIDs, so any mask reads well; None scores all 8 (~5x slower)
+    QR_MASK_PATTERN: int | None = 0
+    QR_CACHE_MAX_ENTRIES: int = 4096  # Rendered images kept per worker, keyed by URL and render options
+
+    # Survey flow state settings
+    FLOW_STATE_BACKEND: str = "postgres"  # "postgres" (no store), "memory" (single worker only) or "redis"
+    FLOW_STATE_REDIS_URL: str = "redis://localhost:6379/0"
+    FLOW_STATE_TTL_SECONDS: int = 86_400  # Abandoned responses drop out of the store after this
+    FLOW_STATE_MAX_ENTRIES: int = 100_000  # Memory backend only
+    FLOW_STATE_WRITE_MODE: str = "async"  # "async" writes each answer in the background, "completion" at the end
+    FLOW_STATE_RETRY_BACKOFF_MS: int = 100  # First wait before retrying a background write; doubles
+    FLOW_STATE_RETRY_MAX_SECONDS: float = 300.0  # Longest a background write is retried while the database is down
+
+    # Survey schema cache settings
+    SURVEY_CACHE_MAX_ENTRIES: int = 1024
+    SURVEY_CACHE_TTL_SECONDS: float = 30.0  # Drafts only; published surveys never expire
+
+    # Public form cache settings
+    PUBLIC_FORM_CACHE_MAX_ENTRIES: int = 4096
+    PUBLIC_FORM_CACHE_TTL_SECONDS: float = 300.0  # Published surveys; drafts use SURVEY_CACHE_TTL_SECONDS
+    PUBLIC_FORM_MAX_AGE_SECONDS: int = 60  # Cache-Control max-age for browsers and CDNs
+
+    # Live event stats settings
+    LIVE_STATS_PUSH_INTERVAL_MS: int = 1000  # Updates are coalesced and pushed to dashboards at most this often
+    LIVE_STATS_RESYNC_SECONDS: float = 60.0  # Counters are reloaded from the database this often
+
+    # Question rollup settings
+    QUESTION_ROLLUP_REFRESH_SECONDS: float = 30.0  # 0 disables the background refresh
+    QUESTION_ROLLUP_LAG_SECONDS: float = 60.0  # Overlap between refreshes; must exceed the longest write transaction
+    QUESTION_ROLLUP_BATCH_INSTANCES: int = 100  # Survey instances recomputed per statement
+
+    # Free-text answer analysis settings
+    ANALYSIS_BATCH_SIZE: int = 25  # Answers of one question sent per LLM request
+    ANALYSIS_MAX_CONCURRENCY: int = 4  # Concurrent analysis requests per worker
+    ANALYSIS_TIMEOUT_SECONDS: float = 60.0  # Budget for one batch request, not counting its wait for a slot
+    ANALYSIS_MAX_ANSWERS_PER_RUN: int = 5000  # The rest are picked up by the next run
+    ANALYSIS_MAX_THEMES: int = 3  # Themes kept per answer
+    ANALYSIS_SUMMARY_TOP_THEMES: int = 10  # Themes listed per question in the summary
+
+    # Export settings
+    EXPORT_YIELD_PER: int = 2000  # Rows fetched per server-side cursor round trip
+    EXPORT_CHUNK_BYTES: int = 64 * 1024  # Size of the chunks sent to the client
+    EXPORT_BATCH_ROWS: int = 10_000  # Responses per Arrow record batch / Parquet row group
+
+    @model_validator(mode="after")
+    def check_flow_state(self) -> Self:
+        # Memory entries are evicted, and lost on restart, along with the answers buffered in them
+        if self.FLOW_STATE_WRITE_MODE == "completion" and self.FLOW_STATE_BACKEND != "redis":
+            raise ValueError('FLOW_STATE_WRITE_MODE="completion" needs FLOW_STATE_BACKEND="redis"')
+        return self
 
     @property
     def sqlalchemy_database_uri(self) -> str:
@@ -32,6 +146,15 @@ class Settings(BaseSettings):
             return self.DATABASE_URL
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
 
+    @property
+    def db_pool_limits(self) -> tuple[int, int]:
+        """Per-worker ``(pool_size, max_overflow)``, kept within ``DB_MAX_CONNECTIONS`` when set."""
+        if self.DB_MAX_CONNECTIONS is None:
+            return self.DB_POOL_SIZE, self.DB_MAX_OVERFLOW
+        per_worker = max(1, self.DB_MAX_CONNECTIONS // max(1, self.WEB_CONCURRENCY))
+        pool_size = min(self.DB_POOL_SIZE, per_worker)
+        return pool_size, min(self.DB_MAX_OVERFLOW, per_worker - pool_size)
+
     @property
     def cors_origins(self) -> list[str]:
         if self.ENVIRONMENT == "production":
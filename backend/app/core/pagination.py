@@ -0,0 +1,24 @@
+import base64
+from datetime import datetime
+from uuid import UUID
+
+
+def encode_cursor(started_at: datetime, id: UUID) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor."""
+    raw = f"{started_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor made by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        started_at, id = raw.split("|")
+        return datetime.fromisoformat(started_at), UUID(id)
+    except (UnicodeDecodeError, ValueError) as err:
+        raise ValueError("Invalid cursor") from err
@@ -1,4 +1,6 @@
+import asyncio
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
@@ -7,29 +9,74 @@ from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def make_password_context(rounds: int) -> CryptContext:
+    """Hashes with ``rounds``; hashes with any other cost are reported as needing an update."""
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+pwd_context = make_password_context(settings.PASSWORD_BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so hashing in threads leaves the event loop free
+_executor: ThreadPoolExecutor | None = None
 
 ALGORITHM = "HS256"
 
 
-def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
+def create_access_token(
+    subject: str | Any, expires_delta: timedelta | None = None, claims: dict[str, Any] | None = None
+) -> str:
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
     else:
         expire = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Blocks for the whole bcrypt run; async code uses ``verify_password_async``."""
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
+    """Blocks for the whole bcrypt run; async code uses ``hash_password``."""
     return pwd_context.hash(password)
 
 
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor  # noqa: PLW0603
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_MAX_WORKERS, thread_name_prefix="password-hash"
+        )
+    return _executor
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Check a password in the hashing pool.
+
+    Returns whether it matches and, when the stored hash uses another cost than
+    ``PASSWORD_BCRYPT_ROUNDS``, a new hash to store in its place.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_executor(), pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+def shutdown_password_hashing() -> None:
+    global _executor  # noqa: PLW0603
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
 def hash_email(email: str) -> str:
     return hashlib.md5(email.encode()).hexdigest()
 
@@ -8,8 +8,9 @@ from jose import JWTError, jwt
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import auth_cache
 from app.core.config import settings
-from app.core.security import ALGORITHM, verify_password
+from app.core.security import ALGORITHM
 from app.db.session import get_async_session
 from app.models.user import User
 
@@ -34,49 +35,62 @@ class TokenData(BaseModel):
     """Schema for data embedded in token."""
 
     user_id: UUID | None = None
+    org_id: UUID | None = None  # Missing from tokens issued before it was added
+    token_version: int = 0
 
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
-    """Authenticate a user by email and password."""
+    """Authenticate a user by email and password, rehashing it if the cost factor changed."""
     from app.crud.user import user_crud  # Import here to avoid circular imports
 
-    user = await user_crud.get_by_email(db, email=email)
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):
-        return None
-    return user
+    return await user_crud.authenticate(db, email=email, password=password)
 
 
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: AsyncSession = Depends(get_async_session),
 ) -> User:
-    """Get the current authenticated user from the token."""
+    """
+    Get the current authenticated user from the token.
+
+    Users are resolved from a short-lived per-worker cache, so most requests run no
+    auth queries at all. A token with a newer version than the cached user (issued
+    after a password change on another worker) reloads the user; an older one is
+    rejected.
+    """
     from app.crud.user import user_crud  # Import here to avoid circular imports
 
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
         user_id_str: str | None = payload.get("sub")
         if user_id_str is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        token_data = TokenData(user_id=UUID(user_id_str))
-    except (JWTError, ValueError) as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from e
-
-    user = await user_crud.get(db, id=token_data.user_id)
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
+            raise credentials_exception
+        org_id_str: str | None = payload.get("org")
+        user_id = UUID(user_id_str)
+        token_data = TokenData(
+            user_id=user_id,
+            org_id=UUID(org_id_str) if org_id_str else None,
+            token_version=int(payload.get("ver", 0)),
         )
-    return user
+    except (JWTError, ValueError, TypeError) as e:
+        raise credentials_exception from e
+
+    cached = auth_cache.get(user_id)
+    if cached is None or cached.token_version < token_data.token_version:
+        user = await user_crud.get_with_organization(db, id=user_id)
+        if user is None:
+            raise credentials_exception
+        cached = auth_cache.store(user)
+    else:
+        user = None
+
+    if cached.token_version != token_data.token_version:
+        raise credentials_exception
+    if token_data.org_id is not None and cached.org_id != token_data.org_id:
+        raise credentials_exception
+    return user if user is not None else await auth_cache.attach(db, cached)
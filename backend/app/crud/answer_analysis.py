@@ -0,0 +1,138 @@
+from collections.abc import Sequence
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import Row, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.base import CRUDBase
+from app.models.answer_analysis import AnswerAnalysis
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_response import SurveyResponse
+
+
+class CRUDAnswerAnalysis(CRUDBase[AnswerAnalysis, BaseModel, BaseModel]):
+    """CRUD operations for AnswerAnalysis."""
+
+    @staticmethod
+    def _pending_filter(survey_instance_id: UUID, skip_questions: Sequence[int]) -> Any:
+        value = SurveyAnswer.answer["value"]
+        return (
+            select(SurveyAnswer.id)
+            .join(SurveyResponse, SurveyResponse.id == SurveyAnswer.response_id)
+            .outerjoin(AnswerAnalysis, AnswerAnalysis.answer_id == SurveyAnswer.id)
+            .where(SurveyResponse.survey_instance_id == survey_instance_id)
+            .where(AnswerAnalysis.answer_id.is_(None))
+            .where(func.jsonb_typeof(value) == "string")
+            .where(func.btrim(value.astext) != "")
+            .where(or_(SurveyAnswer.is_followup, SurveyAnswer.question_idx.not_in(skip_questions)))
+        )
+
+    async def get_pending(
+        self, db: AsyncSession, *, survey_instance_id: UUID, skip_questions: Sequence[int], limit: int
+    ) -> Sequence[Row[Any]]:
+        """
+        Get up to ``limit`` text answers of a survey instance that have no analysis yet.
+
+        Rows have ``id``, ``question_idx``, ``is_followup``, ``question_text`` and
+        ``text``, ordered by question. Base answers to ``skip_questions`` (e.g. choice
+        questions) are left out; follow-up replies are always free text.
+        """
+        stmt = (
+            self._pending_filter(survey_instance_id, skip_questions)
+            .add_columns(
+                SurveyAnswer.question_idx,
+                SurveyAnswer.is_followup,
+                SurveyAnswer.question_text,
+                SurveyAnswer.answer["value"].astext.label("text"),
+            )
+            .order_by(SurveyAnswer.question_idx, SurveyAnswer.is_followup, SurveyAnswer.created_at)
+            .limit(limit)
+        )
+        result = await db.execute(stmt)
+        return result.all()
+
+    async def count_pending(self, db: AsyncSession, *, survey_instance_id: UUID, skip_questions: Sequence[int]) -> int:
+        """Count the answers ``get_pending`` would return without a limit."""
+        subquery = self._pending_filter(survey_instance_id, skip_questions).subquery()
+        return await db.scalar(select(func.count()).select_from(subquery)) or 0
+
+    async def get_by_keys(self, db: AsyncSession, *, keys: Sequence[str]) -> dict[str, AnswerAnalysis]:
+        """Get one stored analysis per answer hash in ``keys``; hashes never analyzed are missing."""
+        result = await db.execute(
+            select(AnswerAnalysis).where(AnswerAnalysis.key.in_(keys)).distinct(AnswerAnalysis.key)
+        )
+        return {analysis.key: analysis for analysis in result.scalars()}
+
+    async def insert_many(self, db: AsyncSession, *, rows: Sequence[dict[str, Any]]) -> None:
+        """
+        Insert analysis rows with multi-row ``INSERT ... ON CONFLICT DO NOTHING``.
+
+        An answer analyzed concurrently by another run keeps its first analysis. Rows go
+        out ``BULK_INSERT_ROWS`` at a time. Nothing is committed here.
+        """
+        for start in range(0, len(rows), settings.BULK_INSERT_ROWS):
+            stmt = (
+                pg_insert(AnswerAnalysis)
+                .values(list(rows[start : start + settings.BULK_INSERT_ROWS]))
+                .on_conflict_do_nothing(index_elements=[AnswerAnalysis.answer_id])
+            )
+            await db.execute(stmt)
+
+    async def get_sentiment_counts(self, db: AsyncSession, *, survey_instance_id: UUID) -> Sequence[Row[int, str, int]]:
+        """
+        Count a survey instance's analyzed answers per question and sentiment.
+
+        Rows have ``question_idx``, ``sentiment`` and ``answers``.
+        """
+        result = await db.execute(
+            select(SurveyAnswer.question_idx, AnswerAnalysis.sentiment, func.count().label("answers"))
+            .join(SurveyAnswer, SurveyAnswer.id == AnswerAnalysis.answer_id)
+            .join(SurveyResponse, SurveyResponse.id == SurveyAnswer.response_id)
+            .where(SurveyResponse.survey_instance_id == survey_instance_id)
+            .group_by(SurveyAnswer.question_idx, AnswerAnalysis.sentiment)
+        )
+        return result.all()
+
+    async def get_top_themes(
+        self, db: AsyncSession, *, survey_instance_id: UUID, limit: int
+    ) -> Sequence[Row[int, str, int]]:
+        """
+        Get the ``limit`` most frequent themes per question of a survey instance.
+
+        Rows have ``question_idx``, ``theme`` and ``answers``, most frequent first
+        within each question; ties are broken alphabetically.
+        """
+        themes = func.jsonb_array_elements_text(AnswerAnalysis.themes).table_valued("value").lateral("themes")
+        counts = (
+            select(
+                SurveyAnswer.question_idx,
+                themes.c.value.label("theme"),
+                func.count().label("answers"),
+            )
+            .select_from(AnswerAnalysis)
+            .join(SurveyAnswer, SurveyAnswer.id == AnswerAnalysis.answer_id)
+            .join(SurveyResponse, SurveyResponse.id == SurveyAnswer.response_id)
+            .join(themes, themes.c.value.isnot(None))
+            .where(SurveyResponse.survey_instance_id == survey_instance_id)
+            .group_by(SurveyAnswer.question_idx, themes.c.value)
+            .subquery("counts")
+        )
+        rank = (
+            func.row_number()
+            .over(partition_by=counts.c.question_idx, order_by=(counts.c.answers.desc(), counts.c.theme))
+            .label("rank")
+        )
+        ranked = select(counts, rank).subquery("ranked")
+        result = await db.execute(
+            select(ranked.c.question_idx, ranked.c.theme, ranked.c.answers)
+            .where(ranked.c.rank <= limit)
+            .order_by(ranked.c.question_idx, ranked.c.rank)
+        )
+        return result.all()
+
+
+answer_analysis_crud = CRUDAnswerAnalysis(AnswerAnalysis)
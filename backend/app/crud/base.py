@@ -32,12 +32,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(select(self.model).offset(skip).limit(limit))
         return result.scalars().all()
 
-    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType, commit: bool = True) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await self._persist(db, db_obj, commit=commit)
         return db_obj
 
     async def update(
@@ -46,6 +45,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         *,
         db_obj: ModelType,
         obj_in: UpdateSchemaType | dict[str, Any],
+        commit: bool = True,
     ) -> ModelType:
         obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
@@ -56,14 +56,29 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await self._persist(db, db_obj, commit=commit)
         return db_obj
 
-    async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
+    async def remove(self, db: AsyncSession, *, id: int, commit: bool = True) -> ModelType:
         obj = await db.get(self.model, id)
         if obj is None:
             raise NoResultFound(f"Object with id {id} not found")
         await db.delete(obj)
-        await db.commit()
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
         return obj
+
+    async def _persist(self, db: AsyncSession, db_obj: ModelType, *, commit: bool) -> None:
+        """
+        Write pending changes for ``db_obj``.
+
+        With ``commit=False`` the changes are only flushed, so several CRUD calls can share
+        one transaction (see ``app.db.session.unit_of_work``) and the caller commits once.
+        """
+        if not commit:
+            await db.flush()
+            return
+        await db.commit()
+        await db.refresh(db_obj)
@@ -1,28 +1,49 @@
 from collections.abc import Sequence
+from typing import Any
 
-from sqlalchemy import select
+from pydantic import BaseModel
+from sqlalchemy import Select, delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
 from app.models.chat_history import ChatHistory
+from app.models.chat_summary import ChatSummary
 
 
-class CRUDChatHistory(CRUDBase[ChatHistory, dict, dict]):
+class CRUDChatHistory(CRUDBase[ChatHistory, BaseModel, BaseModel]):
     """CRUD operations for chat history with revised schema."""
 
-    async def get_by_session_id(self, db: AsyncSession, *, session_id: str, limit: int = 100) -> Sequence[ChatHistory]:
-        """Get chat history for a specific session."""
-        query = select(ChatHistory).where(ChatHistory.session_id == session_id).order_by(ChatHistory.id).limit(limit)
+    @staticmethod
+    def _session_query(session_id: str, after_id: int | None) -> Select[ChatHistory]:
+        query = select(ChatHistory).where(ChatHistory.session_id == session_id)
+        if after_id is not None:
+            query = query.where(ChatHistory.id > after_id)
+        return query
+
+    async def get_by_session_id(
+        self, db: AsyncSession, *, session_id: str, limit: int = 100, after_id: int | None = None
+    ) -> Sequence[ChatHistory]:
+        """Get chat history for a specific session, optionally only the messages after ``after_id``."""
+        query = self._session_query(session_id, after_id).order_by(ChatHistory.id).limit(limit)
         result = await db.execute(query)
         return result.scalars().all()
 
+    async def get_latest_by_session_id(
+        self, db: AsyncSession, *, session_id: str, limit: int = 100, after_id: int | None = None
+    ) -> Sequence[ChatHistory]:
+        """Get the latest ``limit`` messages of a session, or of those after ``after_id``, oldest first."""
+        query = self._session_query(session_id, after_id).order_by(ChatHistory.id.desc()).limit(limit)
+        result = await db.execute(query)
+        return list(reversed(result.scalars().all()))
+
     async def clear_session_history(self, db: AsyncSession, *, session_id: str) -> None:
-        """Delete all chat history for a specific session."""
+        """Delete all chat history for a specific session, and its summary."""
         query = select(ChatHistory).where(ChatHistory.session_id == session_id)
         result = await db.execute(query)
         items = result.scalars().all()
         for item in items:
             await db.delete(item)
+        await db.execute(delete(ChatSummary).where(ChatSummary.session_id == session_id))
         await db.commit()
 
     async def add_message(self, db: AsyncSession, *, session_id: str, role: str, content: str) -> ChatHistory:
@@ -33,6 +54,14 @@ class CRUDChatHistory(CRUDBase[ChatHistory, dict, dict]):
         await db.refresh(chat_message)
         return chat_message
 
+    async def add_messages(self, db: AsyncSession, *, session_id: str, messages: Sequence[dict[str, Any]]) -> None:
+        """Append several messages to a session in one statement, in order."""
+        if not messages:
+            return
+        rows = [{"session_id": session_id, "message": message} for message in messages]
+        await db.execute(insert(ChatHistory).values(rows))
+        await db.commit()
+
 
 # Create a singleton instance
 chat_history_crud = CRUDChatHistory(ChatHistory)
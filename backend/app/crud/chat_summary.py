@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.chat_summary import ChatSummary
+
+
+class CRUDChatSummary(CRUDBase[ChatSummary, BaseModel, BaseModel]):
+    async def get_by_session_id(self, db: AsyncSession, *, session_id: str) -> ChatSummary | None:
+        result = await db.execute(select(ChatSummary).where(ChatSummary.session_id == session_id))
+        return result.scalar_one_or_none()
+
+    async def upsert(self, db: AsyncSession, *, session_id: str, summary: str, last_message_id: int) -> None:
+        """Store a session's summary unless a summary covering later messages is already stored."""
+        stmt = pg_insert(ChatSummary).values(session_id=session_id, summary=summary, last_message_id=last_message_id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ChatSummary.session_id],
+            set_={
+                "summary": stmt.excluded.summary,
+                "last_message_id": stmt.excluded.last_message_id,
+                "updated_at": func.now(),
+            },
+            where=ChatSummary.last_message_id < stmt.excluded.last_message_id,
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+
+chat_summary_crud = CRUDChatSummary(ChatSummary)
@@ -11,7 +11,7 @@ from app.schemas.event import EventCreate, EventUpdate
 
 
 class CRUDEvent(CRUDBase[Event, EventCreate, EventUpdate]):
-    async def create(self, db: AsyncSession, *, obj_in: EventCreate) -> Event:
+    async def create(self, db: AsyncSession, *, obj_in: EventCreate, commit: bool = True) -> Event:
         # Convert datetime strings to datetime objects if needed
         obj_in_data = obj_in.model_dump()
         if isinstance(obj_in_data["start_dt"], str):
@@ -21,8 +21,7 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventUpdate]):
 
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await self._persist(db, db_obj, commit=commit)
         return db_obj
 
     async def get_by_org_id(self, db: AsyncSession, *, org_id: UUID) -> Sequence[Event]:
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.followup_decision import FollowupDecision
+
+
+class CRUDFollowupDecision(CRUDBase[FollowupDecision, BaseModel, BaseModel]):
+    async def get_fresh(self, db: AsyncSession, *, key: str, not_before: datetime) -> FollowupDecision | None:
+        """Get a cached decision for ``key`` that was stored after ``not_before``."""
+        result = await db.execute(
+            select(FollowupDecision).where(FollowupDecision.key == key).where(FollowupDecision.created_at >= not_before)
+        )
+        return result.scalar_one_or_none()
+
+    async def upsert(self, db: AsyncSession, *, key: str, followup: str | None, latency_ms: float) -> None:
+        """Store a decision, replacing any older one for the same key."""
+        stmt = pg_insert(FollowupDecision).values(key=key, followup=followup, latency_ms=latency_ms)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FollowupDecision.key],
+            set_={"followup": stmt.excluded.followup, "latency_ms": stmt.excluded.latency_ms, "created_at": func.now()},
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+
+followup_decision_crud = CRUDFollowupDecision(FollowupDecision)
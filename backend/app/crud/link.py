@@ -1,15 +1,50 @@
 from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, func, insert, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
+from app.models.event import Event
 from app.models.link import Link
+from app.models.survey import Survey
+from app.models.survey_instance import SurveyInstance
 from app.schemas.link import LinkCreate, LinkUpdate
 
 
 class CRUDLink(CRUDBase[Link, LinkCreate, LinkUpdate]):
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        org_id: UUID,
+        survey_instance_id: UUID,
+        count: int,
+        expires_at: datetime | None = None,
+    ) -> list[UUID]:
+        """
+        Insert ``count`` links of one survey instance and return their ids.
+
+        The rows are generated by Postgres in a single ``INSERT ... SELECT``, so the
+        statement has the same four parameters however many links are minted. Nothing
+        is committed here.
+        """
+        rows = select(
+            func.gen_random_uuid(),
+            literal(org_id, Link.org_id.type),
+            literal(survey_instance_id, Link.survey_instance_id.type),
+            literal(expires_at, Link.expires_at.type),
+        ).select_from(func.generate_series(1, count))
+        stmt = (
+            insert(Link)
+            .from_select([Link.id, Link.org_id, Link.survey_instance_id, Link.expires_at], rows)
+            .returning(Link.id)
+        )
+        result = await db.execute(stmt)
+        return list(result.scalars())
+
     async def get_by_org_id(self, db: AsyncSession, *, org_id: UUID) -> Sequence[Link]:
         result = await db.execute(select(Link).where(Link.org_id == org_id))
         return result.scalars().all()
@@ -30,6 +65,38 @@ class CRUDLink(CRUDBase[Link, LinkCreate, LinkUpdate]):
         )
         return result.scalar_one_or_none()
 
+    async def get_public_form(self, db: AsyncSession, *, id: UUID) -> Row[Any] | None:
+        """
+        Load everything the public form of an unexpired link shows in a single query.
+
+        The row exposes ``link_id``, ``org_id``, ``survey_instance_id``, ``expires_at``,
+        ``survey_id``, ``is_published``, ``title``, ``schema``, ``event_id``,
+        ``event_name``, ``start_dt`` and ``end_dt``.
+        """
+        stmt = (
+            select(
+                Link.id.label("link_id"),
+                Link.org_id,
+                Link.survey_instance_id,
+                Link.expires_at,
+                Survey.id.label("survey_id"),
+                Survey.is_published,
+                Survey.title,
+                Survey.schema,
+                Event.id.label("event_id"),
+                Event.name.label("event_name"),
+                Event.start_dt,
+                Event.end_dt,
+            )
+            .join(SurveyInstance, SurveyInstance.id == Link.survey_instance_id)
+            .join(Survey, Survey.id == SurveyInstance.survey_id)
+            .join(Event, Event.id == SurveyInstance.event_id)
+            .where(Link.id == id)
+            .where((Link.expires_at > func.now()) | (Link.expires_at.is_(None)))
+        )
+        result = await db.execute(stmt)
+        return result.one_or_none()
+
     async def get_active_links(self, db: AsyncSession, *, org_id: UUID) -> Sequence[Link]:
         from datetime import datetime
 
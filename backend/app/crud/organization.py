@@ -1,6 +1,9 @@
+from typing import Any
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import auth_cache
 from app.crud.base import CRUDBase
 from app.models.organization import Organization
 from app.schemas.organization import OrganizationCreate, OrganizationUpdate
@@ -11,5 +14,17 @@ class CRUDOrganization(CRUDBase[Organization, OrganizationCreate, OrganizationUp
         result = await db.execute(select(Organization).where(Organization.name == name))
         return result.scalar_one_or_none()
 
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Organization,
+        obj_in: OrganizationUpdate | dict[str, Any],
+        commit: bool = True,
+    ) -> Organization:
+        organization = await super().update(db, db_obj=db_obj, obj_in=obj_in, commit=commit)
+        auth_cache.invalidate_organization(organization.id)
+        return organization
+
 
 organization_crud = CRUDOrganization(Organization)
@@ -0,0 +1,163 @@
+from collections.abc import Sequence
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import Row, and_, case, false, func, select, tuple_, union
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.question_rollup import QuestionRollup
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_response import SurveyResponse
+
+# Key of the transaction-level advisory lock held while rollups are refreshed
+REFRESH_LOCK_KEY = 0x51_52_4F_4C  # "QROL"
+
+
+class CRUDQuestionRollup(CRUDBase[QuestionRollup, BaseModel, BaseModel]):
+    """CRUD operations for QuestionRollup."""
+
+    async def get_by_survey_instance(self, db: AsyncSession, *, survey_instance_id: UUID) -> Sequence[QuestionRollup]:
+        """Get the rollups of a survey instance ordered by question; one row per question ever reached."""
+        result = await db.execute(
+            select(QuestionRollup)
+            .where(QuestionRollup.survey_instance_id == survey_instance_id)
+            .order_by(QuestionRollup.question_idx)
+        )
+        return result.scalars().all()
+
+    async def try_lock_refresh(self, db: AsyncSession) -> bool:
+        """Take the refresh lock for the current transaction, or return ``False`` if another session holds it."""
+        return bool(await db.scalar(select(func.pg_try_advisory_xact_lock(REFRESH_LOCK_KEY))))
+
+    async def get_watermark(self, db: AsyncSession) -> datetime | None:
+        """Return when rollups were last refreshed, or ``None`` if they never were."""
+        return await db.scalar(select(func.max(QuestionRollup.refreshed_at)))
+
+    async def get_changed_instances(self, db: AsyncSession, *, since: datetime | None) -> Sequence[Row[UUID, UUID]]:
+        """
+        List the survey instances with answers written or responses finished since ``since``.
+
+        Rows have ``survey_instance_id`` and ``survey_id``. Every instance with
+        responses is listed when ``since`` is ``None``. The survey flow writes a new
+        answer slot or finishes the response with every answer, so filling in an
+        existing slot is caught as well.
+        """
+        stmt = select(SurveyResponse.survey_instance_id, SurveyResponse.survey_id).distinct()
+        if since is not None:
+            touched = union(
+                select(SurveyAnswer.response_id).where(SurveyAnswer.created_at >= since),
+                select(SurveyResponse.id).where(SurveyResponse.finished_at >= since),
+            )
+            stmt = stmt.where(SurveyResponse.id.in_(touched))
+        result = await db.execute(stmt)
+        return result.all()
+
+    async def refresh(
+        self,
+        db: AsyncSession,
+        *,
+        survey_instance_ids: Sequence[UUID],
+        distribution_questions: Sequence[tuple[UUID, int]],
+    ) -> None:
+        """
+        Recompute the rollups of the given instances from their answers in one statement.
+
+        ``distribution_questions`` lists the ``(survey_id, question_idx)`` questions
+        that get a ``distribution``; every element of a list answer is counted. Rows are
+        upserted and stamped with the transaction time. Nothing is committed here.
+        """
+        value = SurveyAnswer.answer["value"]
+        is_base = SurveyAnswer.is_followup == false()
+        has_value = func.coalesce(func.jsonb_typeof(value), "null") != "null"
+        is_number = func.jsonb_typeof(value) == "number"
+        counts = (
+            select(
+                SurveyResponse.survey_instance_id,
+                SurveyAnswer.question_idx,
+                func.count().filter(is_base).label("reached"),
+                func.count().filter(is_base & has_value).label("answered"),
+                func.count().filter(is_base & is_number).label("scored"),
+                func.coalesce(func.sum(value.as_float()).filter(is_base & is_number), 0.0).label("score_sum"),
+                func.count().filter(SurveyAnswer.is_followup).label("followups"),
+                func.count()
+                .filter(SurveyAnswer.is_followup & SurveyAnswer.answer.isnot(None))
+                .label("followups_answered"),
+            )
+            .join(SurveyResponse, SurveyResponse.id == SurveyAnswer.response_id)
+            .where(SurveyResponse.survey_instance_id.in_(survey_instance_ids))
+            .group_by(SurveyResponse.survey_instance_id, SurveyAnswer.question_idx)
+            .cte("counts")
+        )
+
+        as_array = case((func.jsonb_typeof(value) == "array", value), else_=func.jsonb_build_array(value))
+        choices = func.jsonb_array_elements_text(as_array.cast(JSONB)).table_valued("value").lateral("choices")
+        choice_counts = (
+            select(
+                SurveyResponse.survey_instance_id,
+                SurveyAnswer.question_idx,
+                choices.c.value.label("choice"),
+                func.count().label("answers"),
+            )
+            .join(SurveyResponse, SurveyResponse.id == SurveyAnswer.response_id)
+            .join(choices, choices.c.value.isnot(None))
+            .where(SurveyResponse.survey_instance_id.in_(survey_instance_ids))
+            .where(is_base)
+            .where(tuple_(SurveyResponse.survey_id, SurveyAnswer.question_idx).in_(distribution_questions))
+            .group_by(SurveyResponse.survey_instance_id, SurveyAnswer.question_idx, choices.c.value)
+            .subquery("choice_counts")
+        )
+        distributions = (
+            select(
+                choice_counts.c.survey_instance_id,
+                choice_counts.c.question_idx,
+                func.jsonb_object_agg(choice_counts.c.choice, choice_counts.c.answers).label("distribution"),
+            )
+            .group_by(choice_counts.c.survey_instance_id, choice_counts.c.question_idx)
+            .cte("distributions")
+        )
+
+        rows = select(
+            counts.c.survey_instance_id,
+            counts.c.question_idx,
+            counts.c.reached,
+            counts.c.answered,
+            counts.c.scored,
+            counts.c.score_sum,
+            distributions.c.distribution,
+            counts.c.followups,
+            counts.c.followups_answered,
+            func.now(),
+        ).select_from(
+            counts.outerjoin(
+                distributions,
+                and_(
+                    distributions.c.survey_instance_id == counts.c.survey_instance_id,
+                    distributions.c.question_idx == counts.c.question_idx,
+                ),
+            )
+        )
+        columns = [
+            "survey_instance_id",
+            "question_idx",
+            "reached",
+            "answered",
+            "scored",
+            "score_sum",
+            "distribution",
+            "followups",
+            "followups_answered",
+            "refreshed_at",
+        ]
+        stmt = pg_insert(QuestionRollup).from_select(columns, rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[QuestionRollup.survey_instance_id, QuestionRollup.question_idx],
+            set_={column: stmt.excluded[column] for column in columns[2:]},
+        )
+        await db.execute(stmt)
+
+
+question_rollup_crud = CRUDQuestionRollup(QuestionRollup)
@@ -1,9 +1,14 @@
+import uuid
 from collections.abc import Sequence
+from typing import Any
 from uuid import UUID
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.crud.base import CRUDBase
 from app.models.survey_answer import SurveyAnswer
 from app.schemas.survey_flow import AnswerCreate, AnswerUpdate
@@ -37,5 +42,71 @@ class CRUDSurveyAnswer(CRUDBase[SurveyAnswer, AnswerCreate, AnswerUpdate]):
         )
         return result.scalar_one_or_none() is not None
 
+    async def insert_many(self, db: AsyncSession, *, rows: Sequence[dict[str, Any]]) -> None:
+        """
+        Insert answer rows with multi-row ``INSERT ... ON CONFLICT DO NOTHING``.
+
+        Slots that already exist under ``uq_survey_answer_response_question_followup``
+        are left untouched. Rows go out ``BULK_INSERT_ROWS`` at a time and must all
+        have the same keys. Nothing is committed here.
+        """
+        for start in range(0, len(rows), settings.BULK_INSERT_ROWS):
+            stmt = (
+                pg_insert(SurveyAnswer)
+                .values([{"id": uuid.uuid4(), **row} for row in rows[start : start + settings.BULK_INSERT_ROWS]])
+                .on_conflict_do_nothing(constraint="uq_survey_answer_response_question_followup")
+            )
+            await db.execute(stmt)
+
+    async def upsert_many(self, db: AsyncSession, *, rows: Sequence[dict[str, Any]]) -> None:
+        """
+        Insert or overwrite answer rows with multi-row ``INSERT ... ON CONFLICT DO UPDATE``.
+
+        Existing slots get the row's ``question_text`` and ``answer``. Rows go out
+        ``BULK_INSERT_ROWS`` at a time and must all have the same keys. Nothing is
+        committed here.
+        """
+        for start in range(0, len(rows), settings.BULK_INSERT_ROWS):
+            stmt = pg_insert(SurveyAnswer).values(
+                [{"id": uuid.uuid4(), **row} for row in rows[start : start + settings.BULK_INSERT_ROWS]]
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_survey_answer_response_question_followup",
+                set_={"question_text": stmt.excluded.question_text, "answer": stmt.excluded.answer},
+            )
+            await db.execute(stmt)
+
+    def build_upsert(  # noqa: PLR0913
+        self,
+        *,
+        response_id: UUID,
+        question_idx: int,
+        question_text: str,
+        is_followup: bool = False,
+        answer: dict[str, Any] | None = None,
+        update_fields: Sequence[str] = ("answer",),
+    ) -> Insert:
+        """
+        Build an ``INSERT ... ON CONFLICT DO UPDATE`` for one answer slot.
+
+        The statement is keyed on ``uq_survey_answer_response_question_followup`` so it
+        works whether or not the slot already exists. Pass ``update_fields=()`` to leave
+        an existing row untouched.
+        """
+        stmt = pg_insert(SurveyAnswer).values(
+            id=uuid.uuid4(),
+            response_id=response_id,
+            question_idx=question_idx,
+            question_text=question_text,
+            is_followup=is_followup,
+            answer=answer,
+        )
+        if not update_fields:
+            return stmt.on_conflict_do_nothing(constraint="uq_survey_answer_response_question_followup")
+        return stmt.on_conflict_do_update(
+            constraint="uq_survey_answer_response_question_followup",
+            set_={field: stmt.excluded[field] for field in update_fields},
+        )
+
 
 survey_answer_crud = CRUDSurveyAnswer(SurveyAnswer)
@@ -1,11 +1,15 @@
 from collections.abc import Sequence
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, case, false, func, select, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
+from app.models.survey_answer import SurveyAnswer
 from app.models.survey_instance import SurveyInstance
+from app.models.survey_response import SurveyResponse
 from app.schemas.survey_instance import SurveyInstanceCreate, SurveyInstanceUpdate
 
 
@@ -32,5 +36,116 @@ class CRUDSurveyInstance(CRUDBase[SurveyInstance, SurveyInstanceCreate, SurveyIn
         )
         return result.scalars().all()
 
+    async def get_response_stats_by_event(self, db: AsyncSession, *, event_id: UUID) -> Sequence[Row[Any]]:
+        """
+        Aggregate response counts and scores for every instance of an event in one query.
+
+        Each row has ``instance_id``, ``survey_id``, ``total_responses``,
+        ``completed_responses``, ``scored_responses`` and ``average_score``. A response's
+        score is the mean of its numeric base answers (``answer["value"]``);
+        ``average_score`` averages those per-response scores and is ``None`` when no
+        response has one. Instances without responses are included with zero counts.
+        """
+        value = SurveyAnswer.answer["value"]
+        # Score each of the event's responses first so only their answers are read
+        response_scores = (
+            select(
+                SurveyResponse.id,
+                SurveyResponse.survey_instance_id,
+                SurveyResponse.finished_at,
+                func.avg(value.as_float()).label("score"),
+            )
+            .join(SurveyInstance, SurveyInstance.id == SurveyResponse.survey_instance_id)
+            .outerjoin(
+                SurveyAnswer,
+                (SurveyAnswer.response_id == SurveyResponse.id)
+                & (SurveyAnswer.is_followup == false())
+                & (func.jsonb_typeof(value) == "number"),
+            )
+            .where(SurveyInstance.event_id == event_id)
+            .group_by(SurveyResponse.id)
+            .subquery("response_scores")
+        )
+        stmt = (
+            select(
+                SurveyInstance.id.label("instance_id"),
+                SurveyInstance.survey_id,
+                func.count(response_scores.c.id).label("total_responses"),
+                func.count(response_scores.c.id)
+                .filter(response_scores.c.finished_at.isnot(None))
+                .label("completed_responses"),
+                func.count(response_scores.c.score).label("scored_responses"),
+                func.avg(response_scores.c.score).label("average_score"),
+            )
+            .outerjoin(response_scores, response_scores.c.survey_instance_id == SurveyInstance.id)
+            .where(SurveyInstance.event_id == event_id)
+            .group_by(SurveyInstance.id)
+            .order_by(SurveyInstance.id)
+        )
+        result = await db.execute(stmt)
+        return result.all()
+
+    async def get_answer_stats_by_event(self, db: AsyncSession, *, event_id: UUID) -> Sequence[Row[Any]]:
+        """
+        Count the base answers given to each question of every instance of an event.
+
+        Each row has ``instance_id``, ``question_idx``, ``answered`` (answers with a
+        value), ``scored`` (numeric answers) and ``score_sum``. Questions nobody has
+        answered yet are left out.
+        """
+        value = SurveyAnswer.answer["value"]
+        is_number = func.jsonb_typeof(value) == "number"
+        stmt = (
+            select(
+                SurveyResponse.survey_instance_id.label("instance_id"),
+                SurveyAnswer.question_idx,
+                func.count().label("answered"),
+                func.count().filter(is_number).label("scored"),
+                func.sum(value.as_float()).filter(is_number).label("score_sum"),
+            )
+            .select_from(SurveyInstance)
+            .join(SurveyResponse, SurveyResponse.survey_instance_id == SurveyInstance.id)
+            .join(SurveyAnswer, SurveyAnswer.response_id == SurveyResponse.id)
+            .where(SurveyInstance.event_id == event_id)
+            .where(SurveyAnswer.is_followup == false())
+            .where(func.jsonb_typeof(value) != "null")
+            .group_by(SurveyResponse.survey_instance_id, SurveyAnswer.question_idx)
+        )
+        result = await db.execute(stmt)
+        return result.all()
+
+    async def get_choice_counts_by_event(
+        self, db: AsyncSession, *, event_id: UUID, questions: Sequence[tuple[UUID, int]]
+    ) -> Sequence[Row[Any]]:
+        """
+        Count how often each choice was picked for the given ``(survey_id, question_idx)`` questions.
+
+        Each row has ``instance_id``, ``question_idx``, ``choice`` (the value as text)
+        and ``answers``. Every element of a multiple-choice (list) answer is counted.
+        """
+        if not questions:
+            return []
+        value = SurveyAnswer.answer["value"]
+        as_array = case((func.jsonb_typeof(value) == "array", value), else_=func.jsonb_build_array(value))
+        choices = func.jsonb_array_elements_text(as_array.cast(JSONB)).table_valued("value").lateral("choices")
+        stmt = (
+            select(
+                SurveyResponse.survey_instance_id.label("instance_id"),
+                SurveyAnswer.question_idx,
+                choices.c.value.label("choice"),
+                func.count().label("answers"),
+            )
+            .select_from(SurveyInstance)
+            .join(SurveyResponse, SurveyResponse.survey_instance_id == SurveyInstance.id)
+            .join(SurveyAnswer, SurveyAnswer.response_id == SurveyResponse.id)
+            .join(choices, choices.c.value.isnot(None))
+            .where(SurveyInstance.event_id == event_id)
+            .where(SurveyAnswer.is_followup == false())
+            .where(tuple_(SurveyResponse.survey_id, SurveyAnswer.question_idx).in_(questions))
+            .group_by(SurveyResponse.survey_instance_id, SurveyAnswer.question_idx, choices.c.value)
+        )
+        result = await db.execute(stmt)
+        return result.all()
+
 
 survey_instance_crud = CRUDSurveyInstance(SurveyInstance)
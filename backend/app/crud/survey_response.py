@@ -1,10 +1,21 @@
 from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, String, cast, false, literal, select, true, tuple_, update
+from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import func
 
+from app.core.config import settings
 from app.crud.base import CRUDBase
+from app.crud.survey_answer import survey_answer_crud
+from app.models.event import Event
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_instance import SurveyInstance
 from app.models.survey_response import SurveyResponse
 from app.schemas.survey_flow import SurveyResponseCreate, SurveyResponseUpdate
 
@@ -20,7 +31,9 @@ class CRUDSurveyResponse(CRUDBase[SurveyResponse, SurveyResponseCreate, SurveyRe
         result = await db.execute(select(SurveyResponse).where(SurveyResponse.finished_at.is_(None)))
         return result.scalars().all()
 
-    async def increment_current_index(self, db: AsyncSession, *, response_id: UUID) -> SurveyResponse:
+    async def increment_current_index(
+        self, db: AsyncSession, *, response_id: UUID, commit: bool = True
+    ) -> SurveyResponse:
         """Increment the current index of a survey response."""
         stmt = (
             update(SurveyResponse)
@@ -30,23 +43,35 @@ class CRUDSurveyResponse(CRUDBase[SurveyResponse, SurveyResponseCreate, SurveyRe
         )
         result = await db.execute(stmt)
         response = result.scalar_one()
-        await db.commit()
+        if commit:
+            await db.commit()
         return response
 
-    async def mark_finished(self, db: AsyncSession, *, response_id: UUID) -> SurveyResponse:
-        """Mark a survey response as finished."""
-        from sqlalchemy.sql import func
+    async def mark_finished(
+        self, db: AsyncSession, *, response_id: UUID, current_index: int | None = None, commit: bool = True
+    ) -> SurveyResponse:
+        """Mark a survey response as finished, optionally moving its cursor to ``current_index``."""
+        values: dict[str, Any] = {"finished_at": func.now()}
+        if current_index is not None:
+            values["current_index"] = current_index
+        stmt = update(SurveyResponse).where(SurveyResponse.id == response_id).values(**values).returning(SurveyResponse)
+        result = await db.execute(stmt)
+        response = result.scalar_one()
+        if commit:
+            await db.commit()
+        return response
 
-        stmt = (
+    async def end_buffering(self, db: AsyncSession, *, response_id: UUID, current_index: int) -> None:
+        """
+        Move the cursor of a response whose buffered answers were just written, and drop its ``buffered_in_store`` flag.
+
+        Nothing is committed here.
+        """
+        await db.execute(
             update(SurveyResponse)
             .where(SurveyResponse.id == response_id)
-            .values(finished_at=func.now())
-            .returning(SurveyResponse)
+            .values(current_index=current_index, meta=SurveyResponse.meta.op("-")("buffered_in_store"))
         )
-        result = await db.execute(stmt)
-        response = result.scalar_one()
-        await db.commit()
-        return response
 
     async def get_by_survey_instance_id(
         self, db: AsyncSession, *, survey_instance_id: UUID
@@ -55,5 +80,278 @@ class CRUDSurveyResponse(CRUDBase[SurveyResponse, SurveyResponseCreate, SurveyRe
         result = await db.execute(select(SurveyResponse).where(SurveyResponse.survey_instance_id == survey_instance_id))
         return result.scalars().all()
 
+    async def get_page_by_survey_instance_id(
+        self,
+        db: AsyncSession,
+        *,
+        survey_instance_id: UUID,
+        limit: int | None,
+        after: tuple[datetime, UUID] | None = None,
+        include_answers: bool = True,
+    ) -> Sequence[Row[Any]]:
+        """
+        Get one page of an instance's responses, ordered by ``(started_at, id)``.
+
+        ``after`` is the ``(started_at, id)`` of the last row of the previous page. The
+        answers map (question text to answer) is built in Postgres, so a page costs a
+        single query; leave it out with ``include_answers=False``. Rows expose ``id``,
+        ``survey_instance_id``, ``started_at``, ``submitted_at`` and ``answers``. A ``limit``
+        of ``None`` returns every remaining response.
+        """
+        columns: list[Any] = [
+            SurveyResponse.id,
+            SurveyResponse.survey_instance_id,
+            SurveyResponse.started_at,
+            func.coalesce(SurveyResponse.finished_at, SurveyResponse.started_at).label("submitted_at"),
+        ]
+        if include_answers:
+            answers = (
+                select(
+                    func.coalesce(
+                        func.jsonb_object_agg(SurveyAnswer.question_text, SurveyAnswer.answer),
+                        cast(literal("{}"), JSONB),
+                    )
+                )
+                .where(SurveyAnswer.response_id == SurveyResponse.id)
+                .scalar_subquery()
+            )
+            columns.append(answers.label("answers"))
+
+        stmt = (
+            select(*columns)
+            .where(SurveyResponse.survey_instance_id == survey_instance_id)
+            .order_by(SurveyResponse.started_at, SurveyResponse.id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(SurveyResponse.started_at, SurveyResponse.id) > tuple_(*after))
+        result = await db.execute(stmt)
+        return result.all()
+
+    async def insert_many(self, db: AsyncSession, *, rows: Sequence[dict[str, Any]]) -> set[UUID]:
+        """
+        Insert responses that carry their own ``id``, skipping ids that already exist.
+
+        Rows go out ``BULK_INSERT_ROWS`` at a time as multi-row inserts and must all
+        have the same keys. Returns the ids that were inserted. Nothing is committed here.
+        """
+        inserted: set[UUID] = set()
+        for start in range(0, len(rows), settings.BULK_INSERT_ROWS):
+            stmt = (
+                pg_insert(SurveyResponse)
+                .values(list(rows[start : start + settings.BULK_INSERT_ROWS]))
+                .on_conflict_do_nothing(index_elements=[SurveyResponse.id])
+                .returning(SurveyResponse.id)
+            )
+            result = await db.execute(stmt)
+            inserted.update(result.scalars())
+        return inserted
+
+    async def get_survey_instance_ids(self, db: AsyncSession, *, ids: Sequence[UUID]) -> dict[UUID, UUID]:
+        """Map each existing response id in ``ids`` to its survey instance."""
+        result = await db.execute(
+            select(SurveyResponse.id, SurveyResponse.survey_instance_id).where(SurveyResponse.id.in_(ids))
+        )
+        return dict(result.tuples().all())
+
+    async def get_flow_state(
+        self, db: AsyncSession, *, response_id: UUID
+    ) -> Row[SurveyResponse, SurveyAnswer, SurveyAnswer] | None:
+        """
+        Load a response and the answer slots for its current question in a single query.
+
+        The row exposes ``SurveyResponse``, ``base_answer`` and ``followup_answer``; the
+        answers are ``None`` when the slot does not exist yet. The survey itself comes
+        from ``app.services.survey_cache``.
+        """
+        base_answer = aliased(SurveyAnswer, name="base_answer")
+        followup_answer = aliased(SurveyAnswer, name="followup_answer")
+        stmt = (
+            select(SurveyResponse, base_answer, followup_answer)
+            .outerjoin(
+                base_answer,
+                (base_answer.response_id == SurveyResponse.id)
+                & (base_answer.question_idx == SurveyResponse.current_index)
+                & (base_answer.is_followup == false()),
+            )
+            .outerjoin(
+                followup_answer,
+                (followup_answer.response_id == SurveyResponse.id)
+                & (followup_answer.question_idx == SurveyResponse.current_index)
+                & (followup_answer.is_followup == true()),
+            )
+            .where(SurveyResponse.id == response_id)
+        )
+        result = await db.execute(stmt)
+        return result.one_or_none()
+
+    async def record_answer_and_advance(  # noqa: PLR0913
+        self,
+        db: AsyncSession,
+        *,
+        response_id: UUID,
+        question_idx: int,
+        question_text: str,
+        is_followup: bool,
+        answer: dict[str, Any] | None,
+        next_question_idx: int,
+        next_question_text: str | None,
+    ) -> None:
+        """
+        Store an answer and move the response to its next question in one statement.
+
+        The answer upsert, the cursor update and the placeholder row for the next
+        question are chained as data-modifying CTEs. When ``next_question_text`` is
+        ``None`` the response is marked finished instead. Nothing is committed here.
+        """
+        answer_upsert = survey_answer_crud.build_upsert(
+            response_id=response_id,
+            question_idx=question_idx,
+            question_text=question_text,
+            is_followup=is_followup,
+            answer=answer,
+        )
+        ctes = [answer_upsert.returning(SurveyAnswer.id).cte("answer_upsert")]
+
+        response_values: dict[str, Any] = {"current_index": next_question_idx}
+        if next_question_text is None:
+            response_values["finished_at"] = func.now()
+        else:
+            next_slot = survey_answer_crud.build_upsert(
+                response_id=response_id,
+                question_idx=next_question_idx,
+                question_text=next_question_text,
+                update_fields=(),
+            )
+            ctes.append(next_slot.returning(SurveyAnswer.id).cte("next_slot"))
+
+        response_update = (
+            update(SurveyResponse)
+            .where(SurveyResponse.id == response_id)
+            .values(**response_values)
+            .returning(SurveyResponse.id)
+            .cte("response_update")
+        )
+        await db.execute(select(response_update.c.id).add_cte(*ctes))
+
+    async def record_answer_with_followup(  # noqa: PLR0913
+        self,
+        db: AsyncSession,
+        *,
+        response_id: UUID,
+        question_idx: int,
+        question_text: str,
+        answer: dict[str, Any] | None,
+        followup_text: str,
+    ) -> None:
+        """
+        Store a base answer and open a follow-up slot for the same question in one statement.
+
+        The response cursor stays where it is; the follow-up answer moves it on later.
+        Nothing is committed here.
+        """
+        answer_upsert = survey_answer_crud.build_upsert(
+            response_id=response_id,
+            question_idx=question_idx,
+            question_text=question_text,
+            answer=answer,
+        )
+        answer_upsert_cte = answer_upsert.returning(SurveyAnswer.id).cte("answer_upsert")
+        followup_upsert = (
+            survey_answer_crud.build_upsert(
+                response_id=response_id,
+                question_idx=question_idx,
+                question_text=followup_text,
+                is_followup=True,
+                update_fields=("question_text",),
+            )
+            .returning(SurveyAnswer.id)
+            .cte("followup_upsert")
+        )
+        await db.execute(select(followup_upsert.c.id).add_cte(answer_upsert_cte))
+
+    async def add_late_followup(
+        self, db: AsyncSession, *, response_id: UUID, question_idx: int, followup_text: str
+    ) -> None:
+        """
+        Offer a follow-up that arrived after the participant moved past ``question_idx``.
+
+        Pending offers live in ``meta["late_followups"]`` keyed by question index until
+        they are answered. Nothing is committed here.
+        """
+        meta = func.coalesce(SurveyResponse.meta, cast(literal("{}"), JSONB))
+        late_followups = func.coalesce(meta.op("->")("late_followups"), cast(literal("{}"), JSONB))
+        offer = func.jsonb_build_object(str(question_idx), followup_text)
+        await db.execute(
+            update(SurveyResponse)
+            .where(SurveyResponse.id == response_id)
+            .values(meta=meta.op("||")(func.jsonb_build_object("late_followups", late_followups.op("||")(offer))))
+        )
+
+    async def answer_late_followup(
+        self,
+        db: AsyncSession,
+        *,
+        response_id: UUID,
+        question_idx: int,
+        followup_text: str,
+        answer: dict[str, Any] | None,
+    ) -> None:
+        """Store the answer to a late follow-up and withdraw the offer in one statement."""
+        answer_upsert = (
+            survey_answer_crud.build_upsert(
+                response_id=response_id,
+                question_idx=question_idx,
+                question_text=followup_text,
+                is_followup=True,
+                answer=answer,
+                update_fields=("question_text", "answer"),
+            )
+            .returning(SurveyAnswer.id)
+            .cte("answer_upsert")
+        )
+        withdraw_path = array(["late_followups", str(question_idx)], type_=String)
+        offer_removal = (
+            update(SurveyResponse)
+            .where(SurveyResponse.id == response_id)
+            .values(meta=SurveyResponse.meta.op("#-")(withdraw_path))
+            .returning(SurveyResponse.id)
+            .cte("offer_removal")
+        )
+        await db.execute(select(offer_removal.c.id).add_cte(answer_upsert))
+
+    async def stream_export_rows(
+        self, db: AsyncSession, *, survey_id: UUID, survey_instance_id: UUID | None = None
+    ) -> AsyncResult[Any]:
+        """
+        Stream one row per answer of a survey through a server-side cursor.
+
+        Rows carry the response, instance and event name next to the answer and come
+        ordered by response, question and follow-up flag, so consecutive rows belong to
+        the same response. Only ``EXPORT_YIELD_PER`` rows are buffered at a time.
+        """
+        stmt = (
+            select(
+                SurveyResponse.id.label("response_id"),
+                SurveyResponse.survey_instance_id,
+                Event.name.label("event_name"),
+                SurveyResponse.started_at,
+                SurveyResponse.finished_at,
+                SurveyAnswer.question_idx,
+                SurveyAnswer.is_followup,
+                SurveyAnswer.question_text,
+                SurveyAnswer.answer,
+            )
+            .join(SurveyInstance, SurveyInstance.id == SurveyResponse.survey_instance_id)
+            .join(Event, Event.id == SurveyInstance.event_id)
+            .outerjoin(SurveyAnswer, SurveyAnswer.response_id == SurveyResponse.id)
+            .where(SurveyResponse.survey_id == survey_id)
+            .order_by(SurveyResponse.started_at, SurveyResponse.id, SurveyAnswer.question_idx, SurveyAnswer.is_followup)
+            .execution_options(yield_per=settings.EXPORT_YIELD_PER)
+        )
+        if survey_instance_id is not None:
+            stmt = stmt.where(SurveyResponse.survey_instance_id == survey_instance_id)
+        return await db.stream(stmt)
+
 
 survey_response_crud = CRUDSurveyResponse(SurveyResponse)
@@ -1,9 +1,12 @@
 from typing import Any
+from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.core.security import get_password_hash, verify_password
+from app.core import auth_cache
+from app.core.security import hash_password, verify_password_async
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
@@ -14,35 +17,49 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         result = await db.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
 
-    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+    async def get_with_organization(self, db: AsyncSession, *, id: UUID) -> User | None:
+        result = await db.execute(select(User).options(joinedload(User.organization)).where(User.id == id))
+        return result.scalar_one_or_none()
+
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate, commit: bool = True) -> User:
         db_obj = User(
             email=obj_in.email,
             name=obj_in.name,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=await hash_password(obj_in.password),
             org_id=obj_in.org_id,
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await self._persist(db, db_obj, commit=commit)
         return db_obj
 
-    async def update(self, db: AsyncSession, *, db_obj: User, obj_in: UserUpdate | dict[str, Any]) -> User:
+    async def update(
+        self, db: AsyncSession, *, db_obj: User, obj_in: UserUpdate | dict[str, Any], commit: bool = True
+    ) -> User:
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
         if update_data.get("password"):
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await hash_password(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+            update_data["token_version"] = db_obj.token_version + 1  # Revokes tokens issued before
+        user = await super().update(db, db_obj=db_obj, obj_in=update_data, commit=commit)
+        auth_cache.invalidate_user(user.id)
+        return user
 
     async def authenticate(self, db: AsyncSession, *, email: str, password: str) -> User | None:
         user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = await verify_password_async(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash is not None:
+            # Hashed with an older cost factor; the password is the same, so its tokens stay valid
+            user.hashed_password = new_hash
+            await self._persist(db, user, commit=True)
+            auth_cache.invalidate_user(user.id)
         return user
 
 
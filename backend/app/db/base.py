@@ -9,3 +9,7 @@ from app.models.survey_instance import SurveyInstance  # noqa
 from app.models.link import Link  # noqa
 from app.models.survey_response import SurveyResponse  # noqa
 from app.models.chat_history import ChatHistory  # noqa
+from app.models.chat_summary import ChatSummary  # noqa
+from app.models.followup_decision import FollowupDecision  # noqa
+from app.models.question_rollup import QuestionRollup  # noqa
+from app.models.answer_analysis import AnswerAnalysis  # noqa
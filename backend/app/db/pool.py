@@ -0,0 +1,64 @@
+import time
+from typing import Any, cast
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+
+class PoolMetrics:
+    """Checkout counters for one connection pool, exposed through the metrics endpoint."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "checkout_wait_avg_ms": self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+            "checkout_wait_max_ms": self.wait_max * 1000,
+        }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that times how long each checkout waits for a connection.
+
+    The wait covers queueing for a free connection and, when the pool grows into its
+    overflow, opening a new one. Metrics survive ``engine.dispose()``.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.record_wait(time.perf_counter() - started_at)
+        return connection
+
+    def recreate(self) -> "InstrumentedAsyncPool":
+        pool = cast(InstrumentedAsyncPool, super().recreate())
+        pool.metrics = self.metrics
+        return pool
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(0, self.overflow()),
+            **self.metrics.snapshot(),
+        }
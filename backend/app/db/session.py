@@ -1,19 +1,120 @@
 from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncPool
 
-engine = create_async_engine(settings.sqlalchemy_database_uri, echo=True)
-SessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """
+    Build the ``create_async_engine`` keyword arguments for ``url`` from the settings.
+
+    In PgBouncer mode prepared statements are neither cached nor reused by name,
+    because transaction pooling may run consecutive statements on different server
+    connections.
+    """
+    pool_size, max_overflow = settings.db_pool_limits
+    options: dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if make_url(url).get_driver_name() == "asyncpg":
+        if settings.DB_PGBOUNCER:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _prepared_statement_name,
+            }
+        else:
+            options["connect_args"] = {
+                "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            }
+    return options
+
+
+def _sessionmaker(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+engine = create_async_engine(settings.sqlalchemy_database_uri, **engine_options(settings.sqlalchemy_database_uri))
+SessionLocal = _sessionmaker(engine)
+
+# Read-only routes go to the replica when one is configured and to the primary otherwise
+read_engine: AsyncEngine | None = None
+ReadSessionLocal = SessionLocal
+if settings.DATABASE_READ_REPLICA_URL:
+    read_engine = create_async_engine(
+        settings.DATABASE_READ_REPLICA_URL, **engine_options(settings.DATABASE_READ_REPLICA_URL)
+    )
+    ReadSessionLocal = _sessionmaker(read_engine)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only routes; it may lag behind the primary when a replica is used."""
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+def get_pool_metrics() -> dict[str, Any]:
+    engines = {"primary": engine, "replica": read_engine}
+    return {
+        name: bound.pool.snapshot()
+        for name, bound in engines.items()
+        if bound is not None and isinstance(bound.pool, InstrumentedAsyncPool)
+    }
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections; called on application shutdown."""
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether a database call failed because the database was unreachable, rather than because of the statement."""
+    if isinstance(error, OSError | sa_exc.TimeoutError | sa_exc.OperationalError | sa_exc.InterfaceError):
+        return True
+    return isinstance(error, sa_exc.DBAPIError) and error.connection_invalidated
+
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Run a block of CRUD calls made with ``commit=False`` as a single transaction.
+
+    The block's writes are committed once on exit and rolled back if it raises.
+    """
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
@@ -8,3 +8,6 @@ from app.models.survey_instance import SurveyInstance  # noqa
 from app.models.link import Link  # noqa
 from app.models.survey_response import SurveyResponse  # noqa
 from app.models.survey_answer import SurveyAnswer  # noqa
+from app.models.followup_decision import FollowupDecision  # noqa
+from app.models.question_rollup import QuestionRollup  # noqa
+from app.models.answer_analysis import AnswerAnalysis  # noqa
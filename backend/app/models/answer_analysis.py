@@ -0,0 +1,34 @@
+import uuid
+
+from sqlalchemy import TIMESTAMP, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class AnswerAnalysis(Base):
+    """
+    Sentiment and themes the model found in a free-text answer or follow-up reply.
+
+    ``key`` is the normalized hash of the question and answer text; answers with the
+    same key reuse an existing analysis instead of going to the model again.
+    ``sentiment`` is ``positive``, ``neutral`` or ``negative`` and ``themes`` a list of
+    short lower-case labels.
+    """
+
+    answer_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("surveyanswer.id"), primary_key=True)
+    key: Mapped[str] = mapped_column(String(64), nullable=False)
+    sentiment: Mapped[str] = mapped_column(String(16), nullable=False)
+    themes: Mapped[list] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+
+    # Indexes
+    __table_args__ = (
+        # Analyses are looked up by answer hash before calling the model
+        Index("ix_answeranalysis_key", "key"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.answer_id}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Integer, String
+from sqlalchemy import JSON, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base_class import Base
@@ -18,5 +18,10 @@ class ChatHistory(Base):
     __tablename__ = "chat_history"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    session_id: Mapped[str] = mapped_column(String, index=True, nullable=False)
+    session_id: Mapped[str] = mapped_column(String, nullable=False)
     message: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    __table_args__ = (
+        # A session's messages are read in id order, most often only the latest ones
+        Index("ix_chat_history_session_id_id", "session_id", "id"),
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import TIMESTAMP, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class ChatSummary(Base):
+    """
+    Rolling summary of a chat session's older messages, kept by ``app.services.chat_memory``.
+
+    ``last_message_id`` is the id of the newest ``chat_history`` message folded into
+    ``summary``; the messages after it are sent to the model verbatim.
+    """
+
+    __tablename__ = "chat_summary"
+
+    session_id: Mapped[str] = mapped_column(String, primary_key=True)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
+    last_message_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[TIMESTAMP] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
@@ -23,7 +23,7 @@ class EventStatus(str, enum.Enum):
 
 class Event(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
-    org_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey(Organization.id))
+    org_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey(Organization.id), index=True)
     name: Mapped[str]
     description: Mapped[str | None]
     start_dt: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP(timezone=True))
@@ -0,0 +1,22 @@
+from sqlalchemy import TIMESTAMP, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class FollowupDecision(Base):
+    """
+    Shared tier of the follow-up decision cache.
+
+    ``key`` is the normalized hash of the survey, question and answer; ``followup`` is
+    ``None`` when the model decided no follow-up was needed.
+    """
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    followup: Mapped[str | None] = mapped_column(String, nullable=True)
+    latency_ms: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    created_at: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.key}>"
@@ -16,9 +16,11 @@ if TYPE_CHECKING:
 
 class Link(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    org_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey(Organization.id), nullable=False)
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey(Organization.id), index=True, nullable=False
+    )
     survey_instance_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey(SurveyInstance.id), nullable=False
+        UUID(as_uuid=True), ForeignKey(SurveyInstance.id), index=True, nullable=False
     )
     expires_at: Mapped[TIMESTAMP | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
 
@@ -14,8 +14,10 @@ if TYPE_CHECKING:
 
 class OrgAllowedDomain(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    org_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey(Organization.id), nullable=False)
-    domain: Mapped[str] = mapped_column(String, nullable=False)
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey(Organization.id), index=True, nullable=False
+    )
+    domain: Mapped[str] = mapped_column(String, index=True, nullable=False)
 
     # Relationship
     organization: Mapped[Organization] = relationship(Organization, back_populates="allowed_domains")
@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import TIMESTAMP, Float, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class QuestionRollup(Base):
+    """
+    Answer figures for one question of a survey instance, kept by ``app.services.question_rollups``.
+
+    For base answers, ``reached`` counts answer slots (one is created when a question
+    is shown) and ``answered`` the ones holding a value. ``scored`` and ``score_sum``
+    cover the numeric answers. ``distribution`` maps each picked choice (as text) to
+    its count for rating and choice questions. ``followups`` counts follow-up slots and
+    ``followups_answered`` the answered ones.
+    """
+
+    survey_instance_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("surveyinstance.id"), primary_key=True
+    )
+    question_idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+    reached: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    answered: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    scored: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    distribution: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    followups: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    followups_answered: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    refreshed_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+
+    # Indexes
+    __table_args__ = (
+        # The refresher's watermark is the latest refresh
+        Index("ix_questionrollup_refreshed_at", "refreshed_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.survey_instance_id}:{self.question_idx}>"
@@ -17,10 +17,14 @@ if TYPE_CHECKING:
 
 class Survey(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    org_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey(Organization.id), nullable=False)
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey(Organization.id), index=True, nullable=False
+    )
     title: Mapped[str] = mapped_column(String, nullable=False)
     schema: Mapped[dict] = mapped_column(JSONB, nullable=False)
     is_published: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Flow graph compiled from ``schema`` at publish time (see app.services.survey_cache)
+    compiled_flow: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     created_at: Mapped[TIMESTAMP | None] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
 
     # Relationships
@@ -1,7 +1,7 @@
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import TIMESTAMP, Boolean, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import TIMESTAMP, Boolean, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -32,4 +32,6 @@ class SurveyAnswer(Base):
             "is_followup",
             name="uq_survey_answer_response_question_followup",
         ),
+        # The question rollup refresher looks for recently written answers
+        Index("ix_surveyanswer_created_at", "created_at"),
     )
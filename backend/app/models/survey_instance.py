@@ -24,9 +24,11 @@ class EmailRequirement(PyEnum):
 
 class SurveyInstance(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    org_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey(Organization.id), nullable=False)
-    event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey(Event.id), nullable=False)
-    survey_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey(Survey.id), nullable=False)
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey(Organization.id), index=True, nullable=False
+    )
+    event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey(Event.id), index=True, nullable=False)
+    survey_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey(Survey.id), index=True, nullable=False)
     email_requirement: Mapped[EmailRequirement] = mapped_column(
         Enum(EmailRequirement), nullable=False, default=EmailRequirement.NONE
     )
@@ -1,7 +1,7 @@
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import TIMESTAMP, ForeignKey, Integer
+from sqlalchemy import TIMESTAMP, ForeignKey, Index, Integer, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -32,3 +32,12 @@ class SurveyResponse(Base):
     answers: Mapped[list["SurveyAnswer"]] = relationship(
         "SurveyAnswer", back_populates="response", cascade="all, delete-orphan"
     )
+
+    # Indexes
+    __table_args__ = (
+        # Keyset pagination and exports walk responses in (started_at, id) order
+        Index("ix_surveyresponse_instance_started", "survey_instance_id", "started_at", "id"),
+        Index("ix_surveyresponse_survey_started", "survey_id", "started_at", "id"),
+        Index("ix_surveyresponse_unfinished", "started_at", postgresql_where=text("finished_at IS NULL")),
+        Index("ix_surveyresponse_finished", "finished_at", postgresql_where=text("finished_at IS NOT NULL")),
+    )
@@ -31,7 +31,11 @@ async def login_for_access_token(
         )
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(subject=str(user.id), expires_delta=access_token_expires)
+    access_token = create_access_token(
+        subject=str(user.id),
+        expires_delta=access_token_expires,
+        claims={"org": str(user.org_id), "ver": user.token_version},
+    )
 
     return Token(access_token=access_token, token_type=TokenType.BEARER)
 
@@ -11,6 +11,7 @@ from app.db.session import get_async_session
 from app.models.user import User
 from app.schemas.chat import ChatHistoryResponse, ChatRequest
 from app.services.chat_chain import build_chain
+from app.services.chat_memory import cancel_summary
 
 router = APIRouter(tags=["Chat"])
 
@@ -18,7 +19,6 @@ router = APIRouter(tags=["Chat"])
 @router.post("/", response_class=EventSourceResponse)
 async def chat(
     req: ChatRequest,
-    db: AsyncSession = Depends(get_async_session),
 ) -> EventSourceResponse:
     """
     Chat API endpoint that streams response tokens.
@@ -26,7 +26,7 @@ async def chat(
     """
     # Use a random session ID for anonymous users
     session_id = str(uuid.uuid4())
-    chain = build_chain(session_id, db)
+    chain = build_chain(session_id)
 
     async def event_generator() -> AsyncGenerator[dict, None]:
         try:
@@ -61,4 +61,5 @@ async def clear_chat_history(
     """
     Clears all chat history for the current user.
     """
+    await cancel_summary(str(current_user.id))
     await chat_history_crud.clear_session_history(db, session_id=str(current_user.id))
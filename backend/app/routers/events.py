@@ -5,10 +5,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.event import event_crud
 from app.crud.survey import survey_crud
-from app.db.session import get_async_session
+from app.db.session import get_async_session, get_read_session
 from app.models.survey_instance import EmailRequirement
 from app.schemas.event import EventCreate, EventRead, EventUpdate
 from app.schemas.survey_instance import SurveyInstanceRead
+from app.services.public_form_cache import invalidate_event_forms
 
 router = APIRouter()
 
@@ -26,7 +27,7 @@ async def create_event(
 
 @router.get("/", response_model=list[EventRead])
 async def get_events(
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     org_id: int | None = None,
 ) -> list[EventRead]:
     """List events filtered by organization if org_id is provided."""
@@ -70,6 +71,7 @@ async def update_event(
             detail="Event not found",
         )
     event = await event_crud.update(db, db_obj=event, obj_in=event_in)
+    invalidate_event_forms(event.id)
     return event
 
 
@@ -87,6 +89,7 @@ async def delete_event(
             detail="Event not found",
         )
     event = await event_crud.remove(db, id=id)
+    invalidate_event_forms(id)
     return event
 
 
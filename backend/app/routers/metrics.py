@@ -0,0 +1,37 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.core.auth_cache import get_auth_cache_stats
+from app.db.session import get_pool_metrics
+from app.services.answer_analysis import get_analysis_metrics
+from app.services.chat_memory import get_chat_summary_metrics
+from app.services.flow_state import get_flow_state_metrics
+from app.services.followup_cache import get_followup_cache_stats
+from app.services.followup_service import get_followup_metrics
+from app.services.live_stats import get_live_stats_metrics
+from app.services.public_form_cache import get_public_form_cache_stats
+from app.services.qr_codes import get_qr_cache_stats
+from app.services.question_rollups import get_rollup_metrics
+from app.services.submission_queue import get_submission_metrics
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_metrics() -> dict[str, Any]:
+    """Report in-process runtime metrics for this worker."""
+    return {
+        "followups": get_followup_metrics(),
+        "followup_cache": get_followup_cache_stats(),
+        "public_form_cache": get_public_form_cache_stats(),
+        "qr_cache": get_qr_cache_stats(),
+        "submissions": get_submission_metrics(),
+        "flow_state": get_flow_state_metrics(),
+        "live_stats": get_live_stats_metrics(),
+        "question_rollups": get_rollup_metrics(),
+        "answer_analysis": get_analysis_metrics(),
+        "chat_summaries": get_chat_summary_metrics(),
+        "auth_cache": get_auth_cache_stats(),
+        "db_pool": get_pool_metrics(),
+    }
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.org_allowed_domain import org_allowed_domain_crud
-from app.db.session import get_async_session
+from app.db.session import get_async_session, get_read_session
 from app.schemas.org_allowed_domain import OrgAllowedDomainCreate, OrgAllowedDomainRead
 
 router = APIRouter()
@@ -12,7 +12,7 @@ router = APIRouter()
 
 @router.get("/", response_model=list[OrgAllowedDomainRead])
 async def get_org_domains(
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ) -> list[OrgAllowedDomainRead]:
     """List allowed email domains for the organization."""
     domains = await org_allowed_domain_crud.get_multi(db)
@@ -1,14 +1,16 @@
+from datetime import UTC, datetime
 from typing import Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import hash_email
-from app.crud.link import link_crud
-from app.crud.survey_response import survey_response_crud
-from app.db.session import get_async_session
-from app.schemas.survey_response import SurveyResponseCreate, SurveyResponseRead
+from app.db.session import get_async_session, get_read_session
+from app.schemas.survey_response import SurveyResponseRead
+from app.services import live_stats, public_form_cache, submission_queue
+from app.services.submission_queue import Submission
+from app.services.survey_cache import InvalidSurveySchemaError, get_compiled_survey
 
 router = APIRouter()
 
@@ -17,46 +19,35 @@ router = APIRouter()
 async def get_public_form(
     *,
     uuid: str,
-    db: AsyncSession = Depends(get_async_session),
-) -> dict[str, Any]:
-    """Fetch form schema and metadata for a public survey link."""
-    # Look up the link by UUID
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """
+    Fetch form schema and metadata for a public survey link.
+
+    The rendered form is cached per link and carries a strong ``ETag``; a request whose
+    ``If-None-Match`` matches it gets an empty 304. ``Cache-Control`` lets browsers and
+    CDNs reuse published forms for a short while.
+    """
     try:
         uuid_obj = UUID(uuid)
-        link = await link_crud.get_by_id(db, id=uuid_obj)
     except ValueError as err:
         raise HTTPException(
             status_code=404,
             detail="Invalid UUID format",
         ) from err
 
-    if not link:
+    form = await public_form_cache.get_public_form(db, uuid_obj)
+    if not form:
         raise HTTPException(
             status_code=404,
             detail="Survey link not found",
         )
 
-    # Get the survey instance
-    survey_instance = link.survey_instance
-    if not survey_instance:
-        raise HTTPException(
-            status_code=404,
-            detail="Survey is not available",
-        )
-
-    # Get the survey schema
-    survey = survey_instance.survey
-
-    # Return the survey schema and metadata
-    return {
-        "title": survey.title,
-        "schema": survey.schema,
-        "event": {
-            "name": survey_instance.event.name,
-            "start_dt": survey_instance.event.start_dt,
-            "end_dt": survey_instance.event.end_dt,
-        },
-    }
+    headers = {"ETag": form.etag, "Cache-Control": public_form_cache.cache_control(form)}
+    if public_form_cache.etag_matches(if_none_match, form.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=form.body, media_type="application/json", headers=headers)
 
 
 @router.post("/{uuid}/submit", response_model=SurveyResponseRead)
@@ -66,26 +57,38 @@ async def submit_survey_response(
     response_data: dict[str, Any],
     db: AsyncSession = Depends(get_async_session),
 ) -> SurveyResponseRead:
-    """Submit answers for a survey."""
+    """
+    Submit answers for a survey.
+
+    ``answers`` maps question texts to answer values. The link and survey come from
+    the public form and survey caches, and the submission is stored as described in
+    ``submission_queue.save_submission``: committed before the reply, or acknowledged
+    with its server-generated id and written by the next batch in write-behind mode.
+    """
     # Look up the link by UUID
     try:
         uuid_obj = UUID(uuid)
-        link = await link_crud.get_by_id(db, id=uuid_obj)
     except ValueError as err:
         raise HTTPException(
             status_code=404,
             detail="Invalid UUID format",
         ) from err
 
-    if not link:
+    form = await public_form_cache.get_public_form(db, uuid_obj)
+    if not form:
         raise HTTPException(
             status_code=404,
             detail="Survey link not found",
         )
 
-    # Get the survey instance
-    survey_instance = link.survey_instance
-    if not survey_instance:
+    try:
+        survey = await get_compiled_survey(db, form.survey_id)
+    except InvalidSurveySchemaError as err:
+        raise HTTPException(
+            status_code=400,
+            detail=str(err),
+        ) from err
+    if not survey:
         raise HTTPException(
             status_code=404,
             detail="Survey is not available",
@@ -93,19 +96,58 @@ async def submit_survey_response(
 
     # Extract data from request
     answers = response_data.get("answers", {})
+    if not isinstance(answers, dict):
+        raise HTTPException(
+            status_code=400,
+            detail="Answers must map question texts to values",
+        )
+    question_indexes = {question.text: idx for idx, question in enumerate(survey.questions)}
+    unknown = sorted(set(answers) - question_indexes.keys())
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown questions: {', '.join(unknown)}",
+        )
+
     email = response_data.get("email")
     if email:
         email_hash = hash_email(email)
     else:
         email_hash = None
 
-    # Create survey response
-    response_in = SurveyResponseCreate(
-        survey_instance_id=survey_instance.id,
-        answers=answers,
-        email_hash=email_hash,
-        org_id=survey_instance.org_id,
+    response_id = uuid4()
+    submitted_at = datetime.now(UTC)
+    submission = Submission(
+        response={
+            "id": response_id,
+            "survey_id": survey.id,
+            "survey_instance_id": form.survey_instance_id,
+            "started_at": submitted_at,
+            "finished_at": submitted_at,
+            "current_index": len(survey.questions),
+            "meta": {"email_hash": email_hash} if email_hash else None,
+        },
+        answers=[
+            {
+                "response_id": response_id,
+                "question_idx": question_indexes[text],
+                "question_text": text,
+                "is_followup": False,
+                "answer": None if value is None else {"value": value},
+            }
+            for text, value in answers.items()
+        ],
+    )
+    await submission_queue.save_submission(db, submission)
+    live_stats.record_submission(
+        form.survey_instance_id, [(answer["question_idx"], answer["answer"]) for answer in submission.answers]
     )
 
-    response = await survey_response_crud.create(db, obj_in=response_in)
-    return response
+    return SurveyResponseRead(
+        id=response_id,
+        submitted_at=submitted_at,
+        org_id=form.org_id,
+        survey_instance_id=form.survey_instance_id,
+        email_hash=email_hash,
+        answers=answers,
+    )
@@ -1,92 +1,176 @@
-import csv
-import io
 import uuid
-from typing import Any
+from collections.abc import AsyncGenerator
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sse_starlette.sse import EventSourceResponse
 
 from app.crud.event import event_crud
-from app.crud.survey import survey_crud
+from app.crud.question_rollup import question_rollup_crud
 from app.crud.survey_instance import survey_instance_crud
-from app.crud.survey_response import survey_response_crud
-from app.db.session import get_async_session
+from app.db.session import get_async_session, get_read_session
+from app.schemas.stats import EventStats, InstanceAnalysis, InstanceQuestionStats
+from app.schemas.survey_flow import CompiledSurvey
+from app.services import answer_analysis, event_stats, live_stats, question_rollups, response_export
+from app.services.response_export import EXPORT_MEDIA_TYPES, ExportFormat
+from app.services.survey_cache import InvalidSurveySchemaError, get_compiled_survey
 
 router = APIRouter()
 
 
-@router.get("/events/{id}/stats")
+@router.get("/events/{id}/stats", response_model=EventStats)
 async def get_event_stats(
     *,
-    id: int,
-    db: AsyncSession = Depends(get_async_session),
-) -> dict[str, Any]:
-    """Get completion percentage and average score for an event's surveys."""
-    # Convert integer id to UUID by first converting to string
-    try:
-        event_uuid = uuid.UUID(str(id))
-        event = await event_crud.get(db, id=event_uuid)
-    except ValueError as err:
+    id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_session),
+) -> EventStats:
+    """
+    Get completion percentage and average score for an event's surveys.
+
+    Counts and scores are aggregated in the database, per survey instance, in a
+    single query; the response includes the per-instance breakdown.
+    """
+    event = await event_crud.get(db, id=id)
+    if not event:
         raise HTTPException(
-            status_code=400,
-            detail="Invalid ID format",
-        ) from err
+            status_code=404,
+            detail="Event not found",
+        )
+
+    return await event_stats.get_event_stats(db, event.id)
+
 
+@router.get("/events/{id}/stats/live", response_class=EventSourceResponse)
+async def stream_event_stats(
+    *,
+    id: uuid.UUID,
+    # Closed once the event is looked up, not held for as long as the dashboard listens
+    db: AsyncSession = Depends(get_read_session, scope="function"),
+) -> EventSourceResponse:
+    """
+    Stream an event's live figures to a dashboard as server-sent ``stats`` events.
+
+    The first event carries the current figures; later ones follow as responses come
+    in, at most every ``LIVE_STATS_PUSH_INTERVAL_MS``. Besides started and finished
+    responses per instance they include each question's answer count, average score
+    and, for rating and choice questions, answer distribution. All dashboards of an
+    event share one in-memory aggregator fed by this worker's survey flow and public
+    submissions; it is reloaded from the database every ``LIVE_STATS_RESYNC_SECONDS``,
+    which also picks up responses handled by other workers.
+    """
+    event = await event_crud.get(db, id=id)
     if not event:
         raise HTTPException(
             status_code=404,
             detail="Event not found",
         )
 
-    # Get all survey instances for this event
-    survey_instances = await survey_instance_crud.get_by_event_id(db, event_id=event_uuid)
-
-    total_responses = 0
-    total_score = 0
-    total_possible_responses = 0
+    async def event_generator() -> AsyncGenerator[dict, None]:
+        async with live_stats.subscribe(event.id) as updates:
+            while True:
+                yield {"event": "stats", "data": await updates.get()}
 
-    for instance in survey_instances:
-        # Get responses for this instance
-        responses = await survey_response_crud.get_by_survey_instance_id(db, survey_instance_id=instance.id)
+    return EventSourceResponse(event_generator())
 
-        total_responses += len(responses)
 
-        # Calculate average score if there's a scoring mechanism
-        # This is a placeholder - implement according to your scoring logic
-        for response in responses:
-            if "score" in response.answers:
-                total_score += response.answers["score"]
+async def _get_instance_survey(db: AsyncSession, id: uuid.UUID) -> CompiledSurvey:
+    survey_instance = await survey_instance_crud.get(db, id=id)
+    if not survey_instance:
+        raise HTTPException(
+            status_code=404,
+            detail="Survey instance not found",
+        )
 
-        # Assuming we have a target response count per instance
-        # This is a placeholder - adjust based on your business logic
-        total_possible_responses += instance.target_response_count or 100
+    try:
+        survey = await get_compiled_survey(db, survey_instance.survey_id)
+    except InvalidSurveySchemaError as err:
+        raise HTTPException(
+            status_code=400,
+            detail=str(err),
+        ) from err
+    if not survey:
+        raise HTTPException(
+            status_code=404,
+            detail="Survey not found",
+        )
+    return survey
 
-    completion_percentage = (total_responses / total_possible_responses * 100) if total_possible_responses > 0 else 0
-    average_score = (total_score / total_responses) if total_responses > 0 else 0
 
-    return {
-        "completion_percentage": completion_percentage,
-        "average_score": average_score,
-        "total_responses": total_responses,
-    }
+@router.get("/survey-instances/{id}/question-stats", response_model=InstanceQuestionStats)
+async def get_question_stats(
+    *,
+    id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_session),
+) -> InstanceQuestionStats:
+    """
+    Get per-question figures for a survey instance: answer and skip counts, average
+    score, choice or rating distribution and follow-up rate.
+
+    Figures come from the question rollups, one row per question, so the cost does not
+    grow with the number of answers. Rollups are refreshed in the background every
+    ``QUESTION_ROLLUP_REFRESH_SECONDS``; ``refreshed_at`` tells how recent they are.
+    """
+    survey = await _get_instance_survey(db, id)
+    rollups = await question_rollup_crud.get_by_survey_instance(db, survey_instance_id=id)
+    return question_rollups.build_question_stats(id, survey, rollups)
+
+
+@router.post("/survey-instances/{id}/analysis", response_model=InstanceAnalysis, status_code=202)
+async def start_answer_analysis(
+    *,
+    id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_session),
+) -> InstanceAnalysis:
+    """
+    Start analyzing a survey instance's free-text answers and follow-up replies.
+
+    The model tags each answer with a sentiment and a few themes. Answers are sent in
+    batches per question in the background; the response is the current summary with
+    ``running`` set. Only answers without an analysis are sent, so the endpoint can be
+    called again to pick up new answers or batches that failed.
+    """
+    survey = await _get_instance_survey(db, id)
+    answer_analysis.start_analysis(id)
+    return await answer_analysis.build_analysis_summary(db, id, survey)
+
+
+@router.get("/survey-instances/{id}/analysis", response_model=InstanceAnalysis)
+async def get_answer_analysis(
+    *,
+    id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_session),
+) -> InstanceAnalysis:
+    """
+    Get a survey instance's free-text analysis: per question, the sentiment counts and
+    most frequent themes (up to ``ANALYSIS_SUMMARY_TOP_THEMES``), plus the number of
+    text answers still ``pending``.
+    """
+    survey = await _get_instance_survey(db, id)
+    return await answer_analysis.build_analysis_summary(db, id, survey)
 
 
 @router.get("/surveys/{id}/responses/export")
 async def export_survey_responses(
     *,
-    id: int,
-    db: AsyncSession = Depends(get_async_session),
+    id: uuid.UUID,
+    survey_instance_id: uuid.UUID | None = None,
+    # Closed before streaming; the export reads through a session of its own
+    db: AsyncSession = Depends(get_read_session, scope="function"),
 ) -> StreamingResponse:
-    """Export all responses for a survey as a CSV file."""
-    # Convert integer id to UUID by first converting to string
+    """
+    Export all responses for a survey as a CSV file, one line per response.
+
+    Rows are streamed from a server-side cursor in fixed-size chunks, so memory use
+    does not grow with the number of responses. Pass ``survey_instance_id`` to export
+    a single instance.
+    """
     try:
-        survey_uuid = uuid.UUID(str(id))
-        survey = await survey_crud.get(db, id=survey_uuid)
-    except ValueError as err:
+        survey = await get_compiled_survey(db, id)
+    except InvalidSurveySchemaError as err:
         raise HTTPException(
             status_code=400,
-            detail="Invalid ID format",
+            detail=str(err),
         ) from err
 
     if not survey:
@@ -95,49 +179,49 @@ async def export_survey_responses(
             detail="Survey not found",
         )
 
-    # Get all instances of this survey
-    survey_instances = await survey_instance_crud.get_by_survey_id(db, survey_id=survey_uuid)
-
-    # Prepare CSV file
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Write header row - adjust based on your survey structure
-    header = ["Response ID", "Survey Instance", "Event", "Timestamp", "Email"]
-
-    # Add question headers based on survey schema
-    questions = survey.schema.get("questions", [])
-    for question in questions:
-        header.append(question.get("label", question.get("id", "Unknown")))
+    response = StreamingResponse(
+        response_export.stream_survey_csv(survey, survey_instance_id=survey_instance_id),
+        media_type="text/csv",
+    )
+    response.headers["Content-Disposition"] = f"attachment; filename=survey_{id}_responses.csv"
 
-    writer.writerow(header)
+    return response
 
-    # Write data rows
-    for instance in survey_instances:
-        responses = await survey_response_crud.get_by_survey_instance_id(db, survey_instance_id=instance.id)
 
-        for response in responses:
-            row = [
-                response.id,
-                instance.id,
-                instance.event.name,
-                response.created_at.isoformat(),
-                response.email or "Anonymous",
-            ]
+@router.get("/surveys/{id}/responses/export/{format}")
+async def export_survey_responses_as(
+    *,
+    id: uuid.UUID,
+    format: ExportFormat,
+    survey_instance_id: uuid.UUID | None = None,
+    # Closed before streaming; the export reads through a session of its own
+    db: AsyncSession = Depends(get_read_session, scope="function"),
+) -> StreamingResponse:
+    """
+    Export all responses for a survey as NDJSON, Parquet or an Arrow IPC stream.
 
-            # Add answer data
-            for question in questions:
-                question_id = question.get("id")
-                answer = response.answers.get(question_id, "")
-                row.append(str(answer))
+    There is one row per response. Answer columns are typed from the survey schema:
+    ratings are numbers, checkbox answers lists of strings and everything else text.
+    Rows are streamed from a server-side cursor like the CSV export.
+    """
+    try:
+        survey = await get_compiled_survey(db, id)
+    except InvalidSurveySchemaError as err:
+        raise HTTPException(
+            status_code=400,
+            detail=str(err),
+        ) from err
 
-            writer.writerow(row)
+    if not survey:
+        raise HTTPException(
+            status_code=404,
+            detail="Survey not found",
+        )
 
-    # Create response
     response = StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
+        response_export.stream_survey_export(survey, format, survey_instance_id=survey_instance_id),
+        media_type=EXPORT_MEDIA_TYPES[format],
     )
-    response.headers["Content-Disposition"] = f"attachment; filename=survey_{id}_responses.csv"
+    response.headers["Content-Disposition"] = f"attachment; filename=survey_{id}_responses.{format.value}"
 
     return response
@@ -3,18 +3,26 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.survey import survey_crud
 from app.crud.survey_answer import survey_answer_crud
 from app.crud.survey_instance import survey_instance_crud
 from app.crud.survey_response import survey_response_crud
-from app.db.session import get_async_session
+from app.db.session import get_async_session, unit_of_work
 from app.schemas.survey_flow import (
     AnswerIn,
+    BulkResponsesIn,
+    BulkResponsesOut,
+    CompiledSurvey,
+    LateFollowupOut,
     NextQuestionOut,
+    Question,
     QuestionResponse,
     SurveyStartOut,
 )
-from app.services.followup_service import get_followup_question
+from app.services import flow_state, live_stats
+from app.services.flow_graph import next_node
+from app.services.response_ingest import ingest_responses
+from app.services.speculative_followup import get_followup_within_deadline
+from app.services.survey_cache import InvalidSurveySchemaError, get_compiled_survey
 
 router = APIRouter()
 
@@ -37,51 +45,78 @@ async def start_survey(
 
     # Get the associated survey
     survey_id = survey_instance.survey_id
-    survey = await survey_crud.get(db, id=survey_id)
+    survey = await _get_survey(db, survey_id)
     if not survey:
         raise HTTPException(status_code=404, detail="Survey not found")
 
-    if not isinstance(survey.schema, dict) or "questions" not in survey.schema:
-        raise HTTPException(status_code=400, detail="Invalid survey schema")
-
-    questions = survey.schema["questions"]
-    if not isinstance(questions, list) or not questions:
-        raise HTTPException(status_code=400, detail="Invalid survey questions")
-
     # Create a new survey response
     response_data = {
         "survey_id": survey_id,
         "survey_instance_id": survey_instance_id,
+        "meta": flow_state.response_meta(),
     }
-    survey_response = await survey_response_crud.create(db, obj_in=response_data)
 
     # Get the first question from the survey
-    first_question = questions[0]
+    first_question = survey.questions[0]
 
-    # Create an empty answer entry for tracking
-    await survey_answer_crud.create(
-        db,
-        obj_in={
-            "response_id": survey_response.id,
-            "question_idx": 0,
-            "question_text": first_question.get("text", ""),
-            "is_followup": False,
-        },
-    )
+    async with unit_of_work(db):
+        survey_response = await survey_response_crud.create(db, obj_in=response_data, commit=False)
+
+        # Create an empty answer entry for tracking
+        await survey_answer_crud.create(
+            db,
+            obj_in={
+                "response_id": survey_response.id,
+                "question_idx": 0,
+                "question_text": first_question.text,
+                "is_followup": False,
+            },
+            commit=False,
+        )
+    await flow_state.start(db, survey_response.id, survey_id, survey_instance_id)
+    live_stats.record_response_started(survey_instance_id)
 
     # Return the response ID and first question
-    return SurveyStartOut(
-        response_id=survey_response.id,
-        question=QuestionResponse(
-            text=first_question.get("text", ""),
-            type=first_question.get("type", "text"),
-            choices=first_question.get("choices"),
-        ),
+    return SurveyStartOut(response_id=survey_response.id, question=_question_out(first_question))
+
+
+@router.post("/instance/{survey_instance_id}/responses/bulk", response_model=BulkResponsesOut)
+async def submit_responses_bulk(
+    responses_in: BulkResponsesIn,
+    survey_instance_id: UUID = Path(...),
+    db: AsyncSession = Depends(get_async_session),
+) -> BulkResponsesOut:
+    """
+    Upload complete responses queued by an offline client (e.g. a kiosk) in one request.
+
+    Each response carries a client-chosen ``id`` and its base answers; no follow-ups
+    are generated. Uploading the same response again is harmless, so a client can
+    retry a whole batch after a dropped connection. Every response gets its own
+    result (``created``, ``duplicate``, ``conflict`` or ``invalid``) in request order.
+    All accepted responses are written in a single transaction.
+    """
+    survey_instance = await survey_instance_crud.get(db, id=survey_instance_id)
+    if not survey_instance:
+        raise HTTPException(status_code=404, detail="Survey instance not found")
+
+    survey = await _get_survey(db, survey_instance.survey_id)
+    if not survey:
+        raise HTTPException(status_code=404, detail="Survey not found")
+
+    async with unit_of_work(db):
+        results = await ingest_responses(
+            db, survey_instance_id=survey_instance_id, survey=survey, responses=responses_in.responses
+        )
+
+    return BulkResponsesOut(
+        created=sum(result.status == "created" for result in results),
+        duplicates=sum(result.status == "duplicate" for result in results),
+        rejected=sum(result.status in ("conflict", "invalid") for result in results),
+        results=results,
     )
 
 
 @router.post("/responses/{response_id}/answer", response_model=NextQuestionOut)
-# ruff: noqa: PLR0912, PLR0915
 async def submit_answer(
     answer_in: AnswerIn,
     response_id: UUID = Path(...),
@@ -94,198 +129,160 @@ async def submit_answer(
     1. Stores or updates the answer for the current question
     2. Determines if a follow-up question is needed
     3. If yes, returns the follow-up question
-    4. If no, advances to the next base question
+    4. If no, follows the survey's flow graph (branches, skip logic) to the next question
     5. Returns "done=True" when all questions are answered
+
+    The response's cursor comes from the flow-state store (``FLOW_STATE_BACKEND``) or
+    one Postgres query, the survey from the compiled-survey cache, and each step is
+    persisted as one statement according to ``FLOW_STATE_WRITE_MODE``.
     """
-    # Verify the survey response exists
-    survey_response = await survey_response_crud.get(db, id=response_id)
-    if not survey_response:
+    try:
+        state = await flow_state.load(db, response_id)
+    except flow_state.FlowStateUnavailableError as err:
+        raise HTTPException(status_code=503, detail="Survey response temporarily unavailable") from err
+    except flow_state.FlowStateLostError as err:
+        raise HTTPException(status_code=409, detail="Survey response progress was lost; please start again") from err
+    if not state:
         raise HTTPException(status_code=404, detail="Survey response not found")
-
-    # Check if the survey is already completed
-    if survey_response.finished_at:
+    if state.finished:
         raise HTTPException(status_code=400, detail="Survey already completed")
 
-    # Get the survey to access the schema
-    survey = await survey_crud.get(db, id=survey_response.survey_id)
-    if not survey or not isinstance(survey.schema, dict) or "questions" not in survey.schema:
+    survey = await _get_survey(db, state.survey_id)
+    if not survey:
         raise HTTPException(status_code=400, detail="Invalid survey")
+    questions = survey.questions
 
-    questions = survey.schema["questions"]
-    if not isinstance(questions, list) or not questions:
-        raise HTTPException(status_code=400, detail="Invalid survey questions")
-
-    # Get current question index and validate
-    current_idx = survey_response.current_index
+    current_idx = state.current_index
     if current_idx >= len(questions):
-        # Survey is complete
-        await survey_response_crud.mark_finished(db, response_id=response_id)
+        await flow_state.finish(db, response_id, state)
+        live_stats.record_response_finished(state.survey_instance_id)
         return NextQuestionOut(done=True)
 
-    # Get the current question
     current_base_question = questions[current_idx]
-    current_question_text = current_base_question.get("text", "")
-    current_question_description = current_base_question.get("description", "")
+    current_question_text = current_base_question.text
 
-    # Get the answer entry
-    answer_entry = await survey_answer_crud.get_by_response_and_question(
-        db, response_id=response_id, question_idx=current_idx, is_followup=False
-    )
-
-    # If answer doesn't exist (should not happen) or it's a follow-up answer,
-    # we need to check if we're currently handling a base question or follow-up
-    is_answering_followup = False
-
-    # Check if there's a follow-up for this question and if it exists in the database
-    follow_up_entry = await survey_answer_crud.get_by_response_and_question(
-        db, response_id=response_id, question_idx=current_idx, is_followup=True
-    )
-
-    # Determine if we're answering a follow-up question
-    if follow_up_entry and not follow_up_entry.answer:
-        # We're answering a follow-up that exists but hasn't been answered yet
-        is_answering_followup = True
-        answer_entry = follow_up_entry
-
-    # Update or create the answer
+    is_answering_followup = state.followup_text is not None
     answer_value = None if answer_in.skipped else answer_in.answer
 
-    if answer_entry:
-        # Update existing answer
-        await survey_answer_crud.update(
-            db,
-            db_obj=answer_entry,
-            obj_in={"answer": answer_value},
+    follow_up = None
+    if not is_answering_followup and not answer_in.skipped and current_base_question.can_followup:
+        # Release the connection while the LLM decides; the read transaction holds nothing we need
+        await db.commit()
+        follow_up = await get_followup_within_deadline(
+            response_id=response_id,
+            question_idx=current_idx,
+            survey_description=survey.title,
+            question_text=current_question_text,
+            participant_answer=answer_value,
+            question_description=current_base_question.description,
+            question_type=current_base_question.type,
         )
 
-        # If this was a follow-up question, mark it as answered
-        if is_answering_followup:
-            # Make sure we're handling a follow-up question
-            debug_msg = f"Processing follow-up answer: {answer_value} for question idx: {current_idx}"
-            print(debug_msg)  # This helps with debugging
-    else:
-        # This shouldn't happen with the current flow but handle it just in case
-        await survey_answer_crud.create(
+    if follow_up:
+        await flow_state.record_answer_with_followup(
             db,
-            obj_in={
-                "response_id": response_id,
-                "question_idx": current_idx,
-                "question_text": current_question_text,
-                "is_followup": is_answering_followup,
-                "answer": answer_value,
-            },
+            response_id,
+            state,
+            question_idx=current_idx,
+            question_text=current_question_text,
+            answer=answer_value,
+            followup_text=follow_up,
         )
+        live_stats.record_answer(state.survey_instance_id, current_idx, answer_value)
+        # Follow-ups are always free text
+        return NextQuestionOut(question=QuestionResponse(text=follow_up, type="text", choices=None))
+
+    # Branches are keyed on the base answer, also when this answer completes its follow-up
+    base_answer = state.base_answer if is_answering_followup else answer_value
+    next_idx = next_node(survey, current_idx, base_answer)
+    next_question = questions[next_idx] if next_idx < len(questions) else None
+    await flow_state.record_answer_and_advance(
+        db,
+        response_id,
+        state,
+        question_idx=current_idx,
+        question_text=state.followup_text if state.followup_text is not None else current_question_text,
+        is_followup=is_answering_followup,
+        answer=answer_value,
+        next_question_idx=next_idx,
+        next_question_text=next_question.text if next_question else None,
+    )
+    if not is_answering_followup:
+        live_stats.record_answer(state.survey_instance_id, current_idx, answer_value)
 
-    # If we just answered a follow-up or skipped, move to next base question
-    if is_answering_followup or answer_in.skipped:
-        # Move to the next question
-        survey_response = await survey_response_crud.increment_current_index(db, response_id=response_id)
-        current_idx = survey_response.current_index
+    if next_question is None:
+        live_stats.record_response_finished(state.survey_instance_id)
+        return NextQuestionOut(done=True)
+    return NextQuestionOut(question=_question_out(next_question))
 
-        # Check if we've reached the end of the survey
-        if current_idx >= len(questions):
-            await survey_response_crud.mark_finished(db, response_id=response_id)
-            return NextQuestionOut(done=True)
 
-        # Get the next base question
-        next_question = questions[current_idx]
+@router.get("/responses/{response_id}/followups", response_model=list[LateFollowupOut])
+async def list_late_followups(
+    response_id: UUID = Path(...),
+    db: AsyncSession = Depends(get_async_session),
+) -> list[LateFollowupOut]:
+    """
+    List follow-ups that were generated after the participant had already moved on.
 
-        # Create an empty answer entry for the next question
-        await survey_answer_crud.create(
-            db,
-            obj_in={
-                "response_id": response_id,
-                "question_idx": current_idx,
-                "question_text": next_question.get("text", ""),
-                "is_followup": False,
-            },
-        )
+    These are produced when follow-up generation misses ``FOLLOWUP_DEADLINE_MS`` and
+    ``FOLLOWUP_LATE_MODE`` is ``"offer"``. Clients may show them at any point, e.g.
+    before the thank-you screen.
+    """
+    survey_response = await survey_response_crud.get(db, id=response_id)
+    if not survey_response:
+        raise HTTPException(status_code=404, detail="Survey response not found")
+    return _late_followups_out(survey_response.meta)
 
-        return NextQuestionOut(
-            question=QuestionResponse(
-                text=next_question.get("text", ""),
-                type=next_question.get("type", "text"),
-                choices=next_question.get("choices"),
-            )
-        )
 
-    # If not skipped and not a follow-up, check if we need a follow-up question
-    survey_description = survey.title
+@router.post("/responses/{response_id}/followups/{question_idx}/answer", response_model=list[LateFollowupOut])
+async def answer_late_followup(
+    answer_in: AnswerIn,
+    response_id: UUID = Path(...),
+    question_idx: int = Path(...),
+    db: AsyncSession = Depends(get_async_session),
+) -> list[LateFollowupOut]:
+    """Answer (or skip) a late follow-up and return the offers that are still open."""
+    survey_response = await survey_response_crud.get(db, id=response_id)
+    if not survey_response:
+        raise HTTPException(status_code=404, detail="Survey response not found")
 
-    # Check if this question allows follow-ups
-    can_followup = current_base_question.get("can_followup", True)
+    offers = _late_followups_out(survey_response.meta)
+    offer = next((offer for offer in offers if offer.question_idx == question_idx), None)
+    if offer is None:
+        raise HTTPException(status_code=404, detail="Follow-up not found")
 
-    # Only generate follow-up if the question allows it
-    follow_up = None
-    if can_followup:
-        follow_up = await get_followup_question(
-            survey_description=survey_description,
-            question_text=current_question_text,
-            participant_answer=answer_value,
-            question_description=current_question_description,
+    async with unit_of_work(db):
+        await survey_response_crud.answer_late_followup(
+            db,
+            response_id=response_id,
+            question_idx=question_idx,
+            followup_text=offer.question.text,
+            answer=None if answer_in.skipped else answer_in.answer,
         )
+    return [remaining for remaining in offers if remaining is not offer]
 
-    if follow_up:
-        # Check if a follow-up question entry already exists
-        existing_followup = await survey_answer_crud.get_by_response_and_question(
-            db, response_id=response_id, question_idx=current_idx, is_followup=True
-        )
 
-        if existing_followup:
-            # Update the existing follow-up instead of creating a new one
-            await survey_answer_crud.update(
-                db,
-                db_obj=existing_followup,
-                obj_in={"question_text": follow_up},
-            )
-        else:
-            # Create a new follow-up question entry
-            await survey_answer_crud.create(
-                db,
-                obj_in={
-                    "response_id": response_id,
-                    "question_idx": current_idx,
-                    "question_text": follow_up,
-                    "is_followup": True,
-                },
-            )
-
-        # Return the follow-up question
-        return NextQuestionOut(
-            question=QuestionResponse(
-                text=follow_up,
-                type="text",  # Follow-ups are always free text
-                choices=None,
-            )
-        )
-    else:
-        # No follow-up needed, move to the next question
-        survey_response = await survey_response_crud.increment_current_index(db, response_id=response_id)
-        current_idx = survey_response.current_index
+async def _get_survey(db: AsyncSession, survey_id: UUID) -> CompiledSurvey | None:
+    """Fetch the compiled survey, turning an unusable schema into a 400."""
+    try:
+        return await get_compiled_survey(db, survey_id)
+    except InvalidSurveySchemaError as err:
+        raise HTTPException(status_code=400, detail=str(err)) from err
 
-        # Check if we've reached the end of the survey
-        if current_idx >= len(questions):
-            await survey_response_crud.mark_finished(db, response_id=response_id)
-            return NextQuestionOut(done=True)
 
-        # Get the next base question
-        next_question = questions[current_idx]
+def _late_followups_out(meta: dict | None) -> list[LateFollowupOut]:
+    """Turn the pending offers stored on a response into API objects, ordered by question."""
+    late_followups = (meta or {}).get("late_followups") or {}
+    return [
+        LateFollowupOut(question_idx=int(idx), question=QuestionResponse(text=text, type="text", choices=None))
+        for idx, text in sorted(late_followups.items(), key=lambda item: int(item[0]))
+    ]
 
-        # Create an empty answer entry for the next question
-        await survey_answer_crud.create(
-            db,
-            obj_in={
-                "response_id": response_id,
-                "question_idx": current_idx,
-                "question_text": next_question.get("text", ""),
-                "is_followup": False,
-            },
-        )
 
-        return NextQuestionOut(
-            question=QuestionResponse(
-                text=next_question.get("text", ""),
-                type=next_question.get("type", "text"),
-                choices=next_question.get("choices"),
-            )
-        )
+def _question_out(question: Question) -> QuestionResponse:
+    """Shape a schema question for the frontend."""
+    return QuestionResponse(
+        text=question.text,
+        type=question.type,
+        choices=list(question.choices) if question.choices is not None else None,
+    )
@@ -1,20 +1,23 @@
-import io
 import uuid
 
-import qrcode
-import qrcode.image.svg
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import decode_cursor, encode_cursor
 from app.crud.link import link_crud
 from app.crud.survey_instance import survey_instance_crud
 from app.crud.survey_response import survey_response_crud
-from app.db.session import get_async_session
-from app.schemas.link import LinkCreate
+from app.db.session import get_async_session, get_read_session, unit_of_work
+from app.schemas.link import LinkBulkCreate, LinkCreate, QRFormat
 from app.schemas.survey_response import SurveyResponseRead
+from app.services import link_bundles, qr_codes
+from app.services.link_bundles import LINK_BUNDLE_MEDIA_TYPES, LinkBundleFormat, MintedLink, link_url
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 1000  # Responses per page when a cursor is passed without a limit
+
 
 @router.post("/link", response_model=dict[str, str])
 async def create_survey_link(
@@ -35,27 +38,103 @@ async def create_survey_link(
     link = await link_crud.create(db, obj_in=link_in)
 
     # Generate URL
-    url = f"/l/{link.id}"
-
-    # Generate QR code
-    factory = qrcode.image.svg.SvgImage
-    img = qrcode.make(url, image_factory=factory)
+    url = link_url(link.id)
 
-    # Convert QR code to SVG string
-    stream = io.BytesIO()
-    img.save(stream)
-    qr_svg = stream.getvalue().decode()
+    # Generate QR code off the event loop
+    qr_svg = (await qr_codes.render_qr(url, QRFormat.SVG)).decode()
 
     return {"url": url, "qr_svg": qr_svg}
 
 
-@router.get("/{id}/responses", response_model=list[SurveyResponseRead])
+@router.post("/link/bulk")
+async def create_survey_links_bulk(
+    *,
+    links_in: LinkBulkCreate,
+    format: LinkBundleFormat = LinkBundleFormat.ZIP,
+    db: AsyncSession = Depends(get_async_session),
+) -> StreamingResponse:
+    """
+    Mint one link per attendee of a survey instance and stream them back with their QR codes.
+
+    All links are inserted with a single statement and committed before anything is
+    sent. ``format=zip`` returns an archive with a ``links.csv`` manifest and the QR
+    images; ``format=ndjson`` one JSON object per link with the images inline. QR
+    codes are rendered in ``QR_RENDER_PROCESSES`` processes and streamed in order.
+    """
+    survey_instance = await survey_instance_crud.get(db, id=links_in.survey_instance_id)
+    if not survey_instance:
+        raise HTTPException(
+            status_code=404,
+            detail="Survey instance not found",
+        )
+
+    async with unit_of_work(db):
+        link_ids = await link_crud.create_many(
+            db,
+            org_id=survey_instance.org_id,
+            survey_instance_id=survey_instance.id,
+            count=len(links_in.attendees),
+            expires_at=links_in.expires_at,
+        )
+    links = [
+        MintedLink(id=link_id, url=link_url(link_id), attendee=attendee)
+        for link_id, attendee in zip(link_ids, links_in.attendees, strict=True)
+    ]
+
+    response = StreamingResponse(
+        link_bundles.iter_link_bundle(
+            links, format, links_in.qr_formats, box_size=links_in.box_size, border=links_in.border
+        ),
+        media_type=LINK_BUNDLE_MEDIA_TYPES[format],
+    )
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename=survey_instance_{survey_instance.id}_links.{format.value}"
+    )
+
+    return response
+
+
+@router.get(
+    "/{id}/responses",
+    response_model=None,
+    responses={200: {"model": list[SurveyResponseRead]}},
+)
 async def get_survey_instance_responses(
     *,
     id: uuid.UUID,
-    db: AsyncSession = Depends(get_async_session),
-) -> list[SurveyResponseRead]:
-    """Get all responses for a specific survey instance."""
+    limit: int | None = Query(None, ge=1, le=5000),
+    cursor: str | None = None,
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_read_session),
+) -> JSONResponse:
+    """
+    Get the responses for a specific survey instance, ordered by start time.
+
+    Without ``limit`` and ``cursor`` every response is returned, as before paging was
+    added. With either, one page is returned (``DEFAULT_PAGE_SIZE`` responses unless
+    ``limit`` says otherwise), and when more responses exist the ``X-Next-Cursor``
+    header holds the ``cursor`` for the next page. ``fields`` is a comma-separated
+    subset of the response fields to return, e.g. ``id,submitted_at``; answers are only
+    loaded when requested. Each page is read with a single query.
+    """
+    selected = None
+    if fields:
+        selected = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = selected - SurveyResponseRead.model_fields.keys()
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as err:
+        raise HTTPException(
+            status_code=400,
+            detail=str(err),
+        ) from err
+
     # Verify survey instance exists
     survey_instance = await survey_instance_crud.get(db, id=id)
     if not survey_instance:
@@ -64,31 +143,28 @@ async def get_survey_instance_responses(
             detail="Survey instance not found",
         )
 
-    # Get responses for the survey instance
-    responses = await survey_response_crud.get_by_survey_instance_id(db, survey_instance_id=id)
-
-    # Explicitly load related entities and prepare the data for validation
-    result = []
-    for response in responses:
-        # Eagerly load the answers relationship
-        await db.refresh(response, ["answers"])
-
-        # Get the survey instance to access org_id
-        survey_instance = await survey_instance_crud.get(db, id=response.survey_instance_id)
-
-        # Create a dict with the required fields for SurveyResponseRead
-        response_data = {
-            "id": response.id,
-            "org_id": survey_instance.org_id,
-            "survey_instance_id": response.survey_instance_id,
-            "submitted_at": response.finished_at
-            or response.started_at,  # Use finished_at if available, else started_at
-            "email_hash": None,  # Default value
-            "answers": {answer.question_text: answer.answer for answer in response.answers},
-            "score": None,  # Default value
-        }
-
-        # Validate the response data
-        result.append(SurveyResponseRead.model_validate(response_data))
-
-    return result
+    if limit is None and cursor is not None:
+        limit = DEFAULT_PAGE_SIZE
+    include_answers = selected is None or "answers" in selected
+    rows = await survey_response_crud.get_page_by_survey_instance_id(
+        db, survey_instance_id=id, limit=limit, after=after, include_answers=include_answers
+    )
+
+    result = [
+        SurveyResponseRead(
+            id=row.id,
+            org_id=survey_instance.org_id,
+            survey_instance_id=row.survey_instance_id,
+            submitted_at=row.submitted_at,
+            email_hash=None,
+            answers=row.answers if include_answers else {},
+            score=None,
+        ).model_dump(mode="json", include=selected)
+        for row in rows
+    ]
+
+    headers = {}
+    if limit is not None and len(rows) == limit:
+        last = rows[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.started_at, last.id)
+    return JSONResponse(content=result, headers=headers)
@@ -4,8 +4,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.survey import survey_crud
-from app.db.session import get_async_session
+from app.db.session import get_async_session, get_read_session
 from app.schemas.survey import SurveyCreate, SurveyRead, SurveyUpdate
+from app.services.public_form_cache import invalidate_survey_forms
+from app.services.survey_cache import InvalidSurveySchemaError, compile_survey, invalidate_survey
 
 router = APIRouter()
 
@@ -23,7 +25,7 @@ async def create_survey(
 
 @router.get("/", response_model=list[SurveyRead])
 async def get_surveys(
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ) -> list[SurveyRead]:
     """List all surveys."""
     surveys = await survey_crud.get_multi(db)
@@ -68,6 +70,8 @@ async def update_survey(
         )
 
     survey = await survey_crud.update(db, db_obj=survey, obj_in=survey_in)
+    invalidate_survey(survey.id)
+    invalidate_survey_forms(survey.id)
     return survey
 
 
@@ -77,7 +81,12 @@ async def publish_survey(
     id: UUID,
     db: AsyncSession = Depends(get_async_session),
 ) -> SurveyRead:
-    """Publish a survey, marking it as unchangeable."""
+    """
+    Publish a survey, marking it as unchangeable.
+
+    The schema is compiled into the survey flow graph here and stored with the
+    survey, so an invalid schema or routing is rejected before the survey goes live.
+    """
     survey = await survey_crud.get(db, id=id)
     if not survey:
         raise HTTPException(
@@ -91,7 +100,17 @@ async def publish_survey(
             detail="Survey is already published",
         )
 
-    # Update the is_published field
-    survey_update = SurveyUpdate(is_published=True)
+    try:
+        compiled = compile_survey(survey).model_copy(update={"is_published": True})
+    except InvalidSurveySchemaError as err:
+        raise HTTPException(
+            status_code=400,
+            detail=str(err),
+        ) from err
+
+    # Update the is_published field and store the compiled flow
+    survey_update = {"is_published": True, "compiled_flow": compiled.model_dump(mode="json")}
     survey = await survey_crud.update(db, db_obj=survey, obj_in=survey_update)
+    invalidate_survey(survey.id)
+    invalidate_survey_forms(survey.id)
     return survey
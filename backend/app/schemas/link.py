@@ -1,7 +1,10 @@
 from datetime import datetime
+from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
 
 
 class LinkBase(BaseModel):
@@ -24,3 +27,20 @@ class LinkRead(LinkBase):
     id: UUID
 
     model_config = {"from_attributes": True}
+
+
+class QRFormat(str, Enum):
+    SVG = "svg"
+    PNG = "png"
+
+
+class LinkBulkCreate(BaseModel):
+    """Request schema for minting one link per attendee of a survey instance, e.g. for badges"""
+
+    survey_instance_id: UUID
+    expires_at: datetime | None = None
+    # Returned next to each link, e.g. a badge number or name; may repeat or be empty
+    attendees: list[str] = Field(min_length=1, max_length=settings.LINK_MINT_MAX_LINKS)
+    qr_formats: list[QRFormat] = Field(default=[QRFormat.SVG], min_length=1)
+    box_size: int = Field(default=10, ge=1, le=50)  # Pixels per QR module in PNGs and SVG dimensions
+    border: int = Field(default=4, ge=0, le=20)  # Quiet zone in modules
@@ -0,0 +1,101 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class InstanceStats(BaseModel):
+    """Response figures for one survey instance"""
+
+    instance_id: UUID
+    survey_id: UUID
+    total_responses: int
+    completed_responses: int
+    completion_percentage: float
+    average_score: float | None = None
+
+
+class EventStats(BaseModel):
+    """Response figures for an event, overall and per survey instance"""
+
+    event_id: UUID
+    total_responses: int
+    completed_responses: int
+    completion_percentage: float
+    average_score: float | None = None
+    instances: list[InstanceStats]
+
+
+class QuestionLiveStats(BaseModel):
+    """Answer figures for one question of a survey instance, as pushed to live dashboards"""
+
+    question_idx: int
+    question_text: str
+    answered: int
+    average_score: float | None = None  # Mean of the numeric answers
+    distribution: dict[str, int] | None = None  # Rating and choice questions only
+
+
+class InstanceLiveStats(BaseModel):
+    """Live response figures for one survey instance"""
+
+    instance_id: UUID
+    survey_id: UUID
+    started_responses: int
+    finished_responses: int
+    questions: list[QuestionLiveStats]
+
+
+class LiveEventStats(BaseModel):
+    """Live response figures for an event, overall and per survey instance"""
+
+    event_id: UUID
+    started_responses: int
+    finished_responses: int
+    completion_percentage: float
+    instances: list[InstanceLiveStats]
+
+
+class QuestionStats(BaseModel):
+    """Answer figures for one question of a survey instance, read from its rollup"""
+
+    question_idx: int
+    question_text: str
+    question_type: str
+    reached: int  # Responses that were shown the question
+    answered: int
+    skip_rate: float  # Share of ``reached`` without an answer; includes responses still on the question
+    average_score: float | None = None  # Mean of the numeric answers
+    distribution: dict[str, int] | None = None  # Rating and choice questions only
+    followups: int  # Follow-ups asked
+    followup_rate: float  # Follow-ups asked per answer
+    followups_answered: int
+
+
+class InstanceQuestionStats(BaseModel):
+    """Per-question figures for a survey instance"""
+
+    survey_instance_id: UUID
+    survey_id: UUID
+    refreshed_at: datetime | None = None  # When the rollups were last recomputed; ``None`` if never
+    questions: list[QuestionStats]
+
+
+class QuestionAnalysis(BaseModel):
+    """Sentiment and themes found in one question's free-text answers and follow-up replies"""
+
+    question_idx: int
+    question_text: str
+    analyzed: int  # Answers with an analysis
+    sentiment: dict[str, int]  # Answers per sentiment: positive, neutral and negative
+    themes: dict[str, int]  # Most frequent themes first, with their number of answers
+
+
+class InstanceAnalysis(BaseModel):
+    """Summary of the free-text answer analysis of a survey instance"""
+
+    survey_instance_id: UUID
+    survey_id: UUID
+    pending: int  # Text answers not analyzed yet
+    running: bool  # Whether an analysis run is in progress on this worker
+    questions: list[QuestionAnalysis]
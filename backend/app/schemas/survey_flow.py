@@ -1,8 +1,10 @@
 import uuid
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
 
 
 # Base models
@@ -10,11 +12,48 @@ class Question(BaseModel):
     """Base schema for survey question"""
 
     text: str
-    type: str
-    choices: list[str] | None = None
+    type: str = "text"
+    choices: tuple[str, ...] | None = None
     description: str = ""
     can_followup: bool = True
 
+    model_config = {"frozen": True}
+
+
+BranchOp = Literal["equals", "not_equals", "in", "not_in", "contains", "gt", "gte", "lt", "lte", "answered", "skipped"]
+
+
+class Branch(BaseModel):
+    """A conditional transition taken when the answer satisfies ``op`` against ``value``"""
+
+    op: BranchOp
+    value: Any = None
+    target: int
+
+    model_config = {"frozen": True}
+
+
+class FlowNode(BaseModel):
+    """Transitions out of one question; targets are node ids and ``len(flow)`` ends the survey"""
+
+    next: int
+    branches: tuple[Branch, ...] = ()
+
+    model_config = {"frozen": True}
+
+
+class CompiledSurvey(BaseModel):
+    """Validated, immutable view of a survey's schema used by the survey flow"""
+
+    id: uuid.UUID
+    title: str
+    is_published: bool
+    questions: tuple[Question, ...]
+    flow: tuple[FlowNode, ...]
+    format_version: int
+
+    model_config = {"frozen": True}
+
 
 class QuestionResponse(BaseModel):
     """Schema for question sent to frontend in API responses"""
@@ -45,6 +84,28 @@ class SurveyResponseUpdate(BaseModel):
     finished_at: datetime | None = None
 
 
+class PendingAnswer(BaseModel):
+    """An answer held in the flow-state store until the response completes"""
+
+    question_idx: int
+    question_text: str
+    is_followup: bool = False
+    answer: dict[str, Any] | None = None
+
+
+class FlowState(BaseModel):
+    """Cursor of an in-progress response, as kept by the flow-state store"""
+
+    survey_id: uuid.UUID
+    survey_instance_id: uuid.UUID | None = None
+    current_index: int = 0
+    finished: bool = False
+    base_answer: dict[str, Any] | None = None  # Answer to the current question while its follow-up is open
+    followup_text: str | None = None  # Open follow-up question for the current question
+    pending_answers: list[PendingAnswer] = []  # Only with FLOW_STATE_WRITE_MODE="completion"
+    buffered: bool = False  # Answers are held in pending_answers until completion; set when the response starts
+
+
 class SurveyResponseRead(SurveyResponseBase):
     """Schema for reading survey response"""
 
@@ -110,3 +171,50 @@ class NextQuestionOut(BaseModel):
 
     done: bool = False
     question: QuestionResponse | None = None
+
+
+class LateFollowupOut(BaseModel):
+    """A follow-up question that arrived after the participant had moved on"""
+
+    question_idx: int
+    question: QuestionResponse
+
+
+class BulkAnswerIn(BaseModel):
+    """One base answer recorded by an offline client"""
+
+    question_idx: int
+    answer: dict[str, Any] | None = None
+    skipped: bool = False
+
+
+class BulkResponseIn(BaseModel):
+    """A complete response recorded by an offline client under an ID it chose"""
+
+    id: uuid.UUID
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    answers: list[BulkAnswerIn] = []
+
+
+class BulkResponsesIn(BaseModel):
+    """Request schema for uploading queued responses in one go"""
+
+    responses: list[BulkResponseIn] = Field(min_length=1, max_length=settings.BULK_INGEST_MAX_RESPONSES)
+
+
+class BulkResponseResult(BaseModel):
+    """Outcome for one uploaded response, in request order"""
+
+    id: uuid.UUID
+    status: Literal["created", "duplicate", "conflict", "invalid"]
+    detail: str | None = None
+
+
+class BulkResponsesOut(BaseModel):
+    """Response schema for a bulk upload"""
+
+    created: int
+    duplicates: int
+    rejected: int
+    results: list[BulkResponseResult]
@@ -0,0 +1,401 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from typing import Any, NamedTuple
+from uuid import UUID
+
+import httpx
+from langchain.chat_models.base import BaseChatModel
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.answer_analysis import answer_analysis_crud
+from app.crud.survey_instance import survey_instance_crud
+from app.db.session import SessionLocal, unit_of_work
+from app.schemas.stats import InstanceAnalysis, QuestionAnalysis
+from app.schemas.survey_flow import CompiledSurvey, Question
+from app.services.event_stats import has_distribution
+from app.services.llm_provider import get_llm_provider
+from app.services.survey_cache import InvalidSurveySchemaError, get_compiled_survey
+
+logger = logging.getLogger(__name__)
+
+SENTIMENTS = ("positive", "neutral", "negative")
+
+# Format the system prompt to instruct the model
+SYSTEM_PROMPT = """You are an expert survey analyst.
+        You will get one survey question and a JSON list of participants' answers to it, each with an "id".
+        Answers with a "followup_question" reply to that follow-up instead of the question itself.
+
+        For every answer, decide its overall sentiment (positive, neutral or negative) and list up to
+        {max_themes} themes it mentions as short lower-case labels of one to three words, such as "session length".
+        Use the same label for the same theme across answers. Answers without a clear theme get an empty list.
+
+        Respond with a JSON list only, one object per answer:
+        [{{"id": 1, "sentiment": "negative", "themes": ["session length"]}}]
+        """
+
+
+class AnalysisMetrics:
+    """Counters for free-text answer analysis, exposed through the metrics endpoint."""
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.failed_runs = 0
+        self.batches = 0
+        self.errors = 0
+        self.invalid_outputs = 0
+        self.in_flight = 0
+        self.answers_analyzed = 0
+        self.cache_hits = 0
+        self.llm_latency_total = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        completed = self.batches - self.errors
+        return {
+            "runs": self.runs,
+            "running": sum(not run.done() for run in _runs.values()),
+            "failed_runs": self.failed_runs,
+            "batches": self.batches,
+            "errors": self.errors,
+            "invalid_outputs": self.invalid_outputs,
+            "in_flight": self.in_flight,
+            "max_concurrency": settings.ANALYSIS_MAX_CONCURRENCY,
+            "answers_analyzed": self.answers_analyzed,
+            "cache_hits": self.cache_hits,
+            "llm_latency_avg_ms": self.llm_latency_total / completed * 1000 if completed > 0 else 0.0,
+        }
+
+
+class _Item(NamedTuple):
+    """One distinct answer text of a question, and every answer that has it."""
+
+    key: str
+    text: str
+    followup_question: str | None
+    answer_ids: list[UUID]
+
+
+_metrics = AnalysisMetrics()
+_limiter: asyncio.Semaphore | None = None
+_http_client: httpx.AsyncClient | None = None
+_llm: BaseChatModel | None = None
+_runs: dict[UUID, asyncio.Task[int]] = {}
+
+
+def _get_limiter() -> asyncio.Semaphore:
+    global _limiter  # noqa: PLW0603
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(settings.ANALYSIS_MAX_CONCURRENCY)
+    return _limiter
+
+
+def _stub_analysis(messages: Sequence[BaseMessage]) -> str:
+    """Stub reply calling every answer of the batch neutral, without themes."""
+    answers = re.search(r"Answers: (.*)", str(messages[-1].content))
+    count = len(json.loads(answers.group(1))) if answers else 0
+    return json.dumps([{"id": number, "sentiment": "neutral", "themes": []} for number in range(1, count + 1)])
+
+
+def _get_llm() -> BaseChatModel:
+    """
+    Return the process-wide analysis model.
+
+    It has its own connection pool so long batch requests never hold up the
+    latency-sensitive follow-up calls.
+    """
+    global _http_client, _llm  # noqa: PLW0603
+    if _llm is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.ANALYSIS_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.ANALYSIS_MAX_CONCURRENCY,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+        _llm = get_llm_provider().chat_model(
+            temperature=0.0,  # The same answer should get the same labels
+            http_client=_http_client,
+            timeout=settings.ANALYSIS_TIMEOUT_SECONDS,
+            stub_reply=_stub_analysis,
+        )
+    return _llm
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def make_key(question_text: str, followup_question: str | None, answer_text: str) -> str:
+    """Hash everything an answer's analysis depends on, including the model name."""
+    payload = {
+        "model": settings.CHAT_MODEL,
+        "question": _normalize(question_text),
+        "followup": _normalize(followup_question or ""),
+        "answer": _normalize(answer_text),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _skip_questions(survey: CompiledSurvey) -> list[int]:
+    """Questions whose base answers are picked from choices rather than written."""
+    return [idx for idx, question in enumerate(survey.questions) if has_distribution(question)]
+
+
+def _build_messages(survey: CompiledSurvey, question: Question, items: Sequence[_Item]) -> list[BaseMessage]:
+    answers = [
+        {"id": number, "answer": item.text}
+        | ({"followup_question": item.followup_question} if item.followup_question else {})
+        for number, item in enumerate(items, start=1)
+    ]
+    human_prompt = f"""
+        Survey: {survey.title}
+
+        Question: {question.text}
+        """
+
+    # Add question description if available
+    if question.description:
+        human_prompt += f"\n\nQuestion context: {question.description}"
+
+    human_prompt += f"""
+
+        Answers: {json.dumps(answers, ensure_ascii=False)}
+        """
+    return [
+        SystemMessage(content=SYSTEM_PROMPT.format(max_themes=settings.ANALYSIS_MAX_THEMES)),
+        HumanMessage(content=human_prompt),
+    ]
+
+
+def _parse_analyses(content: str, count: int) -> dict[int, tuple[str, list[str]]]:
+    """
+    Read the model's JSON list into ``{answer number: (sentiment, themes)}``.
+
+    Entries with an unknown number or sentiment are dropped; their answers stay
+    pending and are sent again by the next run.
+    """
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.strip("`").removeprefix("json").strip()
+    try:
+        entries = json.loads(content)
+    except ValueError:
+        return {}
+    if not isinstance(entries, list):
+        return {}
+
+    analyses = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        number, sentiment, themes = entry.get("id"), entry.get("sentiment"), entry.get("themes")
+        if not isinstance(number, int) or not 1 <= number <= count or not isinstance(sentiment, str):
+            continue
+        sentiment = sentiment.strip().lower()
+        if sentiment not in SENTIMENTS:
+            continue
+        if not isinstance(themes, list):
+            themes = []
+        labels = [_normalize(theme) for theme in themes if isinstance(theme, str) and theme.strip()]
+        analyses[number] = (sentiment, list(dict.fromkeys(labels))[: settings.ANALYSIS_MAX_THEMES])
+    return analyses
+
+
+async def _analyze_batch(survey: CompiledSurvey, question: Question, items: Sequence[_Item]) -> list[dict[str, Any]]:
+    """Analyze one batch of a question's answers with a single LLM call and return the rows to store."""
+    messages = _build_messages(survey, question, items)
+    _metrics.batches += 1
+    try:
+        # All of a run's batches are queued at once, so only the call itself is timed
+        async with _get_limiter():
+            started_at = time.perf_counter()
+            _metrics.in_flight += 1
+            try:
+                async with asyncio.timeout(settings.ANALYSIS_TIMEOUT_SECONDS):
+                    response = await _get_llm().ainvoke(messages)
+            finally:
+                _metrics.in_flight -= 1
+            _metrics.llm_latency_total += time.perf_counter() - started_at
+    except TimeoutError:
+        _metrics.errors += 1
+        logger.warning(f"Answer analysis batch exceeded {settings.ANALYSIS_TIMEOUT_SECONDS}s, leaving it pending")
+        return []
+    except Exception as e:
+        _metrics.errors += 1
+        logger.error(f"Error analyzing answers: {e}")
+        return []
+
+    analyses = _parse_analyses(str(response.content), len(items))
+    if len(analyses) < len(items):
+        _metrics.invalid_outputs += 1
+        logger.warning(f"Answer analysis covered {len(analyses)} of {len(items)} answers, leaving the rest pending")
+    rows: list[dict[str, Any]] = []
+    for number, (sentiment, themes) in analyses.items():
+        item = items[number - 1]
+        rows.extend(
+            {"answer_id": answer_id, "key": item.key, "sentiment": sentiment, "themes": themes}
+            for answer_id in item.answer_ids
+        )
+    return rows
+
+
+async def _save(rows: Sequence[dict[str, Any]]) -> None:
+    if rows:
+        async with SessionLocal() as db, unit_of_work(db):
+            await answer_analysis_crud.insert_many(db, rows=rows)
+        _metrics.answers_analyzed += len(rows)
+
+
+async def analyze_survey_instance(survey_instance_id: UUID) -> int:
+    """
+    Analyze the text answers of a survey instance that have none yet and return how many were stored.
+
+    Answers whose hash was analyzed before, in any instance, reuse that analysis.
+    The others are grouped by question, so a request shares the question's context,
+    and sent ``ANALYSIS_BATCH_SIZE`` distinct texts at a time with at most
+    ``ANALYSIS_MAX_CONCURRENCY`` requests in flight. Each batch is stored as soon as it
+    comes back; batches that fail stay pending for the next run.
+    """
+    async with SessionLocal() as db:
+        instance = await survey_instance_crud.get(db, id=survey_instance_id)
+        survey = await get_compiled_survey(db, instance.survey_id) if instance else None
+        if survey is None:
+            return 0
+        pending = await answer_analysis_crud.get_pending(
+            db,
+            survey_instance_id=survey_instance_id,
+            skip_questions=_skip_questions(survey),
+            limit=settings.ANALYSIS_MAX_ANSWERS_PER_RUN,
+        )
+
+        items_by_question: dict[int, dict[str, _Item]] = defaultdict(dict)
+        for row in pending:
+            if row.question_idx >= len(survey.questions):
+                continue  # the question was removed after it was answered
+            followup_question = row.question_text if row.is_followup else None
+            key = make_key(survey.questions[row.question_idx].text, followup_question, row.text)
+            item = items_by_question[row.question_idx].setdefault(key, _Item(key, row.text, followup_question, []))
+            item.answer_ids.append(row.id)
+
+        keys = [key for items in items_by_question.values() for key in items]
+        cached = await answer_analysis_crud.get_by_keys(db, keys=keys) if keys else {}
+
+    cached_rows = [
+        {"answer_id": answer_id, "key": key, "sentiment": analysis.sentiment, "themes": analysis.themes}
+        for items in items_by_question.values()
+        for key, item in items.items()
+        if (analysis := cached.get(key)) is not None
+        for answer_id in item.answer_ids
+    ]
+    _metrics.cache_hits += len(cached_rows)
+    await _save(cached_rows)
+
+    async def analyze_and_save(question_idx: int, items: Sequence[_Item]) -> int:
+        rows = await _analyze_batch(survey, survey.questions[question_idx], items)
+        await _save(rows)
+        return len(rows)
+
+    batches = []
+    for question_idx, items in items_by_question.items():
+        uncached = [item for key, item in items.items() if key not in cached]
+        for start in range(0, len(uncached), settings.ANALYSIS_BATCH_SIZE):
+            batches.append(analyze_and_save(question_idx, uncached[start : start + settings.ANALYSIS_BATCH_SIZE]))
+    analyzed = await asyncio.gather(*batches)
+    return len(cached_rows) + sum(analyzed)
+
+
+async def _run(survey_instance_id: UUID) -> int:
+    _metrics.runs += 1
+    try:
+        return await analyze_survey_instance(survey_instance_id)
+    except (OSError, SQLAlchemyError, InvalidSurveySchemaError) as e:
+        _metrics.failed_runs += 1
+        logger.error(f"Analyzing answers of survey instance {survey_instance_id} failed: {e}")
+        return 0
+
+
+def start_analysis(survey_instance_id: UUID) -> bool:
+    """Analyze a survey instance's pending answers in the background; ``False`` if a run is already going."""
+    if is_running(survey_instance_id):
+        return False
+    run = _runs[survey_instance_id] = asyncio.create_task(_run(survey_instance_id))
+    run.add_done_callback(
+        lambda _: _runs.pop(survey_instance_id, None) if _runs.get(survey_instance_id) is run else None
+    )
+    return True
+
+
+def is_running(survey_instance_id: UUID) -> bool:
+    run = _runs.get(survey_instance_id)
+    return run is not None and not run.done()
+
+
+async def drain_analysis() -> None:
+    """
+    Stop analysis runs and close the analysis model's HTTP client; called on application shutdown.
+
+    Finished batches are already stored, the rest is picked up by the next run.
+    """
+    global _http_client, _llm  # noqa: PLW0603
+    for run in _runs.values():
+        run.cancel()
+    await asyncio.gather(*_runs.values(), return_exceptions=True)
+    _runs.clear()
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _llm = None
+
+
+async def build_analysis_summary(
+    db: AsyncSession, survey_instance_id: UUID, survey: CompiledSurvey
+) -> InstanceAnalysis:
+    """
+    Summarize a survey instance's analyses per question in three aggregate queries.
+
+    Questions answered in writing are listed even before anything was analyzed;
+    choice questions only once their follow-up replies have analyses.
+    """
+    skip_questions = _skip_questions(survey)
+    sentiments: dict[int, Counter[str]] = defaultdict(Counter)
+    for row in await answer_analysis_crud.get_sentiment_counts(db, survey_instance_id=survey_instance_id):
+        sentiments[row.question_idx][row.sentiment] = row.answers
+    themes: dict[int, dict[str, int]] = defaultdict(dict)
+    for row in await answer_analysis_crud.get_top_themes(
+        db, survey_instance_id=survey_instance_id, limit=settings.ANALYSIS_SUMMARY_TOP_THEMES
+    ):
+        themes[row.question_idx][row.theme] = row.answers
+
+    questions = [
+        QuestionAnalysis(
+            question_idx=idx,
+            question_text=survey.questions[idx].text,
+            analyzed=sentiments[idx].total(),
+            sentiment={sentiment: sentiments[idx][sentiment] for sentiment in SENTIMENTS},
+            themes=themes[idx],
+        )
+        for idx in range(len(survey.questions))
+        if idx in sentiments or idx not in skip_questions
+    ]
+    return InstanceAnalysis(
+        survey_instance_id=survey_instance_id,
+        survey_id=survey.id,
+        pending=await answer_analysis_crud.count_pending(
+            db, survey_instance_id=survey_instance_id, skip_questions=skip_questions
+        ),
+        running=is_running(survey_instance_id),
+        questions=questions,
+    )
+
+
+def get_analysis_metrics() -> dict[str, Any]:
+    return _metrics.snapshot()
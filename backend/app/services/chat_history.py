@@ -0,0 +1,60 @@
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, messages_from_dict
+
+from app.core.config import settings
+from app.crud.chat_history import chat_history_crud
+from app.db.session import SessionLocal
+
+
+def to_rows(messages: Sequence[BaseMessage]) -> list[dict[str, Any]]:
+    """Stored form of messages; the same shape as ``chat_history_crud.add_message``, which the history API reads back."""
+    return [{"type": message.type, "data": {"content": message.text()}} for message in messages]
+
+
+class AsyncChatMessageHistory(BaseChatMessageHistory):
+    """
+    Messages of one chat session in the ``chat_history`` table, through the async API only.
+
+    Reads and writes use short sessions from the shared pool, so a chat turn never
+    opens a connection of its own or holds one while the model streams. The latest
+    ``CHAT_HISTORY_WINDOW`` messages are loaded once per turn; the memory saves the
+    human and AI messages of a turn with one ``aadd_messages`` call, one INSERT.
+    """
+
+    def __init__(self, session_id: str, *, window: int | None = None) -> None:
+        self.session_id = session_id
+        self.window = window or settings.CHAT_HISTORY_WINDOW
+        self._messages: list[BaseMessage] | None = None
+
+    @property
+    def messages(self) -> list[BaseMessage]:  # type: ignore[override]
+        raise NotImplementedError("AsyncChatMessageHistory only supports async use (ainvoke, astream)")
+
+    def add_message(self, message: BaseMessage) -> None:
+        raise NotImplementedError("AsyncChatMessageHistory only supports async use (ainvoke, astream)")
+
+    def clear(self) -> None:
+        raise NotImplementedError("AsyncChatMessageHistory only supports async use (ainvoke, astream)")
+
+    async def aget_messages(self) -> list[BaseMessage]:
+        if self._messages is None:
+            async with SessionLocal() as db:
+                rows = await chat_history_crud.get_latest_by_session_id(
+                    db, session_id=self.session_id, limit=self.window
+                )
+            self._messages = messages_from_dict([row.message for row in rows])
+        return list(self._messages)
+
+    async def aadd_messages(self, messages: Sequence[BaseMessage]) -> None:
+        async with SessionLocal() as db:
+            await chat_history_crud.add_messages(db, session_id=self.session_id, messages=to_rows(messages))
+        if self._messages is not None:
+            self._messages = [*self._messages, *messages][-self.window :]
+
+    async def aclear(self) -> None:
+        async with SessionLocal() as db:
+            await chat_history_crud.clear_session_history(db, session_id=self.session_id)
+        self._messages = []
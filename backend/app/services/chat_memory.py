@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import re
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from langchain.chat_models.base import BaseChatModel
+from langchain.memory.utils import get_prompt_input_key
+from langchain_core.memory import BaseMemory
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    get_buffer_string,
+    messages_from_dict,
+)
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+from pydantic import PrivateAttr
+
+from app.core.config import settings
+from app.crud.chat_history import chat_history_crud
+from app.crud.chat_summary import chat_summary_crud
+from app.db.session import SessionLocal
+from app.services.chat_history import to_rows
+from app.services.llm_provider import get_llm_provider
+
+logger = logging.getLogger(__name__)
+
+# Format the system prompt to instruct the model
+SUMMARY_PROMPT = """You progressively summarize a conversation between a user and an AI assistant.
+        You will get the current summary, possibly empty, and the messages that follow it.
+
+        Respond with the new summary only: the current one extended with the new messages,
+        in at most {max_words} words. Keep names, numbers, decisions and open questions;
+        drop greetings and small talk.
+        """
+
+
+class ChatSummaryMetrics:
+    """Counters for chat summarization, exposed through the metrics endpoint."""
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.failed_runs = 0
+        self.calls = 0
+        self.messages_summarized = 0
+        self.llm_latency_total = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "running": sum(not run.done() for run in _runs.values()),
+            "failed_runs": self.failed_runs,
+            "calls": self.calls,
+            "messages_summarized": self.messages_summarized,
+            "llm_latency_avg_ms": self.llm_latency_total / self.calls * 1000 if self.calls > 0 else 0.0,
+        }
+
+
+_metrics = ChatSummaryMetrics()
+_llm: BaseChatModel | None = None
+_runs: dict[str, asyncio.Task[int]] = {}
+
+
+def _budgets() -> tuple[int, int]:
+    """Prompt tokens for the summary and for the verbatim turns."""
+    summary_tokens = settings.CHAT_SUMMARY_MAX_TOKENS // 4
+    return summary_tokens, settings.CHAT_SUMMARY_MAX_TOKENS - summary_tokens
+
+
+def _stub_summary(messages: Sequence[BaseMessage]) -> str:
+    """Stub reply counting the messages summarized so far."""
+    content = str(messages[-1].content)
+    previous = re.search(r"Current summary: (\d+) earlier messages", content)
+    added = len(re.findall(r"^(?:Human|AI): ", content, flags=re.MULTILINE))
+    return f"{int(previous.group(1)) + added if previous else added} earlier messages"
+
+
+def _get_llm() -> BaseChatModel:
+    global _llm  # noqa: PLW0603
+    if _llm is None:
+        _llm = get_llm_provider().chat_model(
+            temperature=0.0,
+            timeout=settings.CHAT_SUMMARY_TIMEOUT_SECONDS,
+            stub_reply=_stub_summary,
+        )
+    return _llm
+
+
+def _fold_count(messages: Sequence[BaseMessage]) -> int:
+    """How many of a session's oldest unsummarized messages to fold into the summary."""
+    keep = min(len(messages), 2 * settings.CHAT_SUMMARY_KEEP_TURNS)
+    _, verbatim_tokens = _budgets()
+    while keep > 2 and count_tokens_approximately(messages[len(messages) - keep :]) > verbatim_tokens:
+        keep -= 2
+    return len(messages) - keep
+
+
+async def _summarize(previous: str | None, messages: Sequence[BaseMessage]) -> str:
+    summary_tokens, _ = _budgets()
+    prompt = [
+        SystemMessage(content=SUMMARY_PROMPT.format(max_words=summary_tokens * 3 // 4)),
+        HumanMessage(content=f"Current summary: {previous or '(none)'}\n\nMessages:\n{get_buffer_string(messages)}"),
+    ]
+    async with asyncio.timeout(settings.CHAT_SUMMARY_TIMEOUT_SECONDS):
+        started_at = time.perf_counter()
+        response = await _get_llm().ainvoke(prompt)
+    _metrics.calls += 1
+    _metrics.llm_latency_total += time.perf_counter() - started_at
+    return str(response.content).strip()
+
+
+async def summarize_session(session_id: str) -> int:
+    """
+    Fold a session's older messages into its stored summary and return how many were folded.
+
+    Everything but the latest ``CHAT_SUMMARY_KEEP_TURNS`` turns that fit the prompt budget
+    is folded, ``CHAT_HISTORY_WINDOW`` messages per LLM call, so a session that fell behind
+    catches up in a few calls. Nothing is held open during the calls.
+    """
+    folded = 0
+    while True:
+        async with SessionLocal() as db:
+            stored = await chat_summary_crud.get_by_session_id(db, session_id=session_id)
+            rows = await chat_history_crud.get_by_session_id(
+                db,
+                session_id=session_id,
+                after_id=stored.last_message_id if stored else None,
+                limit=settings.CHAT_HISTORY_WINDOW + 2 * settings.CHAT_SUMMARY_KEEP_TURNS,
+            )
+        messages = messages_from_dict([row.message for row in rows])
+        count = _fold_count(messages)
+        if count == 0:
+            return folded
+        summary = await _summarize(stored.summary if stored else None, messages[:count])
+        async with SessionLocal() as db:
+            await chat_summary_crud.upsert(
+                db, session_id=session_id, summary=summary, last_message_id=rows[count - 1].id
+            )
+        folded += count
+        _metrics.messages_summarized += count
+
+
+async def _run(session_id: str) -> int:
+    _metrics.runs += 1
+    try:
+        return await summarize_session(session_id)
+    except Exception as e:
+        _metrics.failed_runs += 1
+        logger.error(f"Summarizing chat session {session_id} failed: {e}")
+        return 0
+
+
+def start_summary(session_id: str) -> bool:
+    """Summarize a session in the background; ``False`` if a run is already going, which picks up new turns too."""
+    run = _runs.get(session_id)
+    if run is not None and not run.done():
+        return False
+    run = _runs[session_id] = asyncio.create_task(_run(session_id))
+    run.add_done_callback(lambda _: _runs.pop(session_id, None) if _runs.get(session_id) is run else None)
+    return True
+
+
+async def cancel_summary(session_id: str) -> None:
+    """Stop a session's summarization run, if any, before its history is cleared so it cannot store a summary again."""
+    run = _runs.get(session_id)
+    if run is None:
+        return
+    run.cancel()
+    await asyncio.gather(run, return_exceptions=True)
+
+
+async def drain_chat_summaries() -> None:
+    """
+    Stop summarization runs; called on application shutdown.
+
+    Summaries only ever lag the history, so the next turn of a session catches up.
+    """
+    global _llm  # noqa: PLW0603
+    for run in _runs.values():
+        run.cancel()
+    await asyncio.gather(*_runs.values(), return_exceptions=True)
+    _runs.clear()
+    _llm = None
+
+
+def get_chat_summary_metrics() -> dict[str, Any]:
+    return _metrics.snapshot()
+
+
+class SummaryBufferMemory(BaseMemory):
+    """
+    Chat memory of a session's rolling summary plus its latest turns verbatim, through the async API only.
+
+    A turn loads the stored summary and the latest ``CHAT_SUMMARY_KEEP_TURNS`` turns after
+    it in one short session, trimmed to ``CHAT_SUMMARY_MAX_TOKENS``, and saves its two
+    messages with one INSERT. Older turns are folded into the summary in the background
+    once the response is out, so prompts stay bounded however long a session gets.
+    """
+
+    session_id: str
+    memory_key: str = "history"
+    input_key: str | None = None
+    output_key: str | None = None
+
+    _summary: str | None = PrivateAttr(default=None)
+    _messages: list[BaseMessage] | None = PrivateAttr(default=None)
+
+    @property
+    def memory_variables(self) -> list[str]:
+        return [self.memory_key]
+
+    def load_memory_variables(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        raise NotImplementedError("SummaryBufferMemory only supports async use (ainvoke, astream)")
+
+    def save_context(self, inputs: dict[str, Any], outputs: dict[str, str]) -> None:
+        raise NotImplementedError("SummaryBufferMemory only supports async use (ainvoke, astream)")
+
+    def clear(self) -> None:
+        raise NotImplementedError("SummaryBufferMemory only supports async use (ainvoke, astream)")
+
+    async def aload_memory_variables(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        if self._messages is None:
+            async with SessionLocal() as db:
+                stored = await chat_summary_crud.get_by_session_id(db, session_id=self.session_id)
+                rows = await chat_history_crud.get_latest_by_session_id(
+                    db,
+                    session_id=self.session_id,
+                    after_id=stored.last_message_id if stored else None,
+                    limit=2 * settings.CHAT_SUMMARY_KEEP_TURNS,
+                )
+            self._summary = stored.summary if stored else None
+            self._messages = messages_from_dict([row.message for row in rows])
+
+        history: list[BaseMessage] = []
+        if self._summary:
+            history.append(SystemMessage(content=f"Summary of the earlier conversation: {self._summary}"))
+        recent = trim_messages(
+            self._messages,
+            max_tokens=max(0, settings.CHAT_SUMMARY_MAX_TOKENS - count_tokens_approximately(history)),
+            token_counter=count_tokens_approximately,
+            strategy="last",
+            start_on="human",
+        )
+        return {self.memory_key: [*history, *recent]}
+
+    async def asave_context(self, inputs: dict[str, Any], outputs: dict[str, str]) -> None:
+        input_key = self.input_key or get_prompt_input_key(inputs, self.memory_variables)
+        output_key = self.output_key or next(iter(outputs))
+        messages = [HumanMessage(content=inputs[input_key]), AIMessage(content=outputs[output_key])]
+        async with SessionLocal() as db:
+            await chat_history_crud.add_messages(db, session_id=self.session_id, messages=to_rows(messages))
+
+        unsummarized = [*(self._messages or []), *messages]
+        self._messages = unsummarized[-2 * settings.CHAT_SUMMARY_KEEP_TURNS :]
+        if _fold_count(unsummarized) > 0:
+            start_summary(self.session_id)
+
+    async def aclear(self) -> None:
+        await cancel_summary(self.session_id)
+        async with SessionLocal() as db:
+            await chat_history_crud.clear_session_history(db, session_id=self.session_id)
+        self._summary, self._messages = None, []
@@ -0,0 +1,82 @@
+import json
+import math
+from collections import Counter
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.survey_instance import survey_instance_crud
+from app.schemas.stats import EventStats, InstanceStats
+from app.schemas.survey_flow import Question
+
+
+def _percentage(part: int, whole: int) -> float:
+    return part / whole * 100 if whole else 0.0
+
+
+def has_distribution(question: Question) -> bool:
+    """Whether answer counts per choice are reported for ``question`` (rating and choice questions)."""
+    return question.choices is not None or question.type == "rating"
+
+
+def choice_keys(value: Any) -> list[str]:
+    """Text keys for an answer value, matching the ones Postgres' ``jsonb_array_elements_text`` gives."""
+    values = value if isinstance(value, list) else [value]
+    return [item if isinstance(item, str) else json.dumps(item) for item in values if item is not None]
+
+
+def _sort_key(choice: str) -> tuple[float, str]:
+    try:
+        return float(choice), choice
+    except ValueError:
+        return math.inf, choice
+
+
+def ordered_distribution(question: Question, counts: Counter[str]) -> dict[str, int]:
+    """Listed choices in schema order (also the ones nobody picked), then any other values."""
+    distribution = {choice: counts[choice] for choice in question.choices or ()}
+    for choice in sorted(counts.keys() - distribution.keys(), key=_sort_key):
+        distribution[choice] = counts[choice]
+    return distribution
+
+
+async def get_event_stats(db: AsyncSession, event_id: UUID) -> EventStats:
+    """
+    Build completion and score figures for an event from one aggregate query.
+
+    Completion is the share of started responses that were finished. The event-wide
+    average score weights each instance by its number of scored responses, so it equals
+    the average over all scored responses of the event.
+    """
+    rows = await survey_instance_crud.get_response_stats_by_event(db, event_id=event_id)
+
+    instances = []
+    total_responses = completed_responses = scored_responses = 0
+    score_sum = 0.0
+    for row in rows:
+        average_score = float(row.average_score) if row.average_score is not None else None
+        instances.append(
+            InstanceStats(
+                instance_id=row.instance_id,
+                survey_id=row.survey_id,
+                total_responses=row.total_responses,
+                completed_responses=row.completed_responses,
+                completion_percentage=_percentage(row.completed_responses, row.total_responses),
+                average_score=average_score,
+            )
+        )
+        total_responses += row.total_responses
+        completed_responses += row.completed_responses
+        if average_score is not None:
+            scored_responses += row.scored_responses
+            score_sum += average_score * row.scored_responses
+
+    return EventStats(
+        event_id=event_id,
+        total_responses=total_responses,
+        completed_responses=completed_responses,
+        completion_percentage=_percentage(completed_responses, total_responses),
+        average_score=score_sum / scored_responses if scored_responses else None,
+        instances=instances,
+    )
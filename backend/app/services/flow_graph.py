@@ -0,0 +1,128 @@
+from collections.abc import Sequence
+from typing import Any, cast, get_args
+
+from pydantic import BaseModel, ValidationError
+
+from app.schemas.survey_flow import Branch, BranchOp, CompiledSurvey, FlowNode
+
+END = "end"
+
+
+class RoutingError(ValueError):
+    """Raised when a survey's branching or skip logic cannot be compiled."""
+
+
+class _BranchIn(BaseModel):
+    when: dict[str, Any]
+    goto: str
+
+
+class _RoutingIn(BaseModel):
+    """The routing part of a raw schema question; the rest is parsed as ``Question``."""
+
+    id: str | None = None
+    next: str | None = None
+    branches: list[_BranchIn] = []
+
+
+def answer_value(answer: dict[str, Any] | None) -> Any:
+    """Unwrap the ``{"value": ...}`` envelope the survey flow stores answers in."""
+    if isinstance(answer, dict) and "value" in answer:
+        return answer["value"]
+    return answer
+
+
+def build_flow(raw_questions: Sequence[dict[str, Any]]) -> tuple[FlowNode, ...]:
+    """
+    Compile the routing of a survey's questions into a flow graph.
+
+    Without routing a question leads to the next one. ``next`` names the question (by
+    its ``id``) to go to instead, or ``"end"``. ``branches`` are tried in order before
+    that, e.g. ``{"when": {"lte": 2}, "goto": "why_low"}`` or, to skip ahead when a
+    question was skipped, ``{"when": {"skipped": true}, "goto": "end"}``. Jumps may
+    only go forward, so every path through the survey ends.
+
+    Raises:
+        RoutingError: If an id is repeated, a target is unknown or backwards, or a
+            condition is malformed
+    """
+    try:
+        routings = [_RoutingIn.model_validate(question) for question in raw_questions]
+    except ValidationError as err:
+        raise RoutingError("Invalid question routing") from err
+
+    end = len(routings)
+    node_ids: dict[str, int] = {}
+    for idx, routing in enumerate(routings):
+        if routing.id is None:
+            continue
+        if routing.id == END or routing.id in node_ids:
+            raise RoutingError(f"Question id {routing.id!r} is reserved or repeated")
+        node_ids[routing.id] = idx
+
+    def resolve(idx: int, target: str) -> int:
+        node = end if target == END else node_ids.get(target)
+        if node is None:
+            raise RoutingError(f"Question {idx} leads to unknown question {target!r}")
+        if node <= idx:
+            raise RoutingError(f"Question {idx} leads back to question {node}")
+        return node
+
+    ops = set(get_args(BranchOp))
+    flow = []
+    for idx, routing in enumerate(routings):
+        branches = []
+        for branch in routing.branches:
+            if len(branch.when) != 1 or next(iter(branch.when)) not in ops:
+                raise RoutingError(f"Question {idx} has an invalid condition {branch.when!r}")
+            ((op, value),) = branch.when.items()
+            if op in ("in", "not_in") and not isinstance(value, list):
+                raise RoutingError(f"Question {idx} needs a list for {op!r}")
+            branches.append(Branch(op=cast(BranchOp, op), value=value, target=resolve(idx, branch.goto)))
+        default = idx + 1 if routing.next is None else resolve(idx, routing.next)
+        flow.append(FlowNode(next=default, branches=tuple(branches)))
+    return tuple(flow)
+
+
+def _matches(branch: Branch, value: Any) -> bool:  # noqa: PLR0911
+    if branch.op == "skipped":
+        return (value is None) == bool(branch.value)
+    if branch.op == "answered":
+        return (value is not None) == bool(branch.value)
+    if value is None:
+        return False
+    try:
+        if branch.op == "equals":
+            return bool(value == branch.value)
+        if branch.op == "not_equals":
+            return bool(value != branch.value)
+        if branch.op == "in":
+            return value in branch.value
+        if branch.op == "not_in":
+            return value not in branch.value
+        if branch.op == "contains":
+            return branch.value in value
+        if branch.op == "gt":
+            return bool(value > branch.value)
+        if branch.op == "gte":
+            return bool(value >= branch.value)
+        if branch.op == "lt":
+            return bool(value < branch.value)
+        return bool(value <= branch.value)
+    except TypeError:
+        return False
+
+
+def next_node(survey: CompiledSurvey, node_id: int, answer: dict[str, Any] | None) -> int:
+    """
+    Return the node that follows ``node_id`` for the given base answer.
+
+    The cost depends only on the node's own branches, not on the size of the survey.
+    A result of ``len(survey.questions)`` means the survey is complete.
+    """
+    node = survey.flow[node_id]
+    value = answer_value(answer)
+    for branch in node.branches:
+        if _matches(branch, value):
+            return branch.target
+    return node.next
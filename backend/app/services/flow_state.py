@@ -0,0 +1,424 @@
+import asyncio
+import logging
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.crud.survey_answer import survey_answer_crud
+from app.crud.survey_response import survey_response_crud
+from app.db.session import SessionLocal, is_transient_error, unit_of_work
+from app.schemas.survey_flow import FlowState, PendingAnswer
+
+logger = logging.getLogger(__name__)
+
+Write = Callable[[AsyncSession], Awaitable[Any]]
+
+MAX_RETRY_BACKOFF_SECONDS = 5.0
+
+
+class FlowStateUnavailableError(RuntimeError):
+    """The answers of a response are buffered in the store and the store cannot be reached."""
+
+
+class FlowStateLostError(RuntimeError):
+    """The answers of a response were buffered in the store and its entry is gone (evicted, expired or flushed)."""
+
+
+class FlowStateStore(ABC):
+    """Where the cursors of in-progress responses live when they are kept out of Postgres."""
+
+    @abstractmethod
+    async def get(self, response_id: UUID) -> FlowState | None: ...
+
+    @abstractmethod
+    async def set(self, response_id: UUID, state: FlowState) -> None: ...
+
+    @abstractmethod
+    async def delete(self, response_id: UUID) -> None: ...
+
+    async def close(self) -> None:
+        return None
+
+
+class MemoryFlowStateStore(FlowStateStore):
+    """Per-process store; only correct when a single worker serves the survey flow."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float = math.inf) -> None:
+        self._states: LRUCache[UUID, FlowState] = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    async def get(self, response_id: UUID) -> FlowState | None:
+        return self._states.get(response_id)
+
+    async def set(self, response_id: UUID, state: FlowState) -> None:
+        self._states.set(response_id, state)
+
+    async def delete(self, response_id: UUID) -> None:
+        self._states.pop(response_id)
+
+
+class RedisFlowStateStore(FlowStateStore):
+    """Store shared by all workers, kept in Redis (or anything speaking its protocol) as JSON."""
+
+    def __init__(self, client: Redis, ttl_seconds: int) -> None:
+        self._client = client
+        self._ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(response_id: UUID) -> str:
+        return f"flowstate:{response_id}"
+
+    async def get(self, response_id: UUID) -> FlowState | None:
+        raw = await self._client.get(self._key(response_id))
+        return FlowState.model_validate_json(raw) if raw is not None else None
+
+    async def set(self, response_id: UUID, state: FlowState) -> None:
+        await self._client.set(self._key(response_id), state.model_dump_json(), ex=self._ttl_seconds)
+
+    async def delete(self, response_id: UUID) -> None:
+        await self._client.delete(self._key(response_id))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class FlowStateMetrics:
+    def __init__(self) -> None:
+        self.store_hits = 0
+        self.store_misses = 0
+        self.store_errors = 0
+        self.background_writes = 0
+        self.write_retries = 0
+        self.write_failures = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "backend": settings.FLOW_STATE_BACKEND,
+            "write_mode": settings.FLOW_STATE_WRITE_MODE,
+            "store_hits": self.store_hits,
+            "store_misses": self.store_misses,
+            "store_errors": self.store_errors,
+            "background_writes": self.background_writes,
+            "pending_writes": len(_writes),
+            "write_retries": self.write_retries,
+            "write_failures": self.write_failures,
+        }
+
+
+_metrics = FlowStateMetrics()
+_store: FlowStateStore | None = None
+_writes: dict[UUID, asyncio.Task[None]] = {}
+
+
+def get_store() -> FlowStateStore | None:
+    """Return the configured store, or ``None`` when cursors live in Postgres only."""
+    global _store  # noqa: PLW0603
+    if _store is None:
+        if settings.FLOW_STATE_BACKEND == "memory":
+            _store = MemoryFlowStateStore(settings.FLOW_STATE_MAX_ENTRIES, settings.FLOW_STATE_TTL_SECONDS)
+        elif settings.FLOW_STATE_BACKEND == "redis":
+            _store = RedisFlowStateStore(
+                Redis.from_url(settings.FLOW_STATE_REDIS_URL), ttl_seconds=settings.FLOW_STATE_TTL_SECONDS
+            )
+    return _store
+
+
+def _buffers_answers() -> bool:
+    return get_store() is not None and settings.FLOW_STATE_WRITE_MODE == "completion"
+
+
+def response_meta() -> dict[str, Any] | None:
+    """
+    ``meta`` for a new response: flags it when its answers are going to be buffered in the store.
+
+    The flag lets ``load`` tell a response whose store entry was lost from one that
+    simply has no entry, instead of silently restarting it from the first question.
+    """
+    return {"buffered_in_store": True} if _buffers_answers() else None
+
+
+async def start(db: AsyncSession, response_id: UUID, survey_id: UUID, survey_instance_id: UUID | None) -> None:
+    """
+    Put a freshly created response (already stored in Postgres, with ``response_meta()``) into the store.
+
+    If the store cannot be reached the response carries on in Postgres only.
+    """
+    store = get_store()
+    if store is None:
+        return
+    buffered = _buffers_answers()
+    state = FlowState(survey_id=survey_id, survey_instance_id=survey_instance_id, buffered=buffered)
+    try:
+        await store.set(response_id, state)
+    except RedisError as e:
+        _metrics.store_errors += 1
+        logger.warning(f"Flow-state store write failed, response {response_id} stays in Postgres: {e}")
+        if buffered:
+            async with unit_of_work(db):
+                await survey_response_crud.end_buffering(db, response_id=response_id, current_index=0)
+
+
+async def load(db: AsyncSession, response_id: UUID) -> FlowState | None:
+    """
+    Return the cursor of a response from the store, or rebuild it from Postgres.
+
+    Postgres is read when there is no store, the response is not in it (e.g. it
+    expired or was started before the store was enabled) or the store is unreachable.
+    An unfinished response whose answers are buffered in the store cannot be rebuilt:
+    ``FlowStateUnavailableError`` or ``FlowStateLostError`` is raised instead.
+    """
+    store = get_store()
+    store_error: RedisError | None = None
+    if store is not None:
+        try:
+            state = await store.get(response_id)
+        except RedisError as e:
+            _metrics.store_errors += 1
+            logger.warning(f"Flow-state store lookup failed, reading Postgres: {e}")
+            state, store_error = None, e
+        if state is not None:
+            _metrics.store_hits += 1
+            return state
+        _metrics.store_misses += 1
+
+    row = await survey_response_crud.get_flow_state(db, response_id=response_id)
+    if row is None:
+        return None
+    response = row.SurveyResponse
+    if response.finished_at is None and (response.meta or {}).get("buffered_in_store"):
+        if store_error is not None:
+            raise FlowStateUnavailableError(f"Flow-state store unreachable: {store_error}")
+        logger.error(f"Flow-state entry of response {response_id} is gone along with its buffered answers")
+        raise FlowStateLostError(f"Buffered answers of response {response_id} were lost")
+    # A follow-up slot without an answer means the next answer belongs to the follow-up
+    open_followup = row.followup_answer if row.followup_answer and not row.followup_answer.answer else None
+    return FlowState(
+        survey_id=response.survey_id,
+        survey_instance_id=response.survey_instance_id,
+        current_index=response.current_index,
+        finished=response.finished_at is not None,
+        base_answer=row.base_answer.answer if open_followup and row.base_answer else None,
+        followup_text=open_followup.question_text if open_followup else None,
+    )
+
+
+async def record_answer_with_followup(  # noqa: PLR0913
+    db: AsyncSession,
+    response_id: UUID,
+    state: FlowState,
+    *,
+    question_idx: int,
+    question_text: str,
+    answer: dict[str, Any] | None,
+    followup_text: str,
+) -> None:
+    """Store a base answer and open its follow-up (see ``record_answer_with_followup`` in the CRUD)."""
+
+    async def write(session: AsyncSession) -> None:
+        await survey_response_crud.record_answer_with_followup(
+            session,
+            response_id=response_id,
+            question_idx=question_idx,
+            question_text=question_text,
+            answer=answer,
+            followup_text=followup_text,
+        )
+
+    await _apply(
+        db,
+        response_id,
+        state,
+        state.model_copy(update={"base_answer": answer, "followup_text": followup_text}),
+        write=write,
+        answer=PendingAnswer(question_idx=question_idx, question_text=question_text, answer=answer),
+    )
+
+
+async def record_answer_and_advance(  # noqa: PLR0913
+    db: AsyncSession,
+    response_id: UUID,
+    state: FlowState,
+    *,
+    question_idx: int,
+    question_text: str,
+    is_followup: bool,
+    answer: dict[str, Any] | None,
+    next_question_idx: int,
+    next_question_text: str | None,
+) -> None:
+    """Store an answer and move to the next question (see ``record_answer_and_advance`` in the CRUD)."""
+
+    async def write(session: AsyncSession) -> None:
+        await survey_response_crud.record_answer_and_advance(
+            session,
+            response_id=response_id,
+            question_idx=question_idx,
+            question_text=question_text,
+            is_followup=is_followup,
+            answer=answer,
+            next_question_idx=next_question_idx,
+            next_question_text=next_question_text,
+        )
+
+    next_state = state.model_copy(
+        update={
+            "current_index": next_question_idx,
+            "finished": next_question_text is None,
+            "base_answer": None,
+            "followup_text": None,
+        }
+    )
+    pending = PendingAnswer(
+        question_idx=question_idx, question_text=question_text, is_followup=is_followup, answer=answer
+    )
+    await _apply(db, response_id, state, next_state, write=write, answer=pending)
+
+
+async def finish(db: AsyncSession, response_id: UUID, state: FlowState) -> None:
+    """Mark a response whose cursor is already past the last question as finished."""
+
+    async def write(session: AsyncSession) -> None:
+        await survey_response_crud.mark_finished(session, response_id=response_id, commit=False)
+
+    await _apply(db, response_id, state, state.model_copy(update={"finished": True}), write=write, answer=None)
+
+
+async def _apply(  # noqa: PLR0913
+    db: AsyncSession,
+    response_id: UUID,
+    state: FlowState,
+    next_state: FlowState,
+    *,
+    write: Write,
+    answer: PendingAnswer | None,
+) -> None:
+    """
+    Persist one step of a response, from ``state`` to ``next_state``, according to the flow-state settings.
+
+    Without a store the step is committed on ``db`` right away. With a store the new
+    cursor goes to the store and Postgres is written either in the background
+    (``"async"``) or all at once when the response finishes (``"completion"``). When
+    the store cannot be reached the step, and any answers buffered so far, are
+    committed on ``db`` and the response carries on in Postgres only.
+    """
+    store = get_store()
+    if store is None or (settings.FLOW_STATE_WRITE_MODE == "completion" and not state.buffered):
+        async with unit_of_work(db):
+            await write(db)
+        return
+
+    if settings.FLOW_STATE_WRITE_MODE == "completion":
+        if answer is not None:
+            next_state = next_state.model_copy(update={"pending_answers": [*state.pending_answers, answer]})
+        if next_state.finished:
+            async with unit_of_work(db):
+                await _write_pending(db, response_id, next_state)
+                await survey_response_crud.mark_finished(
+                    db, response_id=response_id, current_index=next_state.current_index, commit=False
+                )
+            await _drop(store, response_id)
+            return
+
+    try:
+        # In "async" mode finished responses stay in the store until they expire, so a
+        # repeated answer is rejected even before the background write has landed
+        await store.set(response_id, next_state)
+    except RedisError as e:
+        _metrics.store_errors += 1
+        logger.warning(f"Flow-state store write failed, writing response {response_id} to Postgres: {e}")
+        await _write_through(db, store, response_id, state, write)
+        return
+    if settings.FLOW_STATE_WRITE_MODE != "completion":
+        _schedule(response_id, write)
+
+
+async def _write_pending(db: AsyncSession, response_id: UUID, state: FlowState) -> None:
+    rows = [{"response_id": response_id, **answer.model_dump()} for answer in state.pending_answers]
+    if rows:
+        await survey_answer_crud.upsert_many(db, rows=rows)
+
+
+async def _write_through(
+    db: AsyncSession, store: FlowStateStore, response_id: UUID, state: FlowState, write: Write
+) -> None:
+    """Commit a step on ``db`` along with the answers buffered before it, and drop the response from the store."""
+    async with unit_of_work(db):
+        if state.buffered:
+            await _write_pending(db, response_id, state)
+            await survey_response_crud.end_buffering(db, response_id=response_id, current_index=state.current_index)
+        await write(db)
+    await _drop(store, response_id)
+
+
+async def _drop(store: FlowStateStore, response_id: UUID) -> None:
+    """Remove a response whose state is all in Postgres from the store."""
+    try:
+        await store.delete(response_id)
+    except RedisError as e:
+        _metrics.store_errors += 1
+        logger.warning(f"Dropping response {response_id} from the flow-state store failed: {e}")
+
+
+def _schedule(response_id: UUID, write: Write) -> None:
+    """Run ``write`` in its own transaction after the response's earlier writes."""
+    previous = _writes.get(response_id)
+    task = asyncio.create_task(_run_write(previous, write))
+    _writes[response_id] = task
+
+    def forget(done: asyncio.Task[None]) -> None:
+        if _writes.get(response_id) is done:
+            del _writes[response_id]
+
+    task.add_done_callback(forget)
+
+
+async def _run_write(previous: asyncio.Task[None] | None, write: Write) -> None:
+    """
+    Run a background write once ``previous`` is done.
+
+    The answer was already acknowledged, so while the database is unreachable the write
+    is retried with exponential backoff, for up to ``FLOW_STATE_RETRY_MAX_SECONDS``.
+    """
+    if previous is not None:
+        await asyncio.gather(previous, return_exceptions=True)
+    loop = asyncio.get_running_loop()
+    give_up_at = loop.time() + settings.FLOW_STATE_RETRY_MAX_SECONDS
+    delay = settings.FLOW_STATE_RETRY_BACKOFF_MS / 1000
+    while True:
+        try:
+            async with SessionLocal() as db, unit_of_work(db):
+                await write(db)
+        except (OSError, SQLAlchemyError) as e:
+            if not is_transient_error(e) or loop.time() + delay > give_up_at:
+                _metrics.write_failures += 1
+                logger.error(f"Background flow-state write failed: {e}")
+                return
+            _metrics.write_retries += 1
+            logger.warning(f"Background flow-state write failed, retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_BACKOFF_SECONDS)
+        else:
+            _metrics.background_writes += 1
+            return
+
+
+async def drain_flow_state() -> None:
+    """Finish background writes and close the store; called on application shutdown."""
+    global _store  # noqa: PLW0603
+    while _writes:
+        await asyncio.gather(*_writes.values(), return_exceptions=True)
+    if _store is not None:
+        await _store.close()
+        _store = None
+
+
+def get_flow_state_metrics() -> dict[str, Any]:
+    return _metrics.snapshot()
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+from datetime import UTC, datetime, timedelta
+from typing import Any, NamedTuple
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.crud.followup_decision import followup_decision_crud
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class CachedFollowup(NamedTuple):
+    """A cached follow-up decision; ``followup`` is ``None`` for "no follow-up needed"."""
+
+    followup: str | None
+    latency_ms: float
+
+
+class FollowupCacheStats:
+    def __init__(self) -> None:
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.saved_latency_ms = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        hits = self.memory_hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(_decisions),
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "saved_latency_ms": self.saved_latency_ms,
+        }
+
+
+_decisions: LRUCache[str, CachedFollowup] = LRUCache(
+    max_entries=settings.FOLLOWUP_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.FOLLOWUP_CACHE_TTL_SECONDS,
+)
+_stats = FollowupCacheStats()
+
+# Question types whose list answers are sets; the order of other lists (e.g. rankings) is part of the answer
+UNORDERED_ANSWER_TYPES = frozenset({"checkbox"})
+
+
+def _normalize(value: Any, *, unordered: bool = False) -> Any:
+    """Normalize text, and the order of ``unordered`` scalar lists, so equivalent answers hash the same."""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {str(key): _normalize(item, unordered=unordered) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        items = [_normalize(item, unordered=unordered) for item in value]
+        if unordered and all(isinstance(item, str | int | float) for item in items):
+            return sorted(items, key=str)
+        return items
+    return value
+
+
+def make_key(
+    survey_description: str,
+    question_text: str,
+    question_description: str,
+    participant_answer: dict[str, Any],
+    question_type: str = "text",
+) -> str:
+    """Hash everything the follow-up prompt depends on, including the model name."""
+    payload = {
+        "model": settings.CHAT_MODEL,
+        "survey": _normalize(survey_description),
+        "question": _normalize(question_text),
+        "description": _normalize(question_description),
+        "answer": _normalize(participant_answer, unordered=question_type in UNORDERED_ANSWER_TYPES),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+async def lookup(key: str) -> CachedFollowup | None:
+    """
+    Find a cached decision in memory, then (if enabled) in the shared Postgres tier.
+
+    Shared-tier failures are logged and treated as a miss.
+    """
+    cached = _decisions.get(key)
+    if cached is not None:
+        _stats.memory_hits += 1
+        _stats.saved_latency_ms += cached.latency_ms
+        return cached
+
+    if settings.FOLLOWUP_CACHE_SHARED:
+        not_before = datetime.now(UTC) - timedelta(seconds=settings.FOLLOWUP_CACHE_TTL_SECONDS)
+        try:
+            async with SessionLocal() as db:
+                decision = await followup_decision_crud.get_fresh(db, key=key, not_before=not_before)
+        except SQLAlchemyError as e:
+            logger.warning(f"Shared follow-up cache lookup failed: {e}")
+            decision = None
+        if decision is not None:
+            cached = CachedFollowup(followup=decision.followup, latency_ms=decision.latency_ms)
+            _decisions.set(key, cached)
+            _stats.shared_hits += 1
+            _stats.saved_latency_ms += cached.latency_ms
+            return cached
+
+    _stats.misses += 1
+    return None
+
+
+async def store(key: str, followup: str | None, latency_ms: float) -> None:
+    """Remember a decision the model actually made; errors and timeouts are never stored."""
+    _decisions.set(key, CachedFollowup(followup=followup, latency_ms=latency_ms))
+    if not settings.FOLLOWUP_CACHE_SHARED:
+        return
+    try:
+        async with SessionLocal() as db:
+            await followup_decision_crud.upsert(db, key=key, followup=followup, latency_ms=latency_ms)
+    except SQLAlchemyError as e:
+        logger.warning(f"Shared follow-up cache write failed: {e}")
+
+
+def get_followup_cache_stats() -> dict[str, Any]:
+    return _stats.snapshot()
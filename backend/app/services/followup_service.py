@@ -1,28 +1,170 @@
+import asyncio
 import logging
+import time
+from collections.abc import Sequence
 from typing import Any
 
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
+import httpx
+from langchain.chat_models.base import BaseChatModel
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
 
 from app.core.config import settings
+from app.services import followup_cache
+from app.services.llm_provider import get_llm_provider, prompt_key
 
 logger = logging.getLogger(__name__)
 
+# Format the system prompt to instruct the model
+SYSTEM_PROMPT = """You are an expert survey analyst helping to improve data quality.
+        Your task is to decide if a short follow-up question would improve the quality of data collected.
+
+        If the participant's answer is complete, specific, and provides enough context, respond with NONE.
+
+        If the participant's answer is ambiguous, too general, or could benefit from a brief clarification,
+        generate ONE short follow-up question that would improve the data quality.
+
+        Keep follow-up questions brief, specific and directly related to the original question.
+        Do not ask for personal information.
+        """
+
+
+class FollowupMetrics:
+    """Counters for follow-up generation, exposed through the metrics endpoint."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.llm_latency_total = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        completed = self.calls - self.timeouts - self.errors
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_concurrency": settings.FOLLOWUP_MAX_CONCURRENCY,
+            "queue_wait_avg_ms": self.queue_wait_total / self.calls * 1000 if self.calls else 0.0,
+            "queue_wait_max_ms": self.queue_wait_max * 1000,
+            "llm_latency_avg_ms": self.llm_latency_total / completed * 1000 if completed > 0 else 0.0,
+        }
+
+
+_metrics = FollowupMetrics()
+_limiter: asyncio.Semaphore | None = None
+_http_client: httpx.AsyncClient | None = None
+_llm: BaseChatModel | None = None
+
+
+def _get_limiter() -> asyncio.Semaphore:
+    global _limiter  # noqa: PLW0603
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(settings.FOLLOWUP_MAX_CONCURRENCY)
+    return _limiter
+
+
+def _stub_followup(messages: Sequence[BaseMessage]) -> str:
+    """Stub reply asking a generic follow-up for ``LLM_STUB_FOLLOWUP_RATE`` of the prompts (always the same ones)."""
+    if int(prompt_key(messages)[:8], 16) / 0xFFFFFFFF < settings.LLM_STUB_FOLLOWUP_RATE:
+        return "Could you tell us a bit more about that?"
+    return "NONE"
+
+
+def _get_llm() -> BaseChatModel:
+    """
+    Return the process-wide follow-up model.
+
+    The model shares one keep-alive HTTP connection pool across requests instead of
+    opening a new client (and TLS session) per answer. Retries are disabled because
+    the whole call has to fit in ``FOLLOWUP_TIMEOUT_SECONDS``.
+    """
+    global _http_client, _llm  # noqa: PLW0603
+    if _llm is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+        _llm = get_llm_provider().chat_model(
+            temperature=0.2,  # Keep temperature low for consistent outputs
+            max_tokens=100,  # Keep token limit small for short responses
+            http_client=_http_client,
+            timeout=settings.FOLLOWUP_TIMEOUT_SECONDS,
+            stub_reply=_stub_followup,
+        )
+    return _llm
+
+
+async def close_llm_client() -> None:
+    """Close the pooled HTTP client; called on application shutdown."""
+    global _http_client, _llm  # noqa: PLW0603
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _llm = None
+
+
+def get_followup_metrics() -> dict[str, Any]:
+    return _metrics.snapshot()
+
+
+def _build_messages(
+    survey_description: str,
+    question_text: str,
+    participant_answer: dict[str, Any],
+    question_description: str,
+) -> list[BaseMessage]:
+    # Format the human message with survey context and the participant's answer
+    human_prompt = f"""
+        Survey topic: {survey_description}
+
+        Original question: {question_text}
+        """
+
+    # Add question description if available
+    if question_description:
+        human_prompt += f"\n\nQuestion context: {question_description}"
+
+    human_prompt += f"""
+
+        Participant's answer: {participant_answer}
+
+        Should I ask a follow-up? Respond with NONE if no follow-up is needed, or provide a short, specific follow-up question:
+        """
+
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=human_prompt),
+    ]
+
 
 async def get_followup_question(
     survey_description: str,
     question_text: str,
     participant_answer: dict[str, Any] | None,
     question_description: str = "",
+    question_type: str = "text",
 ) -> str | None:
     """
     Determine if a follow-up question is needed based on the participant's answer.
 
+    Calls share a pooled client and are limited to ``FOLLOWUP_MAX_CONCURRENCY`` at a
+    time. Queueing and the call itself must finish within ``FOLLOWUP_TIMEOUT_SECONDS``;
+    a slow or failing provider means no follow-up rather than a stuck request.
+    Decisions, including "no follow-up", are cached per normalized question and answer.
+
     Args:
         survey_description: Description of the survey purpose
         question_text: Original question text
         participant_answer: Participant's answer to the original question
         question_description: Additional context about the question's purpose
+        question_type: Survey schema type of the question; checkbox answers are cached regardless of order
 
     Returns:
         A follow-up question string or None if no follow-up is needed
@@ -31,61 +173,46 @@ async def get_followup_question(
         # No follow-up for skipped questions
         return None
 
-    try:
-        llm = ChatOpenAI(
-            temperature=0.2,  # Keep temperature low for consistent outputs
-            model_name=settings.CHAT_MODEL,
-            openai_api_key=settings.OPENAI_API_KEY,
-            max_tokens=100,  # Keep token limit small for short responses
-        )
+    cache_key = followup_cache.make_key(
+        survey_description, question_text, question_description, participant_answer, question_type
+    )
+    cached = await followup_cache.lookup(cache_key)
+    if cached is not None:
+        return cached.followup
 
-        # Format the system prompt to instruct the model
-        system_prompt = """You are an expert survey analyst helping to improve data quality. 
-        Your task is to decide if a short follow-up question would improve the quality of data collected.
-        
-        If the participant's answer is complete, specific, and provides enough context, respond with NONE.
-        
-        If the participant's answer is ambiguous, too general, or could benefit from a brief clarification,
-        generate ONE short follow-up question that would improve the data quality.
-        
-        Keep follow-up questions brief, specific and directly related to the original question.
-        Do not ask for personal information.
-        """
-
-        # Format the human message with survey context and the participant's answer
-        human_prompt = f"""
-        Survey topic: {survey_description}
-        
-        Original question: {question_text}
-        """
-
-        # Add question description if available
-        if question_description:
-            human_prompt += f"\n\nQuestion context: {question_description}"
-
-        human_prompt += f"""
-        
-        Participant's answer: {participant_answer}
-        
-        Should I ask a follow-up? Respond with NONE if no follow-up is needed, or provide a short, specific follow-up question:
-        """
-
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=human_prompt),
-        ]
-
-        # Get the response from the LLM
-        response = await llm.ainvoke(messages)
-        content = response.content.strip()
-
-        # Return None if the model says no follow-up is needed
-        if content.upper() == "NONE":
-            return None
-
-        return content
+    messages = _build_messages(survey_description, question_text, participant_answer, question_description)
+    _metrics.calls += 1
 
+    try:
+        async with asyncio.timeout(settings.FOLLOWUP_TIMEOUT_SECONDS):
+            queued_at = time.perf_counter()
+            async with _get_limiter():
+                started_at = time.perf_counter()
+                queue_wait = started_at - queued_at
+                _metrics.queue_wait_total += queue_wait
+                _metrics.queue_wait_max = max(_metrics.queue_wait_max, queue_wait)
+
+                # Get the response from the LLM
+                _metrics.in_flight += 1
+                try:
+                    response = await _get_llm().ainvoke(messages)
+                finally:
+                    _metrics.in_flight -= 1
+                llm_latency = time.perf_counter() - started_at
+                _metrics.llm_latency_total += llm_latency
+    except TimeoutError:
+        _metrics.timeouts += 1
+        logger.warning(f"Follow-up generation exceeded {settings.FOLLOWUP_TIMEOUT_SECONDS}s, skipping follow-up")
+        return None
     except Exception as e:
+        _metrics.errors += 1
         logger.error(f"Error generating follow-up question: {e}")
         # In case of error, don't generate a follow-up
         return None
+
+    content = str(response.content).strip()
+
+    # Return None if the model says no follow-up is needed
+    followup = None if content.upper() == "NONE" else content
+    await followup_cache.store(cache_key, followup, latency_ms=llm_latency * 1000)
+    return followup
@@ -0,0 +1,127 @@
+import base64
+import csv
+import io
+import json
+import zipfile
+from collections.abc import AsyncIterator, Sequence
+from enum import Enum
+from typing import NamedTuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.schemas.link import QRFormat
+from app.services import qr_codes
+from app.services.response_export import ChunkSink
+
+
+class LinkBundleFormat(str, Enum):
+    ZIP = "zip"
+    NDJSON = "ndjson"
+
+
+LINK_BUNDLE_MEDIA_TYPES = {
+    LinkBundleFormat.ZIP: "application/zip",
+    LinkBundleFormat.NDJSON: "application/x-ndjson",
+}
+
+
+class MintedLink(NamedTuple):
+    id: UUID
+    url: str
+    attendee: str
+
+
+def link_url(link_id: UUID) -> str:
+    return f"/l/{link_id}"
+
+
+def _image_name(link: MintedLink, fmt: QRFormat) -> str:
+    return f"qr/{link.id}.{fmt.value}"
+
+
+async def _iter_rendered(
+    links: Sequence[MintedLink], qr_formats: Sequence[QRFormat], box_size: int, border: int
+) -> AsyncIterator[tuple[MintedLink, list[bytes]]]:
+    position = 0
+    async for images in qr_codes.iter_qr_codes(
+        [link.url for link in links], qr_formats, box_size=box_size, border=border
+    ):
+        yield links[position], images
+        position += 1
+
+
+async def iter_ndjson_bundle(
+    links: Sequence[MintedLink],
+    qr_formats: Sequence[QRFormat],
+    *,
+    box_size: int = 10,
+    border: int = 4,
+    chunk_bytes: int | None = None,
+) -> AsyncIterator[str]:
+    """One JSON object per link with its QR codes: SVG as text, PNG base64-encoded."""
+    chunk_bytes = chunk_bytes or settings.EXPORT_CHUNK_BYTES
+    buffer = io.StringIO()
+    async for link, images in _iter_rendered(links, qr_formats, box_size, border):
+        line = {"link_id": str(link.id), "url": link.url, "attendee": link.attendee}
+        for fmt, image in zip(qr_formats, images, strict=True):
+            line[f"qr_{fmt.value}"] = image.decode() if fmt == QRFormat.SVG else base64.b64encode(image).decode()
+        buffer.write(json.dumps(line, ensure_ascii=False))
+        buffer.write("\n")
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+async def iter_zip_bundle(
+    links: Sequence[MintedLink],
+    qr_formats: Sequence[QRFormat],
+    *,
+    box_size: int = 10,
+    border: int = 4,
+    chunk_bytes: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    A ZIP archive with a ``links.csv`` manifest and every QR code under ``qr/``.
+
+    The manifest lists each link's id, URL, attendee and image files, ready for a mail
+    merge. The archive is written as the images are rendered and sent in chunks.
+    """
+    chunk_bytes = chunk_bytes or settings.EXPORT_CHUNK_BYTES
+    sink = ChunkSink()
+    archive = zipfile.ZipFile(sink, "w")
+
+    manifest = io.StringIO()
+    writer = csv.writer(manifest)
+    writer.writerow(["Link ID", "URL", "Attendee", *(f"QR {fmt.value.upper()}" for fmt in qr_formats)])
+    for link in links:
+        writer.writerow([link.id, link.url, link.attendee, *(_image_name(link, fmt) for fmt in qr_formats)])
+    archive.writestr("links.csv", manifest.getvalue(), compress_type=zipfile.ZIP_DEFLATED)
+
+    sent = 0
+    async for link, images in _iter_rendered(links, qr_formats, box_size, border):
+        for fmt, image in zip(qr_formats, images, strict=True):
+            # PNGs are already compressed; SVG text shrinks to a fraction
+            compression = zipfile.ZIP_DEFLATED if fmt == QRFormat.SVG else zipfile.ZIP_STORED
+            archive.writestr(_image_name(link, fmt), image, compress_type=compression)
+        if sink.tell() - sent >= chunk_bytes:
+            sent = sink.tell()
+            yield sink.drain()
+
+    archive.close()
+    yield sink.drain()
+
+
+def iter_link_bundle(
+    links: Sequence[MintedLink],
+    bundle_format: LinkBundleFormat,
+    qr_formats: Sequence[QRFormat],
+    *,
+    box_size: int = 10,
+    border: int = 4,
+) -> AsyncIterator[str | bytes]:
+    if bundle_format == LinkBundleFormat.NDJSON:
+        return iter_ndjson_bundle(links, qr_formats, box_size=box_size, border=border)
+    return iter_zip_bundle(links, qr_formats, box_size=box_size, border=border)
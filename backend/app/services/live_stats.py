@@ -0,0 +1,275 @@
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.survey_instance import survey_instance_crud
+from app.db.session import ReadSessionLocal
+from app.schemas.stats import InstanceLiveStats, LiveEventStats, QuestionLiveStats
+from app.schemas.survey_flow import CompiledSurvey
+from app.services.event_stats import choice_keys, has_distribution, ordered_distribution
+from app.services.survey_cache import InvalidSurveySchemaError, get_compiled_survey
+
+logger = logging.getLogger(__name__)
+
+
+class _QuestionCounter:
+    __slots__ = ("answered", "choices", "score_sum", "scored")
+
+    def __init__(self) -> None:
+        self.answered = 0
+        self.scored = 0
+        self.score_sum = 0.0
+        self.choices: Counter[str] = Counter()
+
+
+class _InstanceCounter:
+    __slots__ = ("finished", "questions", "started", "survey")
+
+    def __init__(self, survey: CompiledSurvey, started: int, finished: int) -> None:
+        self.survey = survey
+        self.started = started
+        self.finished = finished
+        self.questions = [_QuestionCounter() for _ in survey.questions]
+
+
+class EventAggregator:
+    """
+    Response counters of one event, shared by all of its open dashboards.
+
+    Counters are loaded from the database once and then moved on in memory by the
+    ``record_*`` functions. A single publisher task renders the figures at most every
+    ``LIVE_STATS_PUSH_INTERVAL_MS`` and hands the same JSON to every subscriber.
+    """
+
+    def __init__(self, event_id: UUID) -> None:
+        self.event_id = event_id
+        self.subscribers: set[asyncio.Queue[str]] = set()
+        self._instances: dict[UUID, _InstanceCounter] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._payload: str | None = None
+        self._publisher: asyncio.Task[None] | None = None
+
+    async def load(self, db: AsyncSession) -> None:
+        """Replace the counters with the figures currently in the database (two or three queries)."""
+        instances: dict[UUID, _InstanceCounter] = {}
+        for row in await survey_instance_crud.get_response_stats_by_event(db, event_id=self.event_id):
+            try:
+                survey = await get_compiled_survey(db, row.survey_id)
+            except InvalidSurveySchemaError:
+                survey = None
+            if survey is not None:
+                instances[row.instance_id] = _InstanceCounter(survey, row.total_responses, row.completed_responses)
+
+        for row in await survey_instance_crud.get_answer_stats_by_event(db, event_id=self.event_id):
+            question = self._question(instances, row.instance_id, row.question_idx)
+            if question is not None:
+                question.answered = row.answered
+                question.scored = row.scored
+                question.score_sum = float(row.score_sum or 0)
+
+        with_distribution = {
+            (instance.survey.id, idx)
+            for instance in instances.values()
+            for idx, question in enumerate(instance.survey.questions)
+            if has_distribution(question)
+        }
+        for row in await survey_instance_crud.get_choice_counts_by_event(
+            db, event_id=self.event_id, questions=sorted(with_distribution)
+        ):
+            question = self._question(instances, row.instance_id, row.question_idx)
+            if question is not None:
+                question.choices[row.choice] = row.answers
+
+        for instance_id in self._instances.keys() - instances.keys():
+            _instance_aggregators.pop(instance_id, None)
+        for instance_id in instances:
+            _instance_aggregators[instance_id] = self
+        self._instances = instances
+        self._loaded = True
+        self._payload = None
+
+    async def ensure_loaded(self) -> None:
+        async with self._load_lock:
+            if not self._loaded:
+                async with ReadSessionLocal() as db:
+                    await self.load(db)
+
+    @staticmethod
+    def _question(instances: dict[UUID, _InstanceCounter], instance_id: UUID, idx: int) -> _QuestionCounter | None:
+        instance = instances.get(instance_id)
+        if instance is None or not 0 <= idx < len(instance.questions):
+            return None
+        return instance.questions[idx]
+
+    def response_started(self, instance_id: UUID) -> None:
+        self._instances[instance_id].started += 1
+        self._payload = None
+
+    def response_finished(self, instance_id: UUID) -> None:
+        self._instances[instance_id].finished += 1
+        self._payload = None
+
+    def answer_recorded(self, instance_id: UUID, question_idx: int, answer: dict[str, Any] | None) -> None:
+        question = self._question(self._instances, instance_id, question_idx)
+        value = (answer or {}).get("value")
+        if question is None or value is None:
+            return
+        question.answered += 1
+        if isinstance(value, int | float) and not isinstance(value, bool):
+            question.scored += 1
+            question.score_sum += value
+        if has_distribution(self._instances[instance_id].survey.questions[question_idx]):
+            question.choices.update(choice_keys(value))
+        self._payload = None
+
+    def snapshot(self) -> LiveEventStats:
+        instances = [
+            InstanceLiveStats(
+                instance_id=instance_id,
+                survey_id=instance.survey.id,
+                started_responses=instance.started,
+                finished_responses=instance.finished,
+                questions=[
+                    QuestionLiveStats(
+                        question_idx=idx,
+                        question_text=question.text,
+                        answered=counter.answered,
+                        average_score=counter.score_sum / counter.scored if counter.scored else None,
+                        distribution=ordered_distribution(question, counter.choices)
+                        if has_distribution(question)
+                        else None,
+                    )
+                    for idx, (question, counter) in enumerate(
+                        zip(instance.survey.questions, instance.questions, strict=True)
+                    )
+                ],
+            )
+            for instance_id, instance in self._instances.items()
+        ]
+        started = sum(instance.started_responses for instance in instances)
+        finished = sum(instance.finished_responses for instance in instances)
+        return LiveEventStats(
+            event_id=self.event_id,
+            started_responses=started,
+            finished_responses=finished,
+            completion_percentage=finished / started * 100 if started else 0.0,
+            instances=instances,
+        )
+
+    def payload(self) -> str:
+        """The current figures as JSON, rendered once per change however many dashboards are open."""
+        if self._payload is None:
+            self._payload = self.snapshot().model_dump_json()
+        return self._payload
+
+    @staticmethod
+    def offer(queue: asyncio.Queue[str], payload: str) -> None:
+        """Replace whatever a slow subscriber has not read yet with ``payload``."""
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(payload)
+
+    def start(self) -> None:
+        if self._publisher is None or self._publisher.done():
+            self._publisher = asyncio.create_task(self._publish_forever())
+
+    async def _publish_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        resync_at = loop.time() + settings.LIVE_STATS_RESYNC_SECONDS
+        while True:
+            await asyncio.sleep(settings.LIVE_STATS_PUSH_INTERVAL_MS / 1000)
+            if loop.time() >= resync_at:
+                resync_at = loop.time() + settings.LIVE_STATS_RESYNC_SECONDS
+                await self._resync()
+            if self._payload is None:
+                payload = self.payload()
+                for queue in self.subscribers:
+                    self.offer(queue, payload)
+
+    async def _resync(self) -> None:
+        try:
+            async with ReadSessionLocal() as db:
+                await self.load(db)
+        except (OSError, SQLAlchemyError) as e:
+            logger.warning(f"Reloading live stats for event {self.event_id} failed: {e}")
+
+    def close(self) -> None:
+        if self._publisher is not None:
+            self._publisher.cancel()
+        for instance_id in self._instances:
+            if _instance_aggregators.get(instance_id) is self:
+                del _instance_aggregators[instance_id]
+
+
+_aggregators: dict[UUID, EventAggregator] = {}
+_instance_aggregators: dict[UUID, EventAggregator] = {}
+
+
+@asynccontextmanager
+async def subscribe(event_id: UUID) -> AsyncIterator[asyncio.Queue[str]]:
+    """
+    Follow an event's live figures.
+
+    The queue starts with the current figures as JSON and then always holds the latest
+    update only, so a slow dashboard skips intermediate states instead of lagging.
+    The event's aggregator is created for its first subscriber and dropped with its last.
+    """
+    aggregator = _aggregators.get(event_id)
+    if aggregator is None:
+        aggregator = _aggregators[event_id] = EventAggregator(event_id)
+    queue: asyncio.Queue[str] = asyncio.Queue(maxsize=1)
+    aggregator.subscribers.add(queue)
+    try:
+        await aggregator.ensure_loaded()
+        aggregator.offer(queue, aggregator.payload())
+        aggregator.start()
+        yield queue
+    finally:
+        aggregator.subscribers.discard(queue)
+        if not aggregator.subscribers:
+            aggregator.close()
+            if _aggregators.get(event_id) is aggregator:
+                del _aggregators[event_id]
+
+
+def record_response_started(survey_instance_id: UUID | None) -> None:
+    """Count a response started through the survey flow; a no-op unless its event is being watched."""
+    if survey_instance_id is not None and (aggregator := _instance_aggregators.get(survey_instance_id)) is not None:
+        aggregator.response_started(survey_instance_id)
+
+
+def record_answer(survey_instance_id: UUID | None, question_idx: int, answer: dict[str, Any] | None) -> None:
+    """Count a base answer (``{"value": ...}``); skipped questions are not counted."""
+    if survey_instance_id is not None and (aggregator := _instance_aggregators.get(survey_instance_id)) is not None:
+        aggregator.answer_recorded(survey_instance_id, question_idx, answer)
+
+
+def record_response_finished(survey_instance_id: UUID | None) -> None:
+    if survey_instance_id is not None and (aggregator := _instance_aggregators.get(survey_instance_id)) is not None:
+        aggregator.response_finished(survey_instance_id)
+
+
+def record_submission(survey_instance_id: UUID | None, answers: Iterable[tuple[int, dict[str, Any] | None]]) -> None:
+    """Count a response submitted in one go, e.g. through a public link."""
+    if survey_instance_id is None or (aggregator := _instance_aggregators.get(survey_instance_id)) is None:
+        return
+    aggregator.response_started(survey_instance_id)
+    for question_idx, answer in answers:
+        aggregator.answer_recorded(survey_instance_id, question_idx, answer)
+    aggregator.response_finished(survey_instance_id)
+
+
+def get_live_stats_metrics() -> dict[str, Any]:
+    return {
+        "events": len(_aggregators),
+        "subscribers": sum(len(aggregator.subscribers) for aggregator in _aggregators.values()),
+    }
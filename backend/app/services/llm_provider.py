@@ -0,0 +1,304 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, NamedTuple
+from uuid import UUID
+
+import httpx
+import openai
+from langchain.callbacks.base import AsyncCallbackHandler
+from langchain.chat_models import ChatOpenAI
+from langchain.chat_models.base import BaseChatModel
+from langchain.schema import AIMessage, BaseMessage, ChatGeneration, ChatResult, LLMResult
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from pydantic import Field, PrivateAttr
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Builds a stub reply from the prompt, e.g. "NONE" or JSON in the format the caller parses
+StubReply = Callable[[Sequence[BaseMessage]], str]
+
+
+class StubLLMError(Exception):
+    """A failure injected by the stub provider (``LLM_STUB_ERROR_RATE``)."""
+
+
+class Recording(NamedTuple):
+    content: str
+    latency_ms: float
+
+
+def prompt_key(messages: Sequence[BaseMessage]) -> str:
+    """Hash a prompt; recordings are replayed by this key."""
+    encoded = json.dumps([[message.type, message.content] for message in messages], separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def default_stub_reply(messages: Sequence[BaseMessage]) -> str:
+    return "This is a stub reply."
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Chat model that answers locally after a simulated delay, without any network calls.
+
+    Prompts found in ``recordings`` get their recorded reply after the recorded
+    latency. Others get ``reply(messages)`` after a latency drawn from ``latencies``
+    if given, else from a log-normal distribution around ``latency_ms``; a share of
+    them fail or hang instead. Every draw is seeded with the prompt and how often it
+    was seen, so a run is repeatable however calls interleave.
+    """
+
+    reply: StubReply = default_stub_reply
+    latency_ms: float = 800.0
+    latency_sigma: float = 0.5
+    latencies: list[float] = Field(default_factory=list)
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    hang_seconds: float = 30.0
+    seed: int = 0
+    recordings: dict[str, list[Recording]] = Field(default_factory=dict)
+    _calls: Counter[str] = PrivateAttr(default_factory=Counter)
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _plan(self, messages: Sequence[BaseMessage]) -> tuple[str, float, Exception | None]:
+        """Decide the reply, the delay in seconds and the failure (if any) for one call."""
+        key = prompt_key(messages)
+        seen = self._calls[key]
+        self._calls[key] += 1
+
+        recorded = self.recordings.get(key)
+        if recorded:
+            recording = recorded[seen % len(recorded)]
+            return recording.content, recording.latency_ms / 1000, None
+
+        rng = random.Random(f"{self.seed}:{key}:{seen}")
+        if self.latencies:
+            latency_ms = rng.choice(self.latencies)
+        elif self.latency_ms > 0:
+            latency_ms = rng.lognormvariate(math.log(self.latency_ms), self.latency_sigma)
+        else:
+            latency_ms = 0.0
+        roll = rng.random()
+        if roll < self.timeout_rate:
+            return "", self.hang_seconds, TimeoutError("Stub LLM call timed out")
+        if roll < self.timeout_rate + self.error_rate:
+            return "", latency_ms / 1000, StubLLMError("Stub LLM call failed")
+        return self.reply(messages), latency_ms / 1000, None
+
+    @staticmethod
+    def _result(content: str) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        content, delay, failure = self._plan(messages)
+        time.sleep(delay)
+        if failure is not None:
+            raise failure
+        return self._result(content)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        content, delay, failure = self._plan(messages)
+        await asyncio.sleep(delay)
+        if failure is not None:
+            raise failure
+        return self._result(content)
+
+
+class RecordingHandler(AsyncCallbackHandler):
+    """Append every successful call to a JSONL file that the replay provider can read back."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._started: dict[UUID, tuple[str, float]] = {}
+
+    async def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: list[list[BaseMessage]], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._started[run_id] = (prompt_key(messages[0]), time.perf_counter())
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        key, started_at = started
+        record = {
+            "key": key,
+            "content": response.generations[0][0].text,
+            "latency_ms": (time.perf_counter() - started_at) * 1000,
+        }
+        with self.path.open("a", encoding="utf-8") as recording:
+            recording.write(json.dumps(record) + "\n")
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+
+
+class LLMProvider(ABC):
+    """Builds the chat models the services call; chosen by ``LLM_PROVIDER``."""
+
+    @abstractmethod
+    def chat_model(  # noqa: PLR0913
+        self,
+        *,
+        temperature: float,
+        max_tokens: int | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        timeout: float | None = None,
+        streaming: bool = False,
+        stub_reply: StubReply = default_stub_reply,
+    ) -> BaseChatModel:
+        """
+        Build a chat model for one use.
+
+        ``http_client`` and ``timeout`` configure a pooled client without retries;
+        without them the client library's defaults apply. Local providers answer with
+        ``stub_reply`` where they have nothing better.
+        """
+
+
+class OpenAIProvider(LLMProvider):
+    def __init__(self, recording_path: str = "") -> None:
+        self.callbacks = [RecordingHandler(recording_path)] if recording_path else None
+
+    def chat_model(  # noqa: PLR0913
+        self,
+        *,
+        temperature: float,
+        max_tokens: int | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        timeout: float | None = None,
+        streaming: bool = False,
+        stub_reply: StubReply = default_stub_reply,
+    ) -> BaseChatModel:
+        options: dict[str, Any] = {}
+        if http_client is not None:
+            async_client = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=http_client,
+                timeout=timeout,
+                max_retries=0,
+            )
+            options = {"async_client": async_client.chat.completions, "max_retries": 0}
+        return ChatOpenAI(
+            temperature=temperature,
+            model_name=settings.CHAT_MODEL,
+            openai_api_key=settings.OPENAI_API_KEY,
+            max_tokens=max_tokens,
+            streaming=streaming,
+            callbacks=self.callbacks,
+            **options,
+        )
+
+
+class StubProvider(LLMProvider):
+    """Local replies with the latency and failure rates from the ``LLM_STUB_*`` settings."""
+
+    def chat_model(  # noqa: PLR0913
+        self,
+        *,
+        temperature: float,
+        max_tokens: int | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        timeout: float | None = None,
+        streaming: bool = False,
+        stub_reply: StubReply = default_stub_reply,
+    ) -> BaseChatModel:
+        return StubChatModel(
+            reply=stub_reply,
+            latency_ms=settings.LLM_STUB_LATENCY_MS,
+            latency_sigma=settings.LLM_STUB_LATENCY_SIGMA,
+            error_rate=settings.LLM_STUB_ERROR_RATE,
+            timeout_rate=settings.LLM_STUB_TIMEOUT_RATE,
+            hang_seconds=settings.LLM_STUB_HANG_SECONDS,
+            seed=settings.LLM_STUB_SEED,
+        )
+
+
+@lru_cache(maxsize=4)
+def load_recording(path: str) -> dict[str, list[Recording]]:
+    """Read a JSONL recording into replies per prompt key, in recorded order."""
+    recordings: dict[str, list[Recording]] = defaultdict(list)
+    with Path(path).open(encoding="utf-8") as recording:
+        for line in recording:
+            if line.strip():
+                record = json.loads(line)
+                recordings[record["key"]].append(Recording(record["content"], record["latency_ms"]))
+    return dict(recordings)
+
+
+class ReplayProvider(LLMProvider):
+    """
+    Replies recorded from a real provider, with their original latency.
+
+    Prompts that were not recorded get the stub reply after a latency drawn from the
+    recorded ones, so a load test keeps realistic timing on new answers.
+    """
+
+    def __init__(self, recording_path: str) -> None:
+        self.recordings = load_recording(recording_path)
+        self.latencies = [recording.latency_ms for recorded in self.recordings.values() for recording in recorded]
+        logger.info(f"Replaying {len(self.latencies)} LLM calls from {recording_path}")
+
+    def chat_model(  # noqa: PLR0913
+        self,
+        *,
+        temperature: float,
+        max_tokens: int | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        timeout: float | None = None,
+        streaming: bool = False,
+        stub_reply: StubReply = default_stub_reply,
+    ) -> BaseChatModel:
+        return StubChatModel(
+            reply=stub_reply,
+            latency_ms=settings.LLM_STUB_LATENCY_MS,
+            latency_sigma=settings.LLM_STUB_LATENCY_SIGMA,
+            latencies=self.latencies,
+            seed=settings.LLM_STUB_SEED,
+            recordings=self.recordings,
+        )
+
+
+_providers: dict[str, LLMProvider] = {}
+
+
+def get_llm_provider() -> LLMProvider:
+    """Return the configured provider; anything but "stub" or "replay" means OpenAI."""
+    name = settings.LLM_PROVIDER
+    provider = _providers.get(name)
+    if provider is None:
+        if name == "stub":
+            provider = StubProvider()
+        elif name == "replay":
+            provider = ReplayProvider(settings.LLM_RECORDING_PATH)
+        else:
+            provider = OpenAIProvider(settings.LLM_RECORDING_PATH)
+        _providers[name] = provider
+    return provider
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import math
+from datetime import UTC, datetime
+from typing import Any, NamedTuple
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.crud.link import link_crud
+
+
+class PublicForm(NamedTuple):
+    """The rendered public form of a link, ready to be sent as-is."""
+
+    body: bytes
+    etag: str
+    org_id: UUID
+    survey_instance_id: UUID
+    survey_id: UUID
+    event_id: UUID
+    is_published: bool
+    expires_at: datetime | None
+
+
+_forms: LRUCache[UUID, PublicForm] = LRUCache(
+    max_entries=settings.PUBLIC_FORM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PUBLIC_FORM_CACHE_TTL_SECONDS,
+)
+
+
+def _seconds_until(moment: datetime | None) -> float:
+    if moment is None:
+        return math.inf
+    return (moment - datetime.now(UTC)).total_seconds()
+
+
+def render_public_form(row: Any) -> PublicForm:
+    """Serialize a ``link_crud.get_public_form`` row and derive its strong ETag."""
+    payload = {
+        "title": row.title,
+        "schema": row.schema,
+        "event": {
+            "name": row.event_name,
+            "start_dt": row.start_dt,
+            "end_dt": row.end_dt,
+        },
+    }
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode()
+    return PublicForm(
+        body=body,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        org_id=row.org_id,
+        survey_instance_id=row.survey_instance_id,
+        survey_id=row.survey_id,
+        event_id=row.event_id,
+        is_published=row.is_published,
+        expires_at=row.expires_at,
+    )
+
+
+async def get_public_form(db: AsyncSession, link_id: UUID) -> PublicForm | None:
+    """
+    Return the rendered public form for ``link_id``, loading it on a cache miss.
+
+    Entries never outlive the link's ``expires_at``. Published surveys stay cached for
+    ``PUBLIC_FORM_CACHE_TTL_SECONDS`` and drafts for ``SURVEY_CACHE_TTL_SECONDS``, so
+    edits made on other workers show up; edits on this worker invalidate right away.
+    """
+    form = _forms.get(link_id)
+    if form is not None:
+        return form
+
+    row = await link_crud.get_public_form(db, id=link_id)
+    if row is None:
+        return None
+
+    form = render_public_form(row)
+    ttl = settings.PUBLIC_FORM_CACHE_TTL_SECONDS if form.is_published else settings.SURVEY_CACHE_TTL_SECONDS
+    _forms.set(link_id, form, ttl_seconds=min(ttl, _seconds_until(form.expires_at)))
+    return form
+
+
+def cache_control(form: PublicForm) -> str:
+    """
+    ``Cache-Control`` for a form response.
+
+    Published forms may be reused for ``PUBLIC_FORM_MAX_AGE_SECONDS`` (never past the
+    link's expiry); drafts can change at any time, so clients must revalidate them.
+    """
+    if not form.is_published:
+        return "no-cache"
+    max_age = int(max(0, min(settings.PUBLIC_FORM_MAX_AGE_SECONDS, _seconds_until(form.expires_at))))
+    return f"public, max-age={max_age}"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Apply the (weak) ``If-None-Match`` comparison from RFC 9110."""
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def invalidate_survey_forms(survey_id: UUID) -> int:
+    """Drop the forms of every link to ``survey_id`` after the survey changed."""
+    return _forms.pop_where(lambda _, form: form.survey_id == survey_id)
+
+
+def invalidate_event_forms(event_id: UUID) -> int:
+    """Drop the forms of every link to an instance of ``event_id`` after the event changed."""
+    return _forms.pop_where(lambda _, form: form.event_id == event_id)
+
+
+def get_public_form_cache_stats() -> dict[str, Any]:
+    return {
+        "entries": len(_forms),
+        "hits": _forms.hits,
+        "misses": _forms.misses,
+        "hit_rate": _forms.hit_rate,
+    }
@@ -0,0 +1,161 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+from collections.abc import AsyncIterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, NamedTuple
+
+import qrcode
+from PIL import Image
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.schemas.link import QRFormat
+
+logger = logging.getLogger(__name__)
+
+QR_MEDIA_TYPES = {
+    QRFormat.SVG: "image/svg+xml",
+    QRFormat.PNG: "image/png",
+}
+
+
+class QROptions(NamedTuple):
+    box_size: int
+    border: int
+    mask_pattern: int | None
+
+
+_images: LRUCache[tuple[str, QRFormat, QROptions], bytes] = LRUCache(max_entries=settings.QR_CACHE_MAX_ENTRIES)
+_pool: ProcessPoolExecutor | None = None
+
+
+def _matrix(url: str, options: QROptions) -> list[list[bool]]:
+    code = qrcode.QRCode(border=options.border, mask_pattern=options.mask_pattern)
+    code.add_data(url)
+    code.make(fit=True)
+    return code.get_matrix()
+
+
+def _svg(matrix: list[list[bool]], box_size: int) -> bytes:
+    """One path of horizontal runs of dark modules, a fraction of the size of a rect per module."""
+    path = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < len(row):
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < len(row) and row[x]:
+                x += 1
+            path.append(f"M{start} {y}h{x - start}v1H{start}z")
+    size = len(matrix)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" width="{size * box_size}" '
+        f'height="{size * box_size}" shape-rendering="crispEdges"><rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{"".join(path)}"/></svg>'
+    ).encode()
+
+
+def _png(matrix: list[list[bool]], box_size: int) -> bytes:
+    size = len(matrix)
+    modules = Image.frombytes("L", (size, size), bytes(0 if dark else 255 for row in matrix for dark in row))
+    # Scale the 1-bit image; scaling first and converting after costs twice as much
+    image = modules.convert("1").resize((size * box_size, size * box_size), Image.Resampling.NEAREST)
+    stream = io.BytesIO()
+    image.save(stream, format="PNG")
+    return stream.getvalue()
+
+
+def render_qr_codes(urls: Sequence[str], formats: Sequence[QRFormat], options: QROptions) -> list[list[bytes]]:
+    """Render every URL in every format, in order; runs in the render processes."""
+    rendered = []
+    for url in urls:
+        matrix = _matrix(url, options)
+        rendered.append(
+            [
+                _svg(matrix, options.box_size) if fmt == QRFormat.SVG else _png(matrix, options.box_size)
+                for fmt in formats
+            ]
+        )
+    return rendered
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool  # noqa: PLW0603
+    if _pool is None:
+        # Forking a process that runs threads can deadlock the child, so start clean interpreters
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.QR_RENDER_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Started {settings.QR_RENDER_PROCESSES} QR render processes")
+    return _pool
+
+
+async def _render(urls: Sequence[str], formats: Sequence[QRFormat], options: QROptions) -> list[list[bytes]]:
+    if settings.QR_RENDER_PROCESSES <= 0:
+        return await asyncio.to_thread(render_qr_codes, urls, formats, options)
+    return await asyncio.get_running_loop().run_in_executor(_get_pool(), render_qr_codes, urls, formats, options)
+
+
+def _options(box_size: int, border: int) -> QROptions:
+    return QROptions(box_size=box_size, border=border, mask_pattern=settings.QR_MASK_PATTERN)
+
+
+async def render_qr(url: str, fmt: QRFormat, *, box_size: int = 10, border: int = 4) -> bytes:
+    """Render one QR code off the event loop, or return it from the cache."""
+    options = _options(box_size, border)
+    image = _images.get((url, fmt, options))
+    if image is None:
+        [[image]] = await _render([url], [fmt], options)
+        _images.set((url, fmt, options), image)
+    return image
+
+
+async def iter_qr_codes(
+    urls: Sequence[str], formats: Sequence[QRFormat], *, box_size: int = 10, border: int = 4
+) -> AsyncIterator[list[bytes]]:
+    """
+    Yield the images of each URL, one per format, in URL order.
+
+    Cached images are reused. The rest are rendered ``QR_RENDER_BATCH`` URLs per task,
+    and every task is queued up front so all render processes stay busy while the
+    first images are already being streamed.
+    """
+    options = _options(box_size, border)
+    batches: list[tuple[Sequence[str], list[list[bytes | None]], asyncio.Task[list[list[bytes]]] | None]] = []
+    for start in range(0, len(urls), settings.QR_RENDER_BATCH):
+        chunk = urls[start : start + settings.QR_RENDER_BATCH]
+        cached = [[_images.get((url, fmt, options)) for fmt in formats] for url in chunk]
+        missing = [url for url, images in zip(chunk, cached, strict=True) if None in images]
+        task = asyncio.create_task(_render(missing, formats, options)) if missing else None
+        batches.append((chunk, cached, task))
+
+    try:
+        for chunk, cached, task in batches:
+            rendered = iter(await task) if task is not None else iter(())
+            for url, found in zip(chunk, cached, strict=True):
+                if None not in found:
+                    yield found  # type: ignore[misc]
+                    continue
+                images = next(rendered)
+                for fmt, image in zip(formats, images, strict=True):
+                    _images.set((url, fmt, options), image)
+                yield images
+    finally:
+        for _, _, task in batches:
+            if task is not None:
+                task.cancel()
+
+
+def get_qr_cache_stats() -> dict[str, Any]:
+    return {"entries": len(_images), "hits": _images.hits, "misses": _images.misses, "hit_rate": _images.hit_rate}
+
+
+def shutdown_qr_rendering() -> None:
+    global _pool  # noqa: PLW0603
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
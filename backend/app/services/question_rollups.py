@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.question_rollup import question_rollup_crud
+from app.db.session import SessionLocal, unit_of_work
+from app.models.question_rollup import QuestionRollup
+from app.schemas.stats import InstanceQuestionStats, QuestionStats
+from app.schemas.survey_flow import CompiledSurvey
+from app.services.event_stats import has_distribution, ordered_distribution
+from app.services.survey_cache import InvalidSurveySchemaError, get_compiled_survey
+
+logger = logging.getLogger(__name__)
+
+
+class RollupMetrics:
+    def __init__(self) -> None:
+        self.refreshes = 0
+        self.instances_refreshed = 0
+        self.failures = 0
+        self.last_refresh_ms: float | None = None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "refreshes": self.refreshes,
+            "instances_refreshed": self.instances_refreshed,
+            "failures": self.failures,
+            "last_refresh_ms": self.last_refresh_ms,
+        }
+
+
+_metrics = RollupMetrics()
+_refresher: asyncio.Task[None] | None = None
+
+
+async def refresh_rollups(db: AsyncSession) -> int:
+    """
+    Bring the question rollups up to date and return how many survey instances were recomputed.
+
+    Only instances with answers written or responses finished since the last refresh
+    (minus ``QUESTION_ROLLUP_LAG_SECONDS``, to catch transactions that were still open)
+    are recomputed, ``QUESTION_ROLLUP_BATCH_INSTANCES`` per statement. The first refresh
+    builds every instance. Workers take turns through an advisory lock; a worker that
+    finds the lock taken returns 0 right away.
+    """
+    async with unit_of_work(db):
+        if not await question_rollup_crud.try_lock_refresh(db):
+            return 0
+        watermark = await question_rollup_crud.get_watermark(db)
+        since = watermark - timedelta(seconds=settings.QUESTION_ROLLUP_LAG_SECONDS) if watermark else None
+        changed = await question_rollup_crud.get_changed_instances(db, since=since)
+
+        surveys: dict[UUID, CompiledSurvey] = {}
+        for survey_id in {row.survey_id for row in changed}:
+            try:
+                survey = await get_compiled_survey(db, survey_id)
+            except InvalidSurveySchemaError:
+                survey = None
+            if survey is not None:
+                surveys[survey_id] = survey
+        distribution_questions = sorted(
+            (survey_id, idx)
+            for survey_id, survey in surveys.items()
+            for idx, question in enumerate(survey.questions)
+            if has_distribution(question)
+        )
+
+        instance_ids = [row.survey_instance_id for row in changed]
+        for start in range(0, len(instance_ids), settings.QUESTION_ROLLUP_BATCH_INSTANCES):
+            await question_rollup_crud.refresh(
+                db,
+                survey_instance_ids=instance_ids[start : start + settings.QUESTION_ROLLUP_BATCH_INSTANCES],
+                distribution_questions=distribution_questions,
+            )
+    return len(instance_ids)
+
+
+async def _refresh_forever() -> None:
+    while True:
+        await asyncio.sleep(settings.QUESTION_ROLLUP_REFRESH_SECONDS)
+        started = time.perf_counter()
+        try:
+            async with SessionLocal() as db:
+                refreshed = await refresh_rollups(db)
+        except (OSError, SQLAlchemyError) as e:
+            _metrics.failures += 1
+            logger.error(f"Refreshing question rollups failed: {e}")
+            continue
+        _metrics.refreshes += 1
+        _metrics.instances_refreshed += refreshed
+        _metrics.last_refresh_ms = (time.perf_counter() - started) * 1000
+
+
+def start_rollup_refresher() -> None:
+    """Start refreshing rollups every ``QUESTION_ROLLUP_REFRESH_SECONDS``; called on application startup."""
+    global _refresher  # noqa: PLW0603
+    if settings.QUESTION_ROLLUP_REFRESH_SECONDS > 0 and (_refresher is None or _refresher.done()):
+        _refresher = asyncio.create_task(_refresh_forever())
+
+
+async def stop_rollup_refresher() -> None:
+    global _refresher  # noqa: PLW0603
+    if _refresher is not None:
+        _refresher.cancel()
+        await asyncio.gather(_refresher, return_exceptions=True)
+        _refresher = None
+
+
+def build_question_stats(
+    survey_instance_id: UUID, survey: CompiledSurvey, rollups: Sequence[QuestionRollup]
+) -> InstanceQuestionStats:
+    """Combine a survey's questions with their rollups; questions nobody reached get zeros."""
+    by_idx = {rollup.question_idx: rollup for rollup in rollups}
+    questions = []
+    for idx, question in enumerate(survey.questions):
+        rollup = by_idx.get(idx) or QuestionRollup(
+            reached=0, answered=0, scored=0, score_sum=0.0, followups=0, followups_answered=0
+        )
+        questions.append(
+            QuestionStats(
+                question_idx=idx,
+                question_text=question.text,
+                question_type=question.type,
+                reached=rollup.reached,
+                answered=rollup.answered,
+                skip_rate=(rollup.reached - rollup.answered) / rollup.reached if rollup.reached else 0.0,
+                average_score=rollup.score_sum / rollup.scored if rollup.scored else None,
+                distribution=ordered_distribution(question, Counter(rollup.distribution or {}))
+                if has_distribution(question)
+                else None,
+                followups=rollup.followups,
+                followup_rate=rollup.followups / rollup.answered if rollup.answered else 0.0,
+                followups_answered=rollup.followups_answered,
+            )
+        )
+    return InstanceQuestionStats(
+        survey_instance_id=survey_instance_id,
+        survey_id=survey.id,
+        refreshed_at=min((rollup.refreshed_at for rollup in rollups), default=None),
+        questions=questions,
+    )
+
+
+def get_rollup_metrics() -> dict[str, Any]:
+    return _metrics.snapshot()
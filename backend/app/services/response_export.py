@@ -0,0 +1,357 @@
+import asyncio
+import csv
+import io
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Sequence
+from datetime import datetime
+from enum import Enum
+from typing import Any, NamedTuple
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.crud.survey_response import survey_response_crud
+from app.db.session import ReadSessionLocal
+from app.schemas.survey_flow import CompiledSurvey, Question
+from app.services.flow_graph import answer_value
+
+RESPONSE_COLUMNS = ["Response ID", "Survey Instance", "Event", "Started At", "Finished At"]
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+}
+
+
+class ResponseRecord(NamedTuple):
+    """One response with its answers laid out in export column order."""
+
+    response_id: UUID
+    survey_instance_id: UUID
+    event_name: str
+    started_at: datetime | None
+    finished_at: datetime | None
+    answers: list[Any]
+
+
+class AnswerColumn(NamedTuple):
+    name: str
+    type: pa.DataType
+    convert: Callable[[Any], Any]
+
+
+def format_answer(value: Any) -> str:
+    """Render an answer value as a single CSV cell; skipped answers become empty cells."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    return str(value)
+
+
+def _to_number(value: Any) -> float | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_string_list(value: Any) -> list[str] | None:
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def _to_string(value: Any) -> str | None:
+    return None if value is None else format_answer(value)
+
+
+def _typed_column(question: Question) -> tuple[pa.DataType, Callable[[Any], Any]]:
+    """Pick the Arrow type of a question's answer column from its survey schema type."""
+    if question.type == "rating":
+        return pa.float64(), _to_number
+    if question.type == "checkbox":
+        return pa.list_(pa.string()), _to_string_list
+    return pa.string(), _to_string
+
+
+def _format_timestamp(value: datetime | None) -> str:
+    return value.isoformat() if value is not None else ""
+
+
+def answer_columns(questions: Sequence[Question]) -> tuple[list[AnswerColumn], dict[tuple[int, bool], int]]:
+    """
+    Lay out the answer columns and map ``(question_idx, is_followup)`` to a column.
+
+    Questions that can have a follow-up get two extra text columns for the follow-up
+    question and its answer; the follow-up answer's position is the one stored in the
+    map. Column names are the question texts, made unique where texts repeat.
+    """
+    columns: list[AnswerColumn] = []
+    positions: dict[tuple[int, bool], int] = {}
+    seen: dict[str, int] = {}
+
+    def add(name: str, data_type: pa.DataType, convert: Callable[[Any], Any]) -> int:
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            name = f"{name} ({seen[name]})"
+        columns.append(AnswerColumn(name, data_type, convert))
+        return len(columns) - 1
+
+    for idx, question in enumerate(questions):
+        positions[idx, False] = add(question.text, *_typed_column(question))
+        if question.can_followup:
+            add(f"{question.text} (follow-up question)", pa.string(), _to_string)
+            positions[idx, True] = add(f"{question.text} (follow-up answer)", pa.string(), _to_string)
+    return columns, positions
+
+
+async def iter_response_records(
+    questions: Sequence[Question], rows: AsyncIterable[Any]
+) -> AsyncIterator[ResponseRecord]:
+    """
+    Fold answer rows into one record per response.
+
+    ``rows`` must be ordered so that all answers of a response are adjacent (see
+    ``survey_response_crud.stream_export_rows``); only the response being assembled is
+    held in memory. Answers hold raw values, follow-up question columns their text.
+    """
+    columns, positions = answer_columns(questions)
+    record: ResponseRecord | None = None
+    async for row in rows:
+        if record is None or row.response_id != record.response_id:
+            if record is not None:
+                yield record
+            record = ResponseRecord(
+                response_id=row.response_id,
+                survey_instance_id=row.survey_instance_id,
+                event_name=row.event_name,
+                started_at=row.started_at,
+                finished_at=row.finished_at,
+                answers=[None] * len(columns),
+            )
+
+        # Responses without answers come through the outer join with an empty answer part
+        position = positions.get((row.question_idx, row.is_followup))
+        if position is None:
+            continue
+        record.answers[position] = answer_value(row.answer)
+        if row.is_followup:
+            record.answers[position - 1] = row.question_text
+
+    if record is not None:
+        yield record
+
+
+async def iter_csv_chunks(
+    questions: Sequence[Question],
+    rows: AsyncIterable[Any],
+    chunk_bytes: int | None = None,
+) -> AsyncIterator[str]:
+    """
+    Turn answer rows into CSV text with one line per response.
+
+    Only one chunk of output is held in memory; a chunk is emitted once it reaches
+    ``chunk_bytes`` (``EXPORT_CHUNK_BYTES`` by default).
+    """
+    chunk_bytes = chunk_bytes or settings.EXPORT_CHUNK_BYTES
+    columns, _ = answer_columns(questions)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(RESPONSE_COLUMNS + [column.name for column in columns])
+
+    async for record in iter_response_records(questions, rows):
+        writer.writerow(
+            [
+                record.response_id,
+                record.survey_instance_id,
+                record.event_name,
+                _format_timestamp(record.started_at),
+                _format_timestamp(record.finished_at),
+                *(format_answer(value) for value in record.answers),
+            ]
+        )
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+async def iter_ndjson_chunks(
+    questions: Sequence[Question],
+    rows: AsyncIterable[Any],
+    chunk_bytes: int | None = None,
+) -> AsyncIterator[str]:
+    """Turn answer rows into newline-delimited JSON, one typed object per response."""
+    chunk_bytes = chunk_bytes or settings.EXPORT_CHUNK_BYTES
+    columns, _ = answer_columns(questions)
+
+    buffer = io.StringIO()
+    async for record in iter_response_records(questions, rows):
+        line = {
+            "response_id": str(record.response_id),
+            "survey_instance_id": str(record.survey_instance_id),
+            "event": record.event_name,
+            "started_at": record.started_at.isoformat() if record.started_at else None,
+            "finished_at": record.finished_at.isoformat() if record.finished_at else None,
+        }
+        for column, value in zip(columns, record.answers, strict=True):
+            line[column.name] = column.convert(value)
+        buffer.write(json.dumps(line, ensure_ascii=False))
+        buffer.write("\n")
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def arrow_schema(questions: Sequence[Question]) -> pa.Schema:
+    columns, _ = answer_columns(questions)
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema(
+        [
+            ("response_id", pa.string()),
+            ("survey_instance_id", pa.string()),
+            ("event", pa.string()),
+            ("started_at", timestamp),
+            ("finished_at", timestamp),
+            *((column.name, column.type) for column in columns),
+        ]
+    )
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file that collects what a writer (Arrow, zipfile) writes so it can be streamed out."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _record_batch(schema: pa.Schema, questions: Sequence[Question], records: list[ResponseRecord]) -> pa.RecordBatch:
+    columns, _ = answer_columns(questions)
+    data: dict[str, list[Any]] = {
+        "response_id": [str(record.response_id) for record in records],
+        "survey_instance_id": [str(record.survey_instance_id) for record in records],
+        "event": [record.event_name for record in records],
+        "started_at": [record.started_at for record in records],
+        "finished_at": [record.finished_at for record in records],
+    }
+    for position, column in enumerate(columns):
+        data[column.name] = [column.convert(record.answers[position]) for record in records]
+    return pa.RecordBatch.from_pydict(data, schema=schema)
+
+
+async def iter_arrow_chunks(
+    questions: Sequence[Question],
+    rows: AsyncIterable[Any],
+    export_format: ExportFormat,
+    batch_rows: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Turn answer rows into a Parquet file or an Arrow IPC stream, batch by batch.
+
+    Every ``EXPORT_BATCH_ROWS`` responses become one record batch (one row group for
+    Parquet), which is encoded off the event loop and sent as soon as it is written.
+    """
+    batch_rows = batch_rows or settings.EXPORT_BATCH_ROWS
+    schema = arrow_schema(questions)
+    sink = ChunkSink()
+    if export_format == ExportFormat.PARQUET:
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    def write(records: list[ResponseRecord]) -> bytes:
+        writer.write_batch(_record_batch(schema, questions, records))
+        return sink.drain()
+
+    records: list[ResponseRecord] = []
+    async for record in iter_response_records(questions, rows):
+        records.append(record)
+        if len(records) >= batch_rows:
+            yield await asyncio.to_thread(write, records)
+            records = []
+
+    if records:
+        yield await asyncio.to_thread(write, records)
+    writer.close()
+    yield sink.drain()
+
+
+async def stream_survey_csv(
+    survey: CompiledSurvey,
+    *,
+    survey_instance_id: UUID | None = None,
+    session_factory: async_sessionmaker[AsyncSession] = ReadSessionLocal,
+) -> AsyncIterator[str]:
+    """
+    Stream a survey's responses as CSV straight from a server-side cursor.
+
+    The export opens its own session because it outlives the request handler that
+    returned the ``StreamingResponse``.
+    """
+    async with session_factory() as db:
+        rows = await survey_response_crud.stream_export_rows(
+            db, survey_id=survey.id, survey_instance_id=survey_instance_id
+        )
+        async for chunk in iter_csv_chunks(survey.questions, rows):
+            yield chunk
+
+
+async def stream_survey_export(
+    survey: CompiledSurvey,
+    export_format: ExportFormat,
+    *,
+    survey_instance_id: UUID | None = None,
+    session_factory: async_sessionmaker[AsyncSession] = ReadSessionLocal,
+) -> AsyncIterator[str | bytes]:
+    """Stream a survey's responses as NDJSON, Parquet or Arrow IPC from a server-side cursor."""
+    async with session_factory() as db:
+        rows = await survey_response_crud.stream_export_rows(
+            db, survey_id=survey.id, survey_instance_id=survey_instance_id
+        )
+        chunks: AsyncIterator[str | bytes]
+        if export_format == ExportFormat.NDJSON:
+            chunks = iter_ndjson_chunks(survey.questions, rows)
+        else:
+            chunks = iter_arrow_chunks(survey.questions, rows, export_format)
+        async for chunk in chunks:
+            yield chunk
@@ -0,0 +1,99 @@
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.survey_answer import survey_answer_crud
+from app.crud.survey_response import survey_response_crud
+from app.schemas.survey_flow import BulkResponseIn, BulkResponseResult, CompiledSurvey
+
+
+def _validate(response: BulkResponseIn, question_count: int) -> str | None:
+    """Return why an uploaded response cannot be stored, or ``None`` if it can."""
+    seen: set[int] = set()
+    for answer in response.answers:
+        if not 0 <= answer.question_idx < question_count:
+            return f"Question {answer.question_idx} does not exist"
+        if answer.question_idx in seen:
+            return f"Question {answer.question_idx} is answered twice"
+        seen.add(answer.question_idx)
+    return None
+
+
+async def ingest_responses(
+    db: AsyncSession,
+    *,
+    survey_instance_id: UUID,
+    survey: CompiledSurvey,
+    responses: Sequence[BulkResponseIn],
+) -> list[BulkResponseResult]:
+    """
+    Store complete responses uploaded by an offline client, one result per response.
+
+    Responses and answers are written with a handful of multi-row inserts and no
+    follow-ups are generated. The client's ids make uploads idempotent: an id that
+    already exists for this instance is a ``duplicate`` (answers it lacks are added,
+    existing ones are kept) and one that belongs to another instance a ``conflict``.
+    A missing ``finished_at`` means the response finished when it was uploaded.
+    Nothing is committed here.
+    """
+    now = datetime.now(UTC)
+    results: dict[int, BulkResponseResult] = {}
+    accepted: dict[UUID, BulkResponseIn] = {}
+    for position, response in enumerate(responses):
+        problem = _validate(response, len(survey.questions))
+        if problem is not None:
+            results[position] = BulkResponseResult(id=response.id, status="invalid", detail=problem)
+        elif response.id in accepted:
+            results[position] = BulkResponseResult(id=response.id, status="duplicate", detail="Repeated in request")
+        else:
+            accepted[response.id] = response
+
+    inserted = await survey_response_crud.insert_many(
+        db,
+        rows=[
+            {
+                "id": response.id,
+                "survey_id": survey.id,
+                "survey_instance_id": survey_instance_id,
+                "started_at": response.started_at or now,
+                "finished_at": response.finished_at or now,
+                "current_index": len(survey.questions),
+            }
+            for response in accepted.values()
+        ],
+    )
+
+    existing = [response_id for response_id in accepted if response_id not in inserted]
+    owners = await survey_response_crud.get_survey_instance_ids(db, ids=existing) if existing else {}
+    conflicts = {response_id for response_id in existing if owners.get(response_id) != survey_instance_id}
+
+    answer_rows: list[dict[str, Any]] = [
+        {
+            "response_id": response.id,
+            "question_idx": answer.question_idx,
+            "question_text": survey.questions[answer.question_idx].text,
+            "is_followup": False,
+            "answer": None if answer.skipped else answer.answer,
+        }
+        for response in accepted.values()
+        if response.id not in conflicts
+        for answer in response.answers
+    ]
+    if answer_rows:
+        await survey_answer_crud.insert_many(db, rows=answer_rows)
+
+    for position, response in enumerate(responses):
+        if position in results:
+            continue
+        if response.id in inserted:
+            results[position] = BulkResponseResult(id=response.id, status="created")
+        elif response.id in conflicts:
+            results[position] = BulkResponseResult(
+                id=response.id, status="conflict", detail="ID belongs to another survey instance"
+            )
+        else:
+            results[position] = BulkResponseResult(id=response.id, status="duplicate")
+    return [results[position] for position in range(len(responses))]
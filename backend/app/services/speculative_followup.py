@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.crud.survey_response import survey_response_crud
+from app.db.session import SessionLocal
+from app.services.followup_service import get_followup_question
+
+logger = logging.getLogger(__name__)
+
+# Keep references to late follow-up tasks so they are not garbage collected mid-flight
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def get_followup_within_deadline(  # noqa: PLR0913
+    *,
+    response_id: UUID,
+    question_idx: int,
+    survey_description: str,
+    question_text: str,
+    participant_answer: dict[str, Any] | None,
+    question_description: str = "",
+    question_type: str = "text",
+) -> str | None:
+    """
+    Race follow-up generation against ``FOLLOWUP_DEADLINE_MS``.
+
+    Returns the follow-up if the model answers in time. Otherwise returns ``None`` so
+    the flow moves on at once, and the still-running call is either offered to the
+    participant later (``FOLLOWUP_LATE_MODE="offer"``) or cancelled.
+    """
+    generation = asyncio.create_task(
+        get_followup_question(
+            survey_description=survey_description,
+            question_text=question_text,
+            participant_answer=participant_answer,
+            question_description=question_description,
+            question_type=question_type,
+        )
+    )
+    if settings.FOLLOWUP_DEADLINE_MS <= 0:
+        return await generation
+
+    done, _ = await asyncio.wait({generation}, timeout=settings.FOLLOWUP_DEADLINE_MS / 1000)
+    if generation in done:
+        return generation.result()
+
+    if settings.FOLLOWUP_LATE_MODE != "offer":
+        generation.cancel()
+        return None
+
+    task = asyncio.create_task(_offer_late_followup(generation, response_id=response_id, question_idx=question_idx))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return None
+
+
+async def _offer_late_followup(generation: asyncio.Task, *, response_id: UUID, question_idx: int) -> None:
+    """Wait for a follow-up that missed the deadline and record it as a pending offer."""
+    followup = await generation
+    if not followup:
+        return
+    try:
+        async with SessionLocal() as db:
+            await survey_response_crud.add_late_followup(
+                db, response_id=response_id, question_idx=question_idx, followup_text=followup
+            )
+            await db.commit()
+    except SQLAlchemyError as e:
+        logger.error(f"Could not store late follow-up for response {response_id}: {e}")
+
+
+async def drain_late_followups() -> None:
+    """Let in-flight late follow-ups finish; called on application shutdown."""
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+from typing import Any, NamedTuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.survey_answer import survey_answer_crud
+from app.crud.survey_response import survey_response_crud
+from app.db.session import SessionLocal, is_transient_error, unit_of_work
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_BACKOFF_SECONDS = 5.0
+
+
+class Submission(NamedTuple):
+    """A validated public submission: its response row and its answer rows."""
+
+    response: dict[str, Any]
+    answers: list[dict[str, Any]]
+
+
+class SubmissionMetrics:
+    """Counters for write-behind submissions, exposed through the metrics endpoint."""
+
+    def __init__(self) -> None:
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.retries = 0
+        self.sync_fallbacks = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "durability": settings.SUBMIT_DURABILITY,
+            "queued": self.queued,
+            "pending": _queue.qsize() if _queue is not None else 0,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "retries": self.retries,
+            "sync_fallbacks": self.sync_fallbacks,
+        }
+
+
+_metrics = SubmissionMetrics()
+_queue: asyncio.Queue[Submission | None] | None = None
+_flusher: asyncio.Task[None] | None = None
+_draining = False
+
+
+async def write_submissions(db: AsyncSession, submissions: Sequence[Submission]) -> None:
+    """Insert submissions with one multi-row insert per table. Nothing is committed here."""
+    await survey_response_crud.insert_many(db, rows=[submission.response for submission in submissions])
+    answers = [answer for submission in submissions for answer in submission.answers]
+    if answers:
+        await survey_answer_crud.insert_many(db, rows=answers)
+
+
+async def save_submission(db: AsyncSession, submission: Submission) -> None:
+    """
+    Store a submission according to ``SUBMIT_DURABILITY``.
+
+    In ``"write_behind"`` mode the submission is queued for the background flusher and
+    is lost if the worker dies before the next flush. Submissions are committed on
+    ``db`` instead when durability is ``"sync"``, the queue is full or the worker is
+    shutting down.
+    """
+    if settings.SUBMIT_DURABILITY == "write_behind" and not _draining:
+        try:
+            _get_queue().put_nowait(submission)
+        except asyncio.QueueFull:
+            _metrics.sync_fallbacks += 1
+        else:
+            _metrics.queued += 1
+            _ensure_flusher()
+            return
+
+    async with unit_of_work(db):
+        await write_submissions(db, [submission])
+
+
+def _get_queue() -> asyncio.Queue[Submission | None]:
+    global _queue  # noqa: PLW0603
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=settings.SUBMIT_QUEUE_MAX_SIZE)
+    return _queue
+
+
+def _ensure_flusher() -> None:
+    global _flusher  # noqa: PLW0603
+    if _flusher is None or _flusher.done():
+        _flusher = asyncio.create_task(_flush_forever())
+
+
+async def _next_batch(queue: asyncio.Queue[Submission | None]) -> list[Submission]:
+    """
+    Wait for a submission, then collect more for up to ``SUBMIT_FLUSH_INTERVAL_MS``.
+
+    A ``None`` in the queue (put there by ``drain_submissions``) ends the batch early.
+    """
+    batch: list[Submission] = []
+    loop = asyncio.get_running_loop()
+    deadline = None
+    while len(batch) < settings.SUBMIT_FLUSH_MAX_ROWS:
+        if deadline is None:
+            submission = await queue.get()
+        else:
+            remaining = deadline - loop.time()
+            try:
+                submission = queue.get_nowait() if remaining <= 0 else await asyncio.wait_for(queue.get(), remaining)
+            except (asyncio.QueueEmpty, TimeoutError):
+                break
+        if submission is None:
+            queue.task_done()
+            break
+        batch.append(submission)
+        if deadline is None:
+            deadline = loop.time() + settings.SUBMIT_FLUSH_INTERVAL_MS / 1000
+    return batch
+
+
+async def _flush_forever() -> None:
+    queue = _get_queue()
+    while True:
+        batch = await _next_batch(queue)
+        if not batch:
+            continue
+        try:
+            await _flush(batch)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def _write(batch: Sequence[Submission]) -> None:
+    """
+    Write submissions in one transaction.
+
+    While the database is unreachable the write is retried with exponential backoff,
+    for up to ``SUBMIT_RETRY_MAX_SECONDS``; other errors are raised at once.
+    """
+    loop = asyncio.get_running_loop()
+    give_up_at = loop.time() + settings.SUBMIT_RETRY_MAX_SECONDS
+    delay = settings.SUBMIT_RETRY_BACKOFF_MS / 1000
+    while True:
+        try:
+            async with SessionLocal() as db, unit_of_work(db):
+                await write_submissions(db, batch)
+        except (OSError, SQLAlchemyError) as e:
+            if not is_transient_error(e) or loop.time() + delay > give_up_at:
+                raise
+            _metrics.retries += 1
+            logger.warning(f"Writing {len(batch)} queued submissions failed, retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_BACKOFF_SECONDS)
+        else:
+            return
+
+
+async def _flush(batch: list[Submission]) -> None:
+    """
+    Write a batch in one transaction, retrying one by one if the batch fails.
+
+    The submissions were already acknowledged, so an unreachable database is waited
+    out (see ``_write``); only rows the database keeps rejecting are dropped.
+    """
+    try:
+        await _write(batch)
+    except (OSError, SQLAlchemyError) as e:
+        if is_transient_error(e):
+            _metrics.failed += len(batch)
+            ids = ", ".join(str(submission.response["id"]) for submission in batch)
+            logger.error(f"Dropping queued submissions {ids}, the database stayed unreachable: {e}")
+            return
+        logger.error(f"Writing {len(batch)} queued submissions failed, retrying one by one: {e}")
+    else:
+        _metrics.batches += 1
+        _metrics.written += len(batch)
+        return
+
+    for submission in batch:
+        try:
+            await _write([submission])
+        except (OSError, SQLAlchemyError) as e:
+            _metrics.failed += 1
+            logger.error(f"Dropping queued submission {submission.response['id']}: {e}")
+        else:
+            _metrics.batches += 1
+            _metrics.written += 1
+
+
+async def drain_submissions() -> None:
+    """
+    Write every queued submission and stop the flusher; called on application shutdown.
+
+    Submissions arriving while the queue drains are committed synchronously.
+    """
+    global _queue, _flusher, _draining  # noqa: PLW0603
+    _draining = True
+    try:
+        if _queue is not None:
+            _ensure_flusher()
+            await _queue.put(None)  # flush the open batch without waiting out the interval
+            await _queue.join()
+        if _flusher is not None:
+            _flusher.cancel()
+            await asyncio.gather(_flusher, return_exceptions=True)
+    finally:
+        _queue = None
+        _flusher = None
+        _draining = False
+
+
+def get_submission_metrics() -> dict[str, Any]:
+    return _metrics.snapshot()
@@ -0,0 +1,108 @@
+import math
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.crud.survey import survey_crud
+from app.models.survey import Survey
+from app.schemas.survey_flow import CompiledSurvey, Question
+from app.services.flow_graph import RoutingError, build_flow
+
+# Bump when the compiled format changes; stored flows of another version are recompiled
+FLOW_FORMAT_VERSION = 1
+
+_surveys: LRUCache[UUID, CompiledSurvey] = LRUCache(
+    max_entries=settings.SURVEY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SURVEY_CACHE_TTL_SECONDS,
+)
+
+
+class InvalidSurveySchemaError(ValueError):
+    """Raised when a survey's JSON schema cannot be used by the survey flow."""
+
+
+def compile_survey(survey: Survey) -> CompiledSurvey:
+    """
+    Validate a survey's raw JSONB schema into immutable questions and a flow graph.
+
+    See ``app.services.flow_graph.build_flow`` for the branching and skip logic a
+    question can carry.
+
+    Raises:
+        InvalidSurveySchemaError: If the schema has no usable ``questions`` list or its
+            routing is invalid
+    """
+    schema = survey.schema
+    if not isinstance(schema, dict) or "questions" not in schema:
+        raise InvalidSurveySchemaError("Invalid survey schema")
+
+    raw_questions = schema["questions"]
+    if not isinstance(raw_questions, list) or not raw_questions:
+        raise InvalidSurveySchemaError("Invalid survey questions")
+
+    try:
+        questions = tuple(Question.model_validate(question) for question in raw_questions)
+    except ValidationError as err:
+        raise InvalidSurveySchemaError("Invalid survey questions") from err
+
+    try:
+        flow = build_flow(raw_questions)
+    except RoutingError as err:
+        raise InvalidSurveySchemaError(str(err)) from err
+
+    return CompiledSurvey(
+        id=survey.id,
+        title=survey.title,
+        is_published=survey.is_published,
+        questions=questions,
+        flow=flow,
+        format_version=FLOW_FORMAT_VERSION,
+    )
+
+
+def load_compiled_survey(survey: Survey) -> CompiledSurvey:
+    """
+    Return the flow stored with a published survey, compiling the schema when there is none.
+
+    Raises:
+        InvalidSurveySchemaError: If the survey has to be compiled and its schema is unusable
+    """
+    stored = survey.compiled_flow
+    if stored and stored.get("format_version") == FLOW_FORMAT_VERSION:
+        try:
+            return CompiledSurvey.model_validate(stored)
+        except ValidationError:
+            pass  # fall back to the schema the flow was compiled from
+    return compile_survey(survey)
+
+
+async def get_compiled_survey(db: AsyncSession, survey_id: UUID) -> CompiledSurvey | None:
+    """
+    Return the compiled survey for ``survey_id``, loading it on a cache miss.
+
+    Published surveys use the flow compiled when they were published (see
+    ``publish_survey``). They are immutable and stay cached until evicted; drafts expire after
+    ``SURVEY_CACHE_TTL_SECONDS`` so edits made on other workers show up.
+
+    Raises:
+        InvalidSurveySchemaError: If the stored schema is unusable
+    """
+    compiled = _surveys.get(survey_id)
+    if compiled is not None:
+        return compiled
+
+    survey = await survey_crud.get(db, id=survey_id)
+    if survey is None:
+        return None
+
+    compiled = load_compiled_survey(survey)
+    _surveys.set(survey_id, compiled, ttl_seconds=math.inf if compiled.is_published else None)
+    return compiled
+
+
+def invalidate_survey(survey_id: UUID) -> None:
+    """Drop a survey from the cache after its schema or publish state changed."""
+    _surveys.pop(survey_id)
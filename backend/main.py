@@ -1,13 +1,44 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.security import shutdown_password_hashing
+from app.db.session import dispose_engines
+from app.services.answer_analysis import drain_analysis
+from app.services.chat_memory import drain_chat_summaries
+from app.services.flow_state import drain_flow_state
+from app.services.followup_service import close_llm_client
+from app.services.qr_codes import shutdown_qr_rendering
+from app.services.question_rollups import start_rollup_refresher, stop_rollup_refresher
+from app.services.speculative_followup import drain_late_followups
+from app.services.submission_queue import drain_submissions
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    start_rollup_refresher()
+    yield
+    await stop_rollup_refresher()
+    await drain_late_followups()
+    await close_llm_client()
+    await drain_analysis()
+    await drain_chat_summaries()
+    await drain_submissions()
+    await drain_flow_state()
+    shutdown_password_hashing()
+    shutdown_qr_rendering()
+    await dispose_engines()
+
 
 app = FastAPI(
     title="Reventa API",
     description="API for the Reventa platform",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware configuration
@@ -17,6 +48,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -9,6 +9,8 @@ from uuid import UUID
 import httpx
 import pandas as pd
 
+EXPORT_FORMATS = ["csv", "ndjson", "parquet", "arrow"]
+
 
 # Instead of TypedDict, use a regular dict with type annotation
 # This allows for dynamic keys
@@ -24,22 +26,31 @@ async def get_responses_from_api(
         headers["Authorization"] = f"Bearer {api_key}"
 
     async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers)
-
-        if response.status_code == 404:
-            print(f"Survey instance {survey_instance_id} not found")
-            return []
-
-        if response.status_code != 200:
-            print(f"Error: {response.status_code} - {response.text}")
-            return []
-
-        try:
-            responses: list[dict[str, Any]] = response.json()
-            print(f"Retrieved {len(responses)} responses")
-        except json.JSONDecodeError:
-            print(f"Error decoding response: {response.text}")
-            return []
+        # The endpoint is paginated; follow X-Next-Cursor until the last page
+        responses: list[dict[str, Any]] = []
+        params: dict[str, str] = {}
+        while True:
+            response = await client.get(url, headers=headers, params=params)
+
+            if response.status_code == 404:
+                print(f"Survey instance {survey_instance_id} not found")
+                return []
+
+            if response.status_code != 200:
+                print(f"Error: {response.status_code} - {response.text}")
+                return []
+
+            try:
+                responses.extend(response.json())
+            except json.JSONDecodeError:
+                print(f"Error decoding response: {response.text}")
+                return []
+
+            next_cursor = response.headers.get("X-Next-Cursor")
+            if not next_cursor:
+                break
+            params = {"cursor": next_cursor}
+        print(f"Retrieved {len(responses)} responses")
 
         # Process the responses
         result: list[dict[str, Any]] = []
@@ -73,6 +84,50 @@ async def get_responses_from_api(
         return result
 
 
+async def stream_export(  # noqa: PLR0913
+    survey_id: UUID,
+    *,
+    survey_instance_id: UUID | None,
+    export_format: str,
+    output_file: str,
+    api_base_url: str,
+    api_key: str | None = None,
+) -> None:
+    """
+    Stream a server-side export straight to disk.
+
+    The server already produces the final file (CSV, NDJSON, Parquet or Arrow IPC),
+    so chunks are written as they arrive without parsing or buffering the responses.
+    """
+    url = f"{api_base_url}/api/v1/surveys/{survey_id}/responses/export"
+    if export_format != "csv":
+        url += f"/{export_format}"
+    params = {"survey_instance_id": str(survey_instance_id)} if survey_instance_id else {}
+
+    headers: dict[str, str] = {}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+
+    async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, read=None)) as client:
+        async with client.stream("GET", url, params=params, headers=headers) as response:
+            if response.status_code == 404:
+                print(f"Survey {survey_id} not found")
+                return
+
+            if response.status_code != 200:
+                await response.aread()
+                print(f"Error: {response.status_code} - {response.text}")
+                return
+
+            written = 0
+            with open(output_file, "wb") as output:
+                async for chunk in response.aiter_bytes():
+                    output.write(chunk)
+                    written += len(chunk)
+
+    print(f"Exported {written / 1_000_000:.1f} MB of {export_format} to {output_file}")
+
+
 async def export_to_csv(
     survey_instance_id: UUID, output_file: str, api_base_url: str, api_key: str | None = None
 ) -> None:
@@ -93,21 +148,51 @@ async def export_to_csv(
 
 def main() -> None:
     """Parse command line arguments and run export."""
-    parser = argparse.ArgumentParser(description="Export survey responses to CSV")
-    parser.add_argument("survey_instance_id", help="UUID of the survey instance")
-    parser.add_argument("--output", "-o", default="responses.csv", help="Output CSV file path")
+    parser = argparse.ArgumentParser(description="Export survey responses")
+    parser.add_argument("survey_instance_id", nargs="?", help="UUID of the survey instance")
+    parser.add_argument(
+        "--survey-id",
+        help="UUID of the survey; streams the server-side export (all instances unless one is given)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="csv",
+        help="Export format when streaming with --survey-id",
+    )
+    parser.add_argument("--output", "-o", help="Output file path (default: responses.<format>)")
     parser.add_argument("--api-url", default="https://reventa.onrender.com", help="Base URL for the Reventa API")
     parser.add_argument("--api-key", help="API key for authentication")
 
     args = parser.parse_args()
 
     try:
-        survey_instance_id = UUID(args.survey_instance_id)
+        survey_instance_id = UUID(args.survey_instance_id) if args.survey_instance_id else None
+        survey_id = UUID(args.survey_id) if args.survey_id else None
     except ValueError:
-        print("Invalid survey instance ID. Must be a valid UUID.")
+        print("Invalid survey or survey instance ID. Must be a valid UUID.")
         sys.exit(1)
 
-    asyncio.run(export_to_csv(survey_instance_id, args.output, args.api_url, args.api_key))
+    output = args.output or f"responses.{args.format}"
+    if survey_id is not None:
+        asyncio.run(
+            stream_export(
+                survey_id,
+                survey_instance_id=survey_instance_id,
+                export_format=args.format,
+                output_file=output,
+                api_base_url=args.api_url,
+                api_key=args.api_key,
+            )
+        )
+    elif survey_instance_id is not None:
+        if args.format != "csv":
+            print("--format requires --survey-id")
+            sys.exit(1)
+        # Legacy path: download the instance's responses as JSON and flatten them locally
+        asyncio.run(export_to_csv(survey_instance_id, output, args.api_url, args.api_key))
+    else:
+        parser.error("a survey instance ID or --survey-id is required")
 
 
 if __name__ == "__main__":
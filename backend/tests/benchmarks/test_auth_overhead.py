@@ -0,0 +1,54 @@
+"""Auth overhead of an authenticated request, with and without the auth cache.
+
+Times ``get_current_user`` (JWT decode plus resolving the user and organization)
+and counts the statements it sends. Needs TEST_DATABASE_URL (see tests/conftest.py).
+"""
+
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import auth_cache
+from app.core.security import create_access_token, get_password_hash
+from app.core.user import get_current_user
+from app.models.organization import Organization
+from app.models.user import User
+
+pytestmark = pytest.mark.benchmark
+
+REQUESTS = 500
+
+
+async def test_auth_overhead_per_request(db_engine, db_session, count_statements):
+    org = Organization(name="Acme")
+    db_session.add(org)
+    await db_session.flush()
+    user = User(org_id=org.id, email="someone@example.com", hashed_password=get_password_hash("secret"))
+    db_session.add(user)
+    await db_session.commit()
+    token = create_access_token(user.id, claims={"org": str(org.id), "ver": user.token_version})
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False, autoflush=False)
+
+    async def run(*, cached):
+        auth_cache._users.clear()
+        with count_statements() as statements:
+            begin = time.perf_counter()
+            for _ in range(REQUESTS):
+                if not cached:
+                    auth_cache._users.clear()
+                async with session_factory() as db:  # a session per request, as in the app
+                    await get_current_user(token=token, db=db)
+            elapsed = time.perf_counter() - begin
+        return elapsed / REQUESTS * 1e6, len(statements) / REQUESTS
+
+    uncached_us, uncached_statements = await run(cached=False)
+    cached_us, cached_statements = await run(cached=True)
+    print(
+        f"\nauth per request: uncached {uncached_us:.0f} µs / {uncached_statements:.2f} statements, "
+        f"cached {cached_us:.0f} µs / {cached_statements:.3f} statements"
+    )
+
+    assert uncached_statements == 1
+    assert cached_statements == 1 / REQUESTS  # only the first request loads the user
+    assert cached_us < uncached_us
@@ -0,0 +1,84 @@
+"""Event statistics are aggregated in the database rather than in Python.
+
+Seeds an event with many survey instances and responses and checks that
+``get_event_stats`` answers with a fixed number of statements and correct
+figures. Needs TEST_DATABASE_URL (see tests/conftest.py).
+"""
+
+import time
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_instance import SurveyInstance
+from app.models.survey_response import SurveyResponse
+from app.routers import stats
+
+pytestmark = pytest.mark.benchmark
+
+INSTANCES = 200
+RESPONSES_PER_INSTANCE = 50
+
+
+async def test_event_stats_is_set_based(db_session, make_survey_instance, count_statements):
+    first = await make_survey_instance([{"text": "Rate the talk", "type": "rating"}])
+    instance_ids = [first.id] + [uuid.uuid4() for _ in range(INSTANCES - 1)]
+    await db_session.execute(
+        insert(SurveyInstance),
+        [
+            {"id": instance_id, "org_id": first.org_id, "event_id": first.event_id, "survey_id": first.survey_id}
+            for instance_id in instance_ids[1:]
+        ],
+    )
+
+    now = datetime.now(UTC)
+    responses, answers = [], []
+    for instance_idx, instance_id in enumerate(instance_ids):
+        for response_idx in range(RESPONSES_PER_INSTANCE):
+            response_id = uuid.uuid4()
+            finished = response_idx % 2 == 0
+            responses.append(
+                {
+                    "id": response_id,
+                    "survey_id": first.survey_id,
+                    "survey_instance_id": instance_id,
+                    "current_index": 1 if finished else 0,
+                    "finished_at": now if finished else None,
+                }
+            )
+            # Only the first instance is scored; its responses alternate between 2 and 4
+            value = (2 if response_idx % 2 else 4) if instance_idx == 0 else "free text"
+            answers.append(
+                {
+                    "id": uuid.uuid4(),
+                    "response_id": response_id,
+                    "question_idx": 0,
+                    "question_text": "Rate the talk",
+                    "answer": {"value": value},
+                }
+            )
+    await db_session.execute(insert(SurveyResponse), responses)
+    await db_session.execute(insert(SurveyAnswer), answers)
+    await db_session.commit()
+
+    with count_statements() as statements:
+        begin = time.perf_counter()
+        result = await stats.get_event_stats(id=first.event_id, db=db_session)
+        elapsed = time.perf_counter() - begin
+
+    print(f"\nevent stats over {len(responses)} responses: {elapsed * 1000:.2f} ms, {len(statements)} statements")
+    assert len(statements) == 2  # event lookup + aggregation
+
+    assert result.total_responses == INSTANCES * RESPONSES_PER_INSTANCE
+    assert result.completed_responses == result.total_responses // 2
+    assert result.completion_percentage == pytest.approx(50.0)
+    assert result.average_score == pytest.approx(3.0)
+    assert len(result.instances) == INSTANCES
+
+    by_id = {instance.instance_id: instance for instance in result.instances}
+    assert by_id[first.id].average_score == pytest.approx(3.0)
+    assert by_id[instance_ids[1]].average_score is None
+    assert by_id[instance_ids[1]].total_responses == RESPONSES_PER_INSTANCE
@@ -0,0 +1,57 @@
+"""Minting badge links in bulk versus one ``POST /survey-instances/link`` call per badge.
+
+Mints BADGES links with QR codes through the bulk endpoint, rendered in the QR process
+pool and streamed as a ZIP, and times a sample of single-link calls for comparison.
+Needs TEST_DATABASE_URL (see tests/conftest.py).
+"""
+
+import io
+import time
+import zipfile
+
+import pytest
+
+from app.routers import survey_instances
+from app.schemas.link import LinkBulkCreate, LinkCreate, QRFormat
+from app.services import qr_codes
+from app.services.link_bundles import LinkBundleFormat
+
+pytestmark = pytest.mark.benchmark
+
+BADGES = 5000
+SERIAL_SAMPLE = 50
+
+
+async def test_bulk_minting_5000_badges(db_session, make_survey_instance, count_statements):
+    instance = await make_survey_instance([{"text": "Rate the talk", "type": "rating"}])
+    qr_codes._images.clear()
+
+    begin = time.perf_counter()
+    for _ in range(SERIAL_SAMPLE):
+        await survey_instances.create_survey_link(
+            link_in=LinkCreate(org_id=instance.org_id, survey_instance_id=instance.id), db=db_session
+        )
+    serial_seconds = (time.perf_counter() - begin) / SERIAL_SAMPLE * BADGES
+
+    links_in = LinkBulkCreate(
+        survey_instance_id=instance.id,
+        attendees=[f"Badge {idx:05d}" for idx in range(BADGES)],
+        qr_formats=[QRFormat.SVG],
+    )
+    with count_statements() as statements:
+        begin = time.perf_counter()
+        response = await survey_instances.create_survey_links_bulk(
+            links_in=links_in, format=LinkBundleFormat.ZIP, db=db_session
+        )
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        elapsed = time.perf_counter() - begin
+    qr_codes.shutdown_qr_rendering()
+    qr_codes._images.clear()
+
+    print(
+        f"\n{BADGES} badges in {elapsed:.1f} s ({len(body) / 1e6:.1f} MB ZIP, {len(statements)} statements); "
+        f"one call per badge would take about {serial_seconds:.0f} s"
+    )
+    assert len(zipfile.ZipFile(io.BytesIO(body)).namelist()) == BADGES + 1  # the images and links.csv
+    assert len(statements) <= 2  # the survey instance and one INSERT for every link
+    assert elapsed < serial_seconds / 2
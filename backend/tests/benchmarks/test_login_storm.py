@@ -0,0 +1,73 @@
+"""Survey flow latency while logins hash passwords.
+
+Runs a burst of logins and answers survey questions in the meantime; no answer may
+wait behind a bcrypt run. Needs TEST_DATABASE_URL (see tests/conftest.py).
+"""
+
+import asyncio
+import gc
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import security
+from app.core.security import get_password_hash
+from app.core.user import authenticate_user
+from app.models.organization import Organization
+from app.models.user import User
+from app.routers import survey_flow
+from app.schemas.survey_flow import AnswerIn
+from app.services import speculative_followup
+
+pytestmark = pytest.mark.benchmark
+
+LOGINS = 8
+
+
+async def test_login_storm_leaves_survey_flows_responsive(db_engine, db_session, make_survey_instance, monkeypatch):
+    async def no_followup(**kwargs):
+        return None
+
+    monkeypatch.setattr(speculative_followup, "get_followup_question", no_followup)
+    begin = time.perf_counter()
+    org = Organization(name="Acme")
+    db_session.add(org)
+    await db_session.flush()
+    db_session.add(User(org_id=org.id, email="someone@example.com", hashed_password=get_password_hash("secret")))
+    await db_session.commit()
+    hash_seconds = time.perf_counter() - begin
+    instance = await make_survey_instance([{"text": f"Question {idx}", "type": "rating"} for idx in range(5)])
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False, autoflush=False)
+
+    async def login():
+        async with session_factory() as db:
+            return await authenticate_user(db, "someone@example.com", "secret")
+
+    # A full collection of this process's heap pauses the loop for longer than a bcrypt run
+    gc.collect()
+    gc.disable()
+    try:
+        storm = asyncio.gather(*(login() for _ in range(LOGINS)))
+        timings = []
+        async with session_factory() as db:
+            while not storm.done():
+                started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db)
+                result = None
+                while result is None or not result.done:
+                    begin = time.perf_counter()
+                    result = await survey_flow.submit_answer(
+                        AnswerIn(answer={"value": 4}), response_id=started.response_id, db=db
+                    )
+                    timings.append(time.perf_counter() - begin)
+        users = await storm
+    finally:
+        gc.enable()
+        security.shutdown_password_hashing()
+
+    print(
+        f"\n{len(timings)} answers during {LOGINS} logins; slowest {max(timings) * 1000:.0f} ms, bcrypt {hash_seconds * 1000:.0f} ms"
+    )
+    assert all(user is not None for user in users)
+    assert len(timings) >= 4 * LOGINS  # answers kept flowing while the logins hashed
+    assert max(timings) < hash_seconds / 2  # no answer waited behind a bcrypt run
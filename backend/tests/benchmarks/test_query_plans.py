@@ -0,0 +1,322 @@
+"""Query-plan regression harness for the CRUD layer.
+
+Runs every CRUD query in ``app/crud`` against a seeded test database, then EXPLAINs
+each statement it sent with ``enable_seqscan`` off. With sequential scans priced out,
+the planner only picks one when no index can serve the query, so any ``Seq Scan`` node
+means a missing index. Needs TEST_DATABASE_URL (see tests/conftest.py).
+
+New CRUD methods must be added to ``CASES`` (or, with a reason, to ``EXEMPT``);
+``test_every_crud_method_is_covered`` fails otherwise.
+"""
+
+import importlib
+import inspect
+import pkgutil
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+
+import app.crud
+from app.core.security import get_password_hash
+from app.crud.answer_analysis import answer_analysis_crud
+from app.crud.base import CRUDBase
+from app.crud.chat_history import chat_history_crud
+from app.crud.chat_summary import chat_summary_crud
+from app.crud.event import event_crud
+from app.crud.followup_decision import followup_decision_crud
+from app.crud.link import link_crud
+from app.crud.org_allowed_domain import org_allowed_domain_crud
+from app.crud.organization import organization_crud
+from app.crud.question_rollup import question_rollup_crud
+from app.crud.survey import survey_crud
+from app.crud.survey_answer import survey_answer_crud
+from app.crud.survey_instance import survey_instance_crud
+from app.crud.survey_response import survey_response_crud
+from app.crud.user import user_crud
+from app.models.event import EventStatus
+from app.models.link import Link
+from app.models.org_allowed_domain import OrgAllowedDomain
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_response import SurveyResponse
+from app.models.user import User
+
+pytestmark = pytest.mark.benchmark
+
+Case = Callable[[Any, SimpleNamespace], Awaitable[Any]]
+
+
+async def _drain(result: Any) -> None:
+    async for _ in result:
+        pass
+
+
+CASES: dict[str, Case] = {
+    "answer_analysis.get_pending": lambda db, s: answer_analysis_crud.get_pending(
+        db, survey_instance_id=s.instance_id, skip_questions=[0], limit=100
+    ),
+    "answer_analysis.count_pending": lambda db, s: answer_analysis_crud.count_pending(
+        db, survey_instance_id=s.instance_id, skip_questions=[0]
+    ),
+    "answer_analysis.get_by_keys": lambda db, s: answer_analysis_crud.get_by_keys(db, keys=["k" * 64]),
+    "answer_analysis.insert_many": lambda db, s: answer_analysis_crud.insert_many(
+        db, rows=[{"answer_id": s.answer_id, "key": "k" * 64, "sentiment": "neutral", "themes": []}]
+    ),
+    "answer_analysis.get_sentiment_counts": lambda db, s: answer_analysis_crud.get_sentiment_counts(
+        db, survey_instance_id=s.instance_id
+    ),
+    "answer_analysis.get_top_themes": lambda db, s: answer_analysis_crud.get_top_themes(
+        db, survey_instance_id=s.instance_id, limit=10
+    ),
+    "chat_history.get_by_session_id": lambda db, s: chat_history_crud.get_by_session_id(db, session_id="s1"),
+    "chat_history.add_message": lambda db, s: chat_history_crud.add_message(
+        db, session_id="s1", role="human", content="hi"
+    ),
+    "chat_history.get_latest_by_session_id": lambda db, s: chat_history_crud.get_latest_by_session_id(
+        db, session_id="s1", limit=20
+    ),
+    "chat_history.add_messages": lambda db, s: chat_history_crud.add_messages(
+        db, session_id="s1", messages=[{"type": "human", "data": {"content": "hi"}}]
+    ),
+    "chat_history.clear_session_history": lambda db, s: chat_history_crud.clear_session_history(db, session_id="s2"),
+    "chat_summary.get_by_session_id": lambda db, s: chat_summary_crud.get_by_session_id(db, session_id="s1"),
+    "chat_summary.upsert": lambda db, s: chat_summary_crud.upsert(
+        db, session_id="s1", summary="Earlier messages", last_message_id=1
+    ),
+    "event.get_by_org_id": lambda db, s: event_crud.get_by_org_id(db, org_id=s.org_id),
+    "event.get_by_name": lambda db, s: event_crud.get_by_name(db, name="Benchmark event", org_id=s.org_id),
+    "event.get_active_events": lambda db, s: event_crud.get_active_events(db, org_id=s.org_id),
+    "event.get_by_status": lambda db, s: event_crud.get_by_status(db, status=EventStatus.ACTIVE, org_id=s.org_id),
+    "followup_decision.get_fresh": lambda db, s: followup_decision_crud.get_fresh(
+        db, key="k" * 64, not_before=datetime.now(UTC) - timedelta(days=1)
+    ),
+    "followup_decision.upsert": lambda db, s: followup_decision_crud.upsert(
+        db, key="k" * 64, followup=None, latency_ms=1.0
+    ),
+    "link.get_by_org_id": lambda db, s: link_crud.get_by_org_id(db, org_id=s.org_id),
+    "link.get_by_survey_instance_id": lambda db, s: link_crud.get_by_survey_instance_id(
+        db, survey_instance_id=s.instance_id
+    ),
+    "link.get_by_id": lambda db, s: link_crud.get_by_id(db, id=s.link_id),
+    "link.get_active_links": lambda db, s: link_crud.get_active_links(db, org_id=s.org_id),
+    "link.get_public_form": lambda db, s: link_crud.get_public_form(db, id=s.link_id),
+    "link.create_many": lambda db, s: link_crud.create_many(
+        db, org_id=s.org_id, survey_instance_id=s.instance_id, count=3
+    ),
+    "org_allowed_domain.get_by_domain": lambda db, s: org_allowed_domain_crud.get_by_domain(db, domain="example.com"),
+    "org_allowed_domain.get_by_org_id": lambda db, s: org_allowed_domain_crud.get_by_org_id(db, org_id=s.org_id),
+    "organization.get_by_name": lambda db, s: organization_crud.get_by_name(db, name="org"),
+    "question_rollup.get_by_survey_instance": lambda db, s: question_rollup_crud.get_by_survey_instance(
+        db, survey_instance_id=s.instance_id
+    ),
+    "question_rollup.try_lock_refresh": lambda db, s: question_rollup_crud.try_lock_refresh(db),
+    "question_rollup.get_watermark": lambda db, s: question_rollup_crud.get_watermark(db),
+    "question_rollup.get_changed_instances": lambda db, s: question_rollup_crud.get_changed_instances(
+        db, since=datetime.now(UTC) - timedelta(minutes=5)
+    ),
+    "question_rollup.refresh": lambda db, s: question_rollup_crud.refresh(
+        db, survey_instance_ids=[s.instance_id], distribution_questions=[(s.survey_id, 0)]
+    ),
+    "survey.get_by_org_id": lambda db, s: survey_crud.get_by_org_id(db, org_id=s.org_id),
+    "survey.get_published": lambda db, s: survey_crud.get_published(db, org_id=s.org_id),
+    "survey_answer.get_by_response_id": lambda db, s: survey_answer_crud.get_by_response_id(
+        db, response_id=s.response_id
+    ),
+    "survey_answer.get_by_response_and_question": lambda db, s: survey_answer_crud.get_by_response_and_question(
+        db, response_id=s.response_id, question_idx=0
+    ),
+    "survey_answer.insert_many": lambda db, s: survey_answer_crud.insert_many(
+        db,
+        rows=[
+            {"response_id": s.response_id, "question_idx": 0, "question_text": "Rate the talk", "is_followup": False}
+        ],
+    ),
+    "survey_answer.upsert_many": lambda db, s: survey_answer_crud.upsert_many(
+        db,
+        rows=[
+            {"response_id": s.response_id, "question_idx": 0, "question_text": "Rate the talk", "is_followup": False}
+        ],
+    ),
+    "survey_answer.has_followup": lambda db, s: survey_answer_crud.has_followup(
+        db, response_id=s.response_id, question_idx=0
+    ),
+    "survey_instance.get_by_survey_id": lambda db, s: survey_instance_crud.get_by_survey_id(db, survey_id=s.survey_id),
+    "survey_instance.get_by_org_id": lambda db, s: survey_instance_crud.get_by_org_id(db, org_id=s.org_id),
+    "survey_instance.get_by_event_id": lambda db, s: survey_instance_crud.get_by_event_id(db, event_id=s.event_id),
+    "survey_instance.get_launched": lambda db, s: survey_instance_crud.get_launched(db, org_id=s.org_id),
+    "survey_instance.get_response_stats_by_event": lambda db, s: survey_instance_crud.get_response_stats_by_event(
+        db, event_id=s.event_id
+    ),
+    "survey_instance.get_answer_stats_by_event": lambda db, s: survey_instance_crud.get_answer_stats_by_event(
+        db, event_id=s.event_id
+    ),
+    "survey_instance.get_choice_counts_by_event": lambda db, s: survey_instance_crud.get_choice_counts_by_event(
+        db, event_id=s.event_id, questions=[(s.survey_id, 0)]
+    ),
+    "survey_response.get_by_survey_id": lambda db, s: survey_response_crud.get_by_survey_id(db, survey_id=s.survey_id),
+    "survey_response.get_active_responses": lambda db, s: survey_response_crud.get_active_responses(db),
+    "survey_response.get_by_survey_instance_id": lambda db, s: survey_response_crud.get_by_survey_instance_id(
+        db, survey_instance_id=s.instance_id
+    ),
+    "survey_response.get_page_by_survey_instance_id": lambda db, s: survey_response_crud.get_page_by_survey_instance_id(
+        db, survey_instance_id=s.instance_id, limit=10, after=(datetime.now(UTC), s.response_id)
+    ),
+    "survey_response.insert_many": lambda db, s: survey_response_crud.insert_many(
+        db, rows=[{"id": s.response_id, "survey_id": s.survey_id, "survey_instance_id": s.instance_id}]
+    ),
+    "survey_response.get_survey_instance_ids": lambda db, s: survey_response_crud.get_survey_instance_ids(
+        db, ids=[s.response_id]
+    ),
+    "survey_response.end_buffering": lambda db, s: survey_response_crud.end_buffering(
+        db, response_id=s.response_id, current_index=1
+    ),
+    "survey_response.get_flow_state": lambda db, s: survey_response_crud.get_flow_state(db, response_id=s.response_id),
+    "survey_response.increment_current_index": lambda db, s: survey_response_crud.increment_current_index(
+        db, response_id=s.response_id, commit=False
+    ),
+    "survey_response.mark_finished": lambda db, s: survey_response_crud.mark_finished(
+        db, response_id=s.response_id, commit=False
+    ),
+    "survey_response.record_answer_and_advance": lambda db, s: survey_response_crud.record_answer_and_advance(
+        db,
+        response_id=s.response_id,
+        question_idx=0,
+        question_text="Rate the talk",
+        is_followup=False,
+        answer={"value": 4},
+        next_question_idx=1,
+        next_question_text="Why?",
+    ),
+    "survey_response.record_answer_with_followup": lambda db, s: survey_response_crud.record_answer_with_followup(
+        db, response_id=s.response_id, question_idx=0, question_text="Rate the talk", answer=None, followup_text="Why?"
+    ),
+    "survey_response.add_late_followup": lambda db, s: survey_response_crud.add_late_followup(
+        db, response_id=s.response_id, question_idx=0, followup_text="Why?"
+    ),
+    "survey_response.answer_late_followup": lambda db, s: survey_response_crud.answer_late_followup(
+        db, response_id=s.response_id, question_idx=0, followup_text="Why?", answer=None
+    ),
+    "survey_response.stream_export_rows": lambda db, s: survey_response_crud.stream_export_rows(
+        db, survey_id=s.survey_id
+    ),
+    "user.get_by_email": lambda db, s: user_crud.get_by_email(db, email="someone@example.com"),
+    "user.authenticate": lambda db, s: user_crud.authenticate(db, email="someone@example.com", password="secret"),
+    "user.get_with_organization": lambda db, s: user_crud.get_with_organization(db, id=s.user_id),
+}
+
+# Primary-key lookups and writes are covered once per model through ``get``
+BASE_METHODS = {"get", "get_multi", "create", "update", "remove"}
+
+EXEMPT = {
+    "*.get_multi": "unfiltered admin listing; a full scan is the point",
+    "*.create": "single-row INSERT",
+    "*.update": "UPDATE by primary key",
+    "*.remove": "DELETE by primary key",
+    "survey.get_by_title": "admin lookup across all organizations, not on a request path",
+}
+
+
+def _crud_singletons() -> dict[str, CRUDBase]:
+    singletons = {}
+    for module_info in pkgutil.iter_modules(app.crud.__path__):
+        module = importlib.import_module(f"app.crud.{module_info.name}")
+        for name, value in vars(module).items():
+            if name.endswith("_crud") and isinstance(value, CRUDBase) and value.__module__ == module.__name__:
+                singletons[module_info.name] = value
+    return singletons
+
+
+def _public_methods(crud: CRUDBase) -> set[str]:
+    return {
+        name for name, member in inspect.getmembers(type(crud), inspect.iscoroutinefunction) if not name.startswith("_")
+    }
+
+
+def _seq_scans(plan: dict[str, Any]) -> list[str]:
+    scans = [plan.get("Relation Name", "?")] if plan["Node Type"] == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        scans.extend(_seq_scans(child))
+    return scans
+
+
+@pytest.fixture
+async def seeded(db_session, make_survey_instance):
+    instance = await make_survey_instance([{"text": "Rate the talk", "type": "rating"}])
+    response = SurveyResponse(survey_id=instance.survey_id, survey_instance_id=instance.id)
+    link = Link(org_id=instance.org_id, survey_instance_id=instance.id)
+    user = User(org_id=instance.org_id, email="someone@example.com", hashed_password=get_password_hash("secret"))
+    db_session.add_all(
+        [
+            response,
+            link,
+            OrgAllowedDomain(org_id=instance.org_id, domain="example.com"),
+            user,
+        ]
+    )
+    await db_session.flush()
+    answer = SurveyAnswer(response_id=response.id, question_idx=0, question_text="Rate the talk")
+    db_session.add(answer)
+    await db_session.commit()
+    return SimpleNamespace(
+        org_id=instance.org_id,
+        event_id=instance.event_id,
+        survey_id=instance.survey_id,
+        instance_id=instance.id,
+        response_id=response.id,
+        answer_id=answer.id,
+        link_id=link.id,
+        user_id=user.id,
+    )
+
+
+def test_every_crud_method_is_covered():
+    missing = []
+    for module, crud in _crud_singletons().items():
+        for method in _public_methods(crud) - BASE_METHODS:
+            key = f"{module}.{method}"
+            if key not in CASES and key not in EXEMPT:
+                missing.append(key)
+    assert not missing, f"Add these CRUD methods to CASES or EXEMPT: {sorted(missing)}"
+
+
+async def test_crud_queries_use_indexes(db_engine, db_session, seeded):
+    cases = dict(CASES)
+    for module, crud in _crud_singletons().items():
+        pk = getattr(crud.model, "id", None)
+        if pk is None:
+            continue  # keyed by something else; its lookups are in CASES
+        sample_id = 0 if pk.type.python_type is int else uuid.uuid4()
+        cases[f"{module}.get"] = lambda db, s, crud=crud, sample_id=sample_id: crud.get(db, id=sample_id)
+
+    statements: list[tuple[str, Any]] = []
+
+    def _record(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    failures = {}
+    for name, case in cases.items():
+        statements.clear()
+        event.listen(db_engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            result = await case(db_session, seeded)
+            if hasattr(result, "__aiter__"):
+                await _drain(result)
+        finally:
+            event.remove(db_engine.sync_engine, "before_cursor_execute", _record)
+        await db_session.rollback()
+        assert statements, f"{name} sent no statements"
+
+        conn = await db_session.connection()
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        for statement, parameters in statements:
+            explained = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            scans = _seq_scans(explained.scalar()[0]["Plan"])
+            if scans:
+                failures.setdefault(name, []).extend(scans)
+        await db_session.rollback()
+
+    assert not failures, f"Sequential scans (missing index?): {failures}"
@@ -0,0 +1,199 @@
+"""Memory and correctness of the streaming CSV export.
+
+The 1M-row benchmark feeds synthetic cursor rows straight into the CSV encoder and
+checks that peak memory does not grow with the number of rows. The end-to-end test
+streams from Postgres and needs TEST_DATABASE_URL (see tests/conftest.py).
+"""
+
+import csv
+import io
+import json
+import time
+import tracemalloc
+import uuid
+from datetime import UTC, datetime
+from typing import Any, NamedTuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.survey import Survey
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_response import SurveyResponse
+from app.schemas.survey_flow import Question
+from app.services import response_export
+from app.services.survey_cache import compile_survey
+
+pytestmark = pytest.mark.benchmark
+
+QUESTIONS = [Question(text=f"Question {idx}", type="rating") for idx in range(5)]
+
+
+class ExportRow(NamedTuple):
+    response_id: uuid.UUID
+    survey_instance_id: uuid.UUID
+    event_name: str
+    started_at: datetime
+    finished_at: datetime | None
+    question_idx: int | None
+    is_followup: bool | None
+    question_text: str | None
+    answer: dict[str, Any] | None
+
+
+async def synthetic_rows(count: int):
+    """Yield ``count`` cursor rows: five base answers and one follow-up per response."""
+    instance_id = uuid.uuid4()
+    now = datetime.now(UTC)
+    response_id = uuid.uuid4()
+    for row_idx in range(count):
+        slot = row_idx % 6
+        if slot == 0:
+            response_id = uuid.uuid4()
+        if slot == 5:
+            yield ExportRow(response_id, instance_id, "Expo", now, now, 0, True, "Why a 4?", {"value": "Crowded"})
+        else:
+            yield ExportRow(response_id, instance_id, "Expo", now, now, slot, False, f"Question {slot}", {"value": 4})
+
+
+async def _peak_export_memory(row_count: int) -> tuple[int, int, float]:
+    tracemalloc.start()
+    begin = time.perf_counter()
+    size = 0
+    async for chunk in response_export.iter_csv_chunks(QUESTIONS, synthetic_rows(row_count)):
+        size += len(chunk)
+    elapsed = time.perf_counter() - begin
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, size, elapsed
+
+
+async def test_csv_export_memory_is_constant_for_1m_rows():
+    small_peak, _, _ = await _peak_export_memory(50_000)
+    peak, size, elapsed = await _peak_export_memory(1_000_000)
+
+    print(
+        f"\n1M rows -> {size / 1e6:.1f} MB CSV in {elapsed:.1f} s; "
+        f"peak memory {peak / 1024:.0f} KiB (50k rows: {small_peak / 1024:.0f} KiB)"
+    )
+    assert peak < 4 * 1024 * 1024
+    assert peak < small_peak * 1.5
+
+
+def test_format_answer():
+    assert response_export.format_answer(response_export.answer_value(None)) == ""
+    assert response_export.format_answer(response_export.answer_value({"value": None})) == ""
+    assert response_export.format_answer(response_export.answer_value({"value": ["Talks", "Food"]})) == "Talks; Food"
+    assert response_export.format_answer(response_export.answer_value({"value": 4})) == "4"
+
+
+TYPED_QUESTIONS = [
+    Question(text="Rate the talk", type="rating"),
+    Question(text="Topics", type="checkbox", can_followup=False),
+    Question(text="Anything else?", can_followup=False),
+]
+
+
+async def typed_rows(responses: int):
+    instance_id = uuid.uuid4()
+    now = datetime.now(UTC)
+    for _ in range(responses):
+        response_id = uuid.uuid4()
+        yield ExportRow(response_id, instance_id, "Expo", now, None, 0, False, "Rate the talk", {"value": 4})
+        yield ExportRow(response_id, instance_id, "Expo", now, None, 0, True, "Why a 4?", {"value": "Too long"})
+        yield ExportRow(response_id, instance_id, "Expo", now, None, 1, False, "Topics", {"value": ["AI", "Data"]})
+        yield ExportRow(response_id, instance_id, "Expo", now, None, 2, False, "Anything else?", None)
+
+
+@pytest.mark.parametrize("export_format", [response_export.ExportFormat.PARQUET, response_export.ExportFormat.ARROW])
+async def test_columnar_export_is_typed(export_format):
+    chunks = [
+        chunk
+        async for chunk in response_export.iter_arrow_chunks(
+            TYPED_QUESTIONS, typed_rows(25), export_format, batch_rows=10
+        )
+    ]
+    data = b"".join(chunks)
+    if export_format == response_export.ExportFormat.PARQUET:
+        table = pq.read_table(io.BytesIO(data))
+        assert table.to_batches()[0].num_rows == 10  # one row group per batch
+    else:
+        table = pa.ipc.open_stream(data).read_all()
+
+    assert table.num_rows == 25
+    assert table.schema.field("Rate the talk").type == pa.float64()
+    assert table.schema.field("Topics").type == pa.list_(pa.string())
+    assert table.schema.field("started_at").type == pa.timestamp("us", tz="UTC")
+    first = table.slice(0, 1).to_pylist()[0]
+    assert first["Rate the talk"] == 4.0
+    assert first["Rate the talk (follow-up question)"] == "Why a 4?"
+    assert first["Topics"] == ["AI", "Data"]
+    assert first["Anything else?"] is None
+
+
+async def test_ndjson_export_is_typed():
+    chunks = [chunk async for chunk in response_export.iter_ndjson_chunks(TYPED_QUESTIONS, typed_rows(3))]
+    lines = [json.loads(line) for line in "".join(chunks).splitlines()]
+
+    assert len(lines) == 3
+    assert lines[0]["Rate the talk"] == 4.0
+    assert lines[0]["Topics"] == ["AI", "Data"]
+    assert lines[0]["finished_at"] is None
+
+
+async def test_csv_export_streams_from_database(db_engine, db_session, make_survey_instance, monkeypatch):
+    monkeypatch.setattr(response_export.settings, "EXPORT_CHUNK_BYTES", 1)
+    instance = await make_survey_instance(
+        [{"text": "Rate the talk", "type": "rating"}, {"text": "Topics", "type": "checkbox", "can_followup": False}]
+    )
+    survey = compile_survey(await db_session.get(Survey, instance.survey_id))
+
+    answered = SurveyResponse(survey_id=survey.id, survey_instance_id=instance.id, current_index=2)
+    empty = SurveyResponse(survey_id=survey.id, survey_instance_id=instance.id)
+    db_session.add_all([answered, empty])
+    await db_session.flush()
+    db_session.add_all(
+        [
+            SurveyAnswer(response_id=answered.id, question_idx=0, question_text="Rate the talk", answer={"value": 4}),
+            SurveyAnswer(
+                response_id=answered.id,
+                question_idx=0,
+                question_text="Why a 4?",
+                is_followup=True,
+                answer={"value": "Too long"},
+            ),
+            SurveyAnswer(response_id=answered.id, question_idx=1, question_text="Topics", answer={"value": ["AI"]}),
+        ]
+    )
+    await db_session.commit()
+
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    chunks = [chunk async for chunk in response_export.stream_survey_csv(survey, session_factory=session_factory)]
+    assert len(chunks) > 1
+
+    header, *lines = list(csv.reader(io.StringIO("".join(chunks))))
+    assert header == [
+        *response_export.RESPONSE_COLUMNS,
+        "Rate the talk",
+        "Rate the talk (follow-up question)",
+        "Rate the talk (follow-up answer)",
+        "Topics",
+    ]
+    by_id = {line[0]: line for line in lines}
+    assert by_id[str(answered.id)][2] == "Benchmark event"
+    assert by_id[str(answered.id)][5:] == ["4", "Why a 4?", "Too long", "AI"]
+    assert by_id[str(empty.id)][5:] == ["", "", "", ""]
+
+    parquet = b"".join(
+        [
+            chunk
+            async for chunk in response_export.stream_survey_export(
+                survey, response_export.ExportFormat.PARQUET, session_factory=session_factory
+            )
+        ]
+    )
+    table = pq.read_table(io.BytesIO(parquet))
+    assert table.num_rows == 2
+    assert sorted(table.column("Rate the talk").to_pylist(), key=str) == [4.0, None]
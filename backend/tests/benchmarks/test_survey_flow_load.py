@@ -0,0 +1,93 @@
+"""Many concurrent survey flows against the local stub LLM provider.
+
+Participants go through ``start_survey`` and ``submit_answer`` at the same time, with
+follow-ups generated by the real follow-up service (limiter, timeout and cache) on
+``LLM_PROVIDER="stub"``: log-normal latency and injected failures, no network and no
+spend. Point ``LLM_PROVIDER`` at "replay" and ``LLM_RECORDING_PATH`` at a recording of
+real calls to reuse production timing. Needs TEST_DATABASE_URL (see tests/conftest.py).
+"""
+
+import asyncio
+import statistics
+import time
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.survey_response import SurveyResponse
+from app.routers import survey_flow
+from app.schemas.survey_flow import AnswerIn
+from app.services import flow_state, followup_cache, followup_service, llm_provider
+
+pytestmark = pytest.mark.benchmark
+
+FLOWS = 1000
+QUESTIONS = [{"text": f"Question {idx}", "can_followup": True} for idx in range(3)]
+
+
+@pytest.fixture
+def offline_llm(db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "stub")
+    monkeypatch.setattr(settings, "LLM_STUB_LATENCY_MS", 50.0)
+    monkeypatch.setattr(settings, "LLM_STUB_LATENCY_SIGMA", 0.5)
+    monkeypatch.setattr(settings, "LLM_STUB_ERROR_RATE", 0.02)
+    monkeypatch.setattr(settings, "LLM_STUB_FOLLOWUP_RATE", 0.25)
+    monkeypatch.setattr(settings, "FLOW_STATE_BACKEND", "redis")
+    monkeypatch.setattr(settings, "FLOW_STATE_WRITE_MODE", "completion")
+    monkeypatch.setattr(llm_provider, "_providers", {})
+    monkeypatch.setattr(followup_service, "_llm", None)
+    monkeypatch.setattr(followup_service, "_limiter", None)
+    monkeypatch.setattr(followup_service, "_metrics", followup_service.FollowupMetrics())
+    monkeypatch.setattr(followup_cache, "_decisions", LRUCache(max_entries=10 * FLOWS))
+    monkeypatch.setattr(flow_state, "_store", flow_state.RedisFlowStateStore(FakeRedis(), ttl_seconds=3600))
+    monkeypatch.setattr(flow_state, "SessionLocal", async_sessionmaker(db_engine, expire_on_commit=False))
+
+
+@pytest.mark.usefixtures("offline_llm")
+async def test_concurrent_survey_flows_on_the_stub_provider(db_engine, db_session, make_survey_instance):
+    instance = await make_survey_instance(QUESTIONS)
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False, autoflush=False)
+
+    async def participant(idx):
+        timings = []
+        async with session_factory() as db:
+            started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db)
+            result = None
+            while result is None or not result.done:
+                begin = time.perf_counter()
+                result = await survey_flow.submit_answer(
+                    AnswerIn(answer={"value": f"Participant {idx} answer {len(timings)}"}),
+                    response_id=started.response_id,
+                    db=db,
+                )
+                timings.append(time.perf_counter() - begin)
+        return timings
+
+    begin = time.perf_counter()
+    timings = [timing for flow in await asyncio.gather(*(participant(idx) for idx in range(FLOWS))) for timing in flow]
+    elapsed = time.perf_counter() - begin
+    await flow_state.drain_flow_state()
+    await followup_service.close_llm_client()
+
+    metrics = followup_service.get_followup_metrics()
+    followups = len(timings) - FLOWS * len(QUESTIONS)
+    quantiles = statistics.quantiles(timings, n=100)
+    print(
+        f"\n{FLOWS} flows in {elapsed:.1f} s; {len(timings)} answers, {followups} follow-ups, "
+        f"{metrics['errors']} LLM errors; answer latency p50={quantiles[49] * 1000:.0f} ms "
+        f"p95={quantiles[94] * 1000:.0f} ms; LLM latency avg={metrics['llm_latency_avg_ms']:.0f} ms"
+    )
+
+    finished = await db_session.scalar(
+        select(func.count())
+        .where(SurveyResponse.survey_instance_id == instance.id)
+        .where(SurveyResponse.finished_at.isnot(None))
+    )
+    assert finished == FLOWS
+    assert metrics["calls"] == FLOWS * len(QUESTIONS)  # every answer is distinct, so nothing is cached
+    assert 0 < metrics["errors"] < 0.05 * metrics["calls"]
+    assert 0.15 * metrics["calls"] < followups < 0.35 * metrics["calls"]
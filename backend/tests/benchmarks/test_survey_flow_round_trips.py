@@ -0,0 +1,74 @@
+"""Database round trips per answer on the survey flow hot path.
+
+Counts the round trips to Postgres, SQL statements and transaction control alike,
+while a participant answers every question through ``submit_answer``. Needs
+TEST_DATABASE_URL (see tests/conftest.py).
+"""
+
+import time
+
+import pytest
+from sqlalchemy import select
+
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_response import SurveyResponse
+from app.routers import survey_flow
+from app.schemas.survey_flow import AnswerIn
+from app.services import speculative_followup
+
+pytestmark = pytest.mark.benchmark
+
+MAX_STATEMENTS_PER_ANSWER = 2
+# BEGIN, SELECT, COMMIT before the follow-up LLM call releases the connection, then BEGIN, write, COMMIT
+MAX_ROUND_TRIPS_PER_ANSWER = 6
+MAX_ROUND_TRIPS_PER_FOLLOWUP_ANSWER = 4  # no LLM call, so read and write share one transaction
+TRANSACTION_CONTROL = {"BEGIN", "COMMIT", "ROLLBACK"}
+
+QUESTIONS = [{"text": f"Question {idx}", "type": "rating"} for idx in range(10)]
+
+
+async def test_submit_answer_round_trips(db_session, make_survey_instance, count_statements, monkeypatch):
+    """Every answer costs at most two statements; only answers that may get a follow-up use two transactions."""
+    followups = iter(["What made it a 4?"])
+
+    async def fake_followup(**kwargs):
+        return next(followups, None)
+
+    monkeypatch.setattr(speculative_followup, "get_followup_question", fake_followup)
+
+    instance = await make_survey_instance(QUESTIONS)
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+
+    round_trips = []
+    timings = []
+    result = None
+    for _ in range(len(QUESTIONS) + 1):  # one extra answer for the follow-up
+        with count_statements(transactions=True) as statements:
+            begin = time.perf_counter()
+            result = await survey_flow.submit_answer(
+                AnswerIn(answer={"value": 4}), response_id=started.response_id, db=db_session
+            )
+            timings.append(time.perf_counter() - begin)
+        round_trips.append(statements)
+
+    statement_counts = [sum(statement not in TRANSACTION_CONTROL for statement in trips) for trips in round_trips]
+    print(
+        f"\nstatements per answer: max={max(statement_counts)}; round trips per answer: "
+        f"max={max(map(len, round_trips))} mean={sum(map(len, round_trips)) / len(round_trips):.2f}; "
+        f"latency mean={sum(timings) / len(timings) * 1000:.2f} ms"
+    )
+    assert result is not None and result.done
+    assert max(statement_counts) <= MAX_STATEMENTS_PER_ANSWER
+    followup_answer = round_trips.pop(1)  # the first answer got the follow-up
+    assert len(followup_answer) <= MAX_ROUND_TRIPS_PER_FOLLOWUP_ANSWER
+    assert max(map(len, round_trips)) <= MAX_ROUND_TRIPS_PER_ANSWER
+
+    response = await db_session.get(SurveyResponse, started.response_id)
+    assert response is not None and response.finished_at is not None
+    answers = (
+        (await db_session.execute(select(SurveyAnswer).where(SurveyAnswer.response_id == started.response_id)))
+        .scalars()
+        .all()
+    )
+    assert len(answers) == len(QUESTIONS) + 1
+    assert all(answer.answer == {"value": 4} for answer in answers)
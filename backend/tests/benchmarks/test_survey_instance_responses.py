@@ -0,0 +1,99 @@
+"""Query count and keyset pagination of GET /survey-instances/{id}/responses.
+
+Needs TEST_DATABASE_URL (see tests/conftest.py).
+"""
+
+import json
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_response import SurveyResponse
+from app.routers import survey_instances
+
+pytestmark = pytest.mark.benchmark
+
+RESPONSES = 250
+
+
+async def _page(db_session, instance_id, **params):
+    params = {"limit": None, "cursor": None, "fields": None, **params}
+    response = await survey_instances.get_survey_instance_responses(id=instance_id, db=db_session, **params)
+    return json.loads(response.body), response.headers.get("x-next-cursor")
+
+
+async def test_responses_are_paged_with_constant_queries(
+    db_session, make_survey_instance, count_statements, monkeypatch
+):
+    monkeypatch.setattr(survey_instances, "DEFAULT_PAGE_SIZE", 100)
+    instance = await make_survey_instance([{"text": "Rate the talk", "type": "rating"}])
+    started = datetime.now(UTC) - timedelta(days=1)
+    # Pairs of responses share a start time so the cursor has to break ties on id
+    responses = [
+        {
+            "id": uuid.uuid4(),
+            "survey_id": instance.survey_id,
+            "survey_instance_id": instance.id,
+            "started_at": started + timedelta(seconds=idx // 2),
+        }
+        for idx in range(RESPONSES)
+    ]
+    await db_session.execute(insert(SurveyResponse), responses)
+    await db_session.execute(
+        insert(SurveyAnswer),
+        [
+            {
+                "id": uuid.uuid4(),
+                "response_id": response["id"],
+                "question_idx": 0,
+                "question_text": "Rate the talk",
+                "answer": {"value": idx % 5 + 1},
+            }
+            for idx, response in enumerate(responses)
+        ],
+    )
+    await db_session.commit()
+
+    with count_statements() as statements:
+        everything, next_cursor = await _page(db_session, instance.id)
+    assert len(statements) == 2  # instance lookup + one page query
+    assert next_cursor is None  # without limit and cursor, every response in one go
+    assert len(everything) == RESPONSES
+    # The first two responses tie on started_at, so either may come first
+    first = next(idx for idx, response in enumerate(responses) if str(response["id"]) == everything[0]["id"])
+    assert first < 2
+    assert everything[0]["answers"] == {"Rate the talk": {"value": first + 1}}
+    assert everything[0]["org_id"] == str(instance.org_id)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = await _page(db_session, instance.id, limit=40, cursor=cursor, fields="id,submitted_at")
+        pages += 1
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert pages == RESPONSES // 40 + 1
+    assert [item["id"] for item in seen] == [item["id"] for item in everything]
+    assert set(seen[0]) == {"id", "submitted_at"}
+
+    # A cursor without a limit pages by the default size
+    _, cursor = await _page(db_session, instance.id, limit=40)
+    page, cursor = await _page(db_session, instance.id, cursor=cursor)
+    assert [item["id"] for item in page] == [item["id"] for item in everything[40:140]]
+    assert cursor is not None
+
+
+async def test_invalid_cursor_and_fields_are_rejected(db_session, make_survey_instance):
+    instance = await make_survey_instance([{"text": "Rate the talk"}])
+
+    with pytest.raises(HTTPException) as err:
+        await _page(db_session, instance.id, cursor="not-a-cursor")
+    assert err.value.status_code == 400
+
+    with pytest.raises(HTTPException) as err:
+        await _page(db_session, instance.id, fields="id,password")
+    assert err.value.status_code == 400
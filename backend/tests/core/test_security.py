@@ -0,0 +1,33 @@
+import pytest
+
+from app.core import security
+from app.core.security import make_password_context
+from app.core.user import authenticate_user
+from app.models.organization import Organization
+from app.models.user import User
+
+
+@pytest.fixture
+async def make_user(db_session):
+    async def _make(hashed_password):
+        org = Organization(name="Acme")
+        db_session.add(org)
+        await db_session.flush()
+        user = User(org_id=org.id, email="someone@example.com", hashed_password=hashed_password)
+        db_session.add(user)
+        await db_session.commit()
+        return user
+
+    return _make
+
+
+async def test_login_rehashes_when_the_cost_factor_changes(db_session, make_user, monkeypatch):
+    user = await make_user(make_password_context(4).hash("secret"))
+    monkeypatch.setattr(security, "pwd_context", make_password_context(5))
+
+    assert await authenticate_user(db_session, "someone@example.com", "wrong") is None
+    assert user.hashed_password.startswith("$2b$04$")
+    assert await authenticate_user(db_session, "someone@example.com", "secret") is not None
+    await db_session.refresh(user)
+    assert user.hashed_password.startswith("$2b$05$")
+    assert security.pwd_context.verify("secret", user.hashed_password)
@@ -0,0 +1,92 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from jose import jwt
+
+from app.core import auth_cache
+from app.core.config import settings
+from app.core.security import ALGORITHM, get_password_hash
+from app.core.user import get_current_user
+from app.crud.organization import organization_crud
+from app.crud.user import user_crud
+from app.models.organization import Organization
+from app.models.user import User
+from app.routers.auth import login_for_access_token
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    auth_cache._users.clear()
+    yield
+    auth_cache._users.clear()
+
+
+@pytest.fixture
+async def user(db_session):
+    org = Organization(name="Acme")
+    db_session.add(org)
+    await db_session.flush()
+    user = User(org_id=org.id, email="someone@example.com", hashed_password=get_password_hash("secret"))
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+async def _login(db, password="secret"):
+    form = OAuth2PasswordRequestForm(username="someone@example.com", password=password)
+    return (await login_for_access_token(form_data=form, db=db)).access_token
+
+
+async def test_token_carries_organization_and_version(db_session, user):
+    token = await _login(db_session)
+
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    assert claims["sub"] == str(user.id)
+    assert claims["org"] == str(user.org_id)
+    assert claims["ver"] == 0
+
+
+async def test_cached_user_needs_no_queries(db_engine, db_session, user, count_statements):
+    token = await _login(db_session)
+    db_session.expunge_all()
+    await get_current_user(token=token, db=db_session)
+    db_session.expunge_all()
+
+    with count_statements() as statements:
+        current_user = await get_current_user(token=token, db=db_session)
+        assert current_user.email == "someone@example.com"
+        assert current_user.organization.name == "Acme"
+
+    assert statements == []
+    # The rebuilt user still belongs to the session like a loaded one
+    current_user.name = "Someone"
+    await db_session.commit()
+    assert (await user_crud.get(db_session, id=user.id)).name == "Someone"
+
+
+async def test_password_change_revokes_older_tokens(db_session, user):
+    old_token = await _login(db_session)
+    await get_current_user(token=old_token, db=db_session)
+
+    await user_crud.update(db_session, db_obj=user, obj_in={"password": "changed"})
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token=old_token, db=db_session)
+    assert exc_info.value.status_code == 401
+    new_token = await _login(db_session, password="changed")
+    assert (await get_current_user(token=new_token, db=db_session)).id == user.id
+
+
+async def test_updates_invalidate_cached_users(db_session, user, count_statements):
+    token = await _login(db_session)
+    await get_current_user(token=token, db=db_session)
+
+    await organization_crud.update(db_session, db_obj=user.organization, obj_in={"name": "Acme Corp"})
+    await user_crud.update(db_session, db_obj=user, obj_in={"name": "Someone"})
+    db_session.expunge_all()
+
+    with count_statements() as statements:
+        current_user = await get_current_user(token=token, db=db_session)
+    assert len(statements) == 1
+    assert current_user.name == "Someone"
+    assert current_user.organization.name == "Acme Corp"
@@ -0,0 +1,76 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import Settings, settings
+from app.db.pool import InstrumentedAsyncPool
+from app.db.session import engine_options
+
+ASYNCPG_URL = "postgresql+asyncpg://postgres@localhost/reventa"
+
+
+def test_engine_options_are_quiet_and_tuned_by_default():
+    options = engine_options(ASYNCPG_URL)
+
+    assert options["echo"] is False
+    assert options["poolclass"] is InstrumentedAsyncPool
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"]["statement_cache_size"] == settings.DB_STATEMENT_CACHE_SIZE
+
+
+def test_pgbouncer_mode_disables_named_prepared_statements(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    connect_args = engine_options(ASYNCPG_URL)["connect_args"]
+
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+def test_other_drivers_get_no_asyncpg_arguments():
+    assert "connect_args" not in engine_options("postgresql+psycopg://postgres@localhost/reventa")
+
+
+def test_pool_limits_share_the_connection_budget_between_workers():
+    config = Settings(DB_POOL_SIZE=10, DB_MAX_OVERFLOW=10, DB_MAX_CONNECTIONS=48, WEB_CONCURRENCY=4)
+    assert config.db_pool_limits == (10, 2)
+
+    assert Settings(DB_POOL_SIZE=10, DB_MAX_OVERFLOW=5).db_pool_limits == (10, 5)
+    assert Settings(DB_MAX_CONNECTIONS=4, WEB_CONCURRENCY=8).db_pool_limits == (1, 0)
+
+
+async def test_pool_records_checkout_waits_and_timeouts():
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+
+    engine = create_async_engine(url, poolclass=InstrumentedAsyncPool, pool_size=1, max_overflow=0, pool_timeout=0.2)
+    try:
+        async with engine.connect() as held:
+            await held.execute(text("SELECT 1"))
+
+            async def wait_for_connection() -> None:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+
+            waiter = asyncio.create_task(wait_for_connection())
+            await asyncio.sleep(0.05)
+        await waiter
+
+        async with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        snapshot = engine.pool.snapshot()
+        assert snapshot["checkouts"] == 3
+        assert snapshot["timeouts"] == 1
+        assert snapshot["checkout_wait_max_ms"] >= 40
+        assert snapshot["size"] == 1
+    finally:
+        await engine.dispose()
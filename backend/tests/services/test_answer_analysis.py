@@ -0,0 +1,172 @@
+import asyncio
+import json
+import re
+
+import pytest
+from langchain.schema import AIMessage
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.routers import stats, survey_flow
+from app.schemas.survey_flow import AnswerIn
+from app.services import answer_analysis, speculative_followup
+
+QUESTIONS = [
+    {"text": "Rate the talk", "type": "rating", "can_followup": True},
+    {"text": "What should we change?", "can_followup": False},
+]
+
+THEMES = {"long": "session length", "short": "session length", "food": "catering", "coffee": "catering"}
+
+
+class StubLLM:
+    """Tags answers by keyword, like the analysis model would, and records every request."""
+
+    def __init__(self, delay: float = 0.0, reply: str | None = None):
+        self.delay = delay
+        self.reply = reply
+        self.requests: list[tuple[str, list[dict]]] = []
+        self.active = 0
+        self.peak = 0
+
+    async def ainvoke(self, messages):
+        prompt = messages[-1].content
+        question = re.search(r"Question: (.*)", prompt).group(1)
+        answers = json.loads(re.search(r"Answers: (.*)", prompt).group(1))
+        self.requests.append((question, answers))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.reply is not None:
+            return AIMessage(content=self.reply)
+        analyses = [
+            {
+                "id": answer["id"],
+                "sentiment": "negative" if "too" in answer["answer"].lower() else "positive",
+                "themes": sorted({theme for word, theme in THEMES.items() if word in answer["answer"].lower()}),
+            }
+            for answer in answers
+        ]
+        return AIMessage(content=f"```json\n{json.dumps(analyses)}\n```")
+
+
+@pytest.fixture(autouse=True)
+def analysis_settings(db_engine, monkeypatch):
+    async def followup(*, participant_answer, **kwargs):
+        return "What went wrong?" if participant_answer == {"value": 1} else None
+
+    monkeypatch.setattr(speculative_followup, "get_followup_question", followup)
+    monkeypatch.setattr(answer_analysis, "SessionLocal", async_sessionmaker(db_engine, expire_on_commit=False))
+    monkeypatch.setattr(answer_analysis, "_metrics", answer_analysis.AnalysisMetrics())
+    monkeypatch.setattr(answer_analysis, "_limiter", None)
+
+
+def _use(monkeypatch, llm):
+    monkeypatch.setattr(answer_analysis, "_get_llm", lambda: llm)
+    return llm
+
+
+async def _respond(db_session, instance, *answers):
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+    for value in answers:
+        await survey_flow.submit_answer(
+            AnswerIn(answer={"value": value}), response_id=started.response_id, db=db_session
+        )
+
+
+async def _feedback(db_session, instance):
+    await _respond(db_session, instance, 5, "Shorter talks")
+    await _respond(db_session, instance, 1, "Far too long", "More coffee")  # the second answer replies to a follow-up
+    await _respond(db_session, instance, 4, "shorter   TALKS")
+    await _respond(db_session, instance, 3, "Better food")
+    await _respond(db_session, instance, 2, "Nothing")
+
+
+async def test_answers_are_batched_per_question(db_session, make_survey_instance, monkeypatch):
+    llm = _use(monkeypatch, StubLLM(delay=0.01))
+    monkeypatch.setattr(settings, "ANALYSIS_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "ANALYSIS_MAX_CONCURRENCY", 2)
+    instance = await make_survey_instance(QUESTIONS)
+    await _feedback(db_session, instance)
+
+    assert await answer_analysis.analyze_survey_instance(instance.id) == 6
+
+    # Ratings are not sent; the follow-up reply goes with its question, the repeated text once
+    sent = sorted((question, answer["answer"]) for question, answers in llm.requests for answer in answers)
+    assert sent == [
+        ("Rate the talk", "Far too long"),
+        ("What should we change?", "Better food"),
+        ("What should we change?", "More coffee"),
+        ("What should we change?", "Nothing"),
+        ("What should we change?", "Shorter talks"),
+    ]
+    assert max(len(answers) for _, answers in llm.requests) == 2
+    assert llm.peak == 2
+
+    summary = await stats.get_answer_analysis(id=instance.id, db=db_session)
+    assert (summary.pending, summary.running) == (0, False)
+    rating, change = summary.questions
+    assert (rating.analyzed, rating.sentiment["negative"], rating.themes) == (1, 1, {"session length": 1})
+    assert change.analyzed == 5
+    assert change.sentiment == {"positive": 5, "neutral": 0, "negative": 0}
+    assert change.themes == {"catering": 2, "session length": 2}
+
+
+async def test_queued_batches_do_not_time_out(db_session, make_survey_instance, monkeypatch):
+    llm = _use(monkeypatch, StubLLM(delay=0.05))
+    monkeypatch.setattr(settings, "ANALYSIS_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "ANALYSIS_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "ANALYSIS_TIMEOUT_SECONDS", 0.1)  # shorter than the run, longer than any call
+    instance = await make_survey_instance(QUESTIONS)
+    await _feedback(db_session, instance)
+
+    assert await answer_analysis.analyze_survey_instance(instance.id) == 6
+    assert len(llm.requests) == 5
+    assert answer_analysis.get_analysis_metrics()["errors"] == 0
+
+
+async def test_answers_seen_before_reuse_their_analysis(db_session, make_survey_instance, monkeypatch):
+    _use(monkeypatch, StubLLM())
+    first = await make_survey_instance(QUESTIONS)
+    await _feedback(db_session, first)
+    await answer_analysis.analyze_survey_instance(first.id)
+
+    llm = _use(monkeypatch, StubLLM())
+    second = await make_survey_instance(QUESTIONS)
+    await _respond(db_session, second, 5, "Shorter talks")
+    await _respond(db_session, second, 4, "Free coffee")
+
+    assert await answer_analysis.analyze_survey_instance(second.id) == 2
+    assert [answer["answer"] for _, answers in llm.requests for answer in answers] == ["Free coffee"]
+    assert answer_analysis.get_analysis_metrics()["cache_hits"] == 1
+
+
+async def test_unusable_output_leaves_answers_pending(db_session, make_survey_instance, monkeypatch):
+    _use(monkeypatch, StubLLM(reply="I cannot help with that."))
+    instance = await make_survey_instance(QUESTIONS)
+    await _feedback(db_session, instance)
+
+    assert await answer_analysis.analyze_survey_instance(instance.id) == 0
+    assert (await stats.get_answer_analysis(id=instance.id, db=db_session)).pending == 6
+    assert answer_analysis.get_analysis_metrics()["invalid_outputs"] == 2
+
+    _use(monkeypatch, StubLLM())
+    assert await answer_analysis.analyze_survey_instance(instance.id) == 6
+
+
+async def test_analysis_runs_once_per_instance_in_the_background(db_session, make_survey_instance, monkeypatch):
+    llm = _use(monkeypatch, StubLLM(delay=0.05))
+    instance = await make_survey_instance(QUESTIONS)
+    await _feedback(db_session, instance)
+
+    started = await stats.start_answer_analysis(id=instance.id, db=db_session)
+    assert (started.pending, started.running) == (6, True)
+    assert not answer_analysis.start_analysis(instance.id)
+
+    await answer_analysis._runs[instance.id]
+    assert len(llm.requests) == 2  # one per question
+    summary = await stats.get_answer_analysis(id=instance.id, db=db_session)
+    assert (summary.pending, summary.running) == (0, False)
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.crud.chat_history import chat_history_crud
+from app.models.chat_history import ChatHistory
+from app.services import chat_history, llm_provider
+from app.services.chat_chain import build_chain
+from app.services.chat_history import AsyncChatMessageHistory
+
+
+@pytest.fixture
+def postgres_memory(db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_MEMORY_TYPE", "postgres")
+    monkeypatch.setattr(settings, "CHAT_HISTORY_WINDOW", 4)
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "stub")
+    monkeypatch.setattr(settings, "LLM_STUB_LATENCY_MS", 0.0)
+    monkeypatch.setattr(llm_provider, "_providers", {})
+    monkeypatch.setattr(chat_history, "SessionLocal", async_sessionmaker(db_engine, expire_on_commit=False))
+
+
+@pytest.mark.usefixtures("postgres_memory")
+async def test_chat_turn_reads_a_window_and_writes_once(db_session, count_statements):
+    await chat_history_crud.add_messages(
+        db_session,
+        session_id="s1",
+        messages=[
+            {"type": "human" if idx % 2 == 0 else "ai", "data": {"content": f"Message {idx}"}} for idx in range(10)
+        ],
+    )
+    chain = build_chain("s1")
+
+    with count_statements() as statements:
+        chunks = [chunk async for chunk in chain.astream({"input": "Hello"})]
+
+    assert chunks[-1]["response"] == "This is a stub reply."
+    assert [statement.split()[0] for statement in statements] == ["SELECT", "INSERT"]
+    assert "LIMIT" in statements[0]
+    # Only the latest messages made it into the prompt
+    assert [message.content for message in chunks[-1]["history"]] == [f"Message {idx}" for idx in range(6, 10)]
+
+    rows = (await db_session.scalars(select(ChatHistory).order_by(ChatHistory.id))).all()
+    assert [row.message for row in rows[-2:]] == [
+        {"type": "human", "data": {"content": "Hello"}},
+        {"type": "ai", "data": {"content": "This is a stub reply."}},
+    ]
+
+
+@pytest.mark.usefixtures("postgres_memory")
+async def test_history_is_async_only():
+    history = AsyncChatMessageHistory("s2")
+
+    assert await history.aget_messages() == []
+    with pytest.raises(NotImplementedError):
+        _ = history.messages
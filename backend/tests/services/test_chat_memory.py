@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import SystemMessage
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.crud.chat_history import chat_history_crud
+from app.crud.chat_summary import chat_summary_crud
+from app.models.chat_history import ChatHistory
+from app.services import chat_history, chat_memory, llm_provider
+from app.services.chat_chain import build_chain
+
+
+@pytest.fixture
+def summary_memory(db_engine, monkeypatch):
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    monkeypatch.setattr(settings, "CHAT_MEMORY_TYPE", "summary")
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_KEEP_TURNS", 2)
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "stub")
+    monkeypatch.setattr(settings, "LLM_STUB_LATENCY_MS", 0.0)
+    monkeypatch.setattr(llm_provider, "_providers", {})
+    monkeypatch.setattr(chat_memory, "_llm", None)
+    monkeypatch.setattr(chat_memory, "_metrics", chat_memory.ChatSummaryMetrics())
+    monkeypatch.setattr(chat_memory, "SessionLocal", session_factory)
+    monkeypatch.setattr(chat_history, "SessionLocal", session_factory)
+
+
+async def _turn(session_id, text):
+    chunks = [chunk async for chunk in build_chain(session_id).astream({"input": text})]
+    await asyncio.gather(*chat_memory._runs.values())
+    return chunks[-1]["history"]
+
+
+@pytest.mark.usefixtures("summary_memory")
+async def test_older_turns_are_folded_into_a_summary(db_session):
+    histories = [await _turn("s1", f"Question {turn}") for turn in range(8)]
+
+    # The last two turns verbatim, everything before them summarized
+    summary, *recent = histories[-1]
+    assert isinstance(summary, SystemMessage)
+    assert summary.content == "Summary of the earlier conversation: 10 earlier messages"
+    assert [message.content for message in recent] == [
+        "Question 5",
+        "This is a stub reply.",
+        "Question 6",
+        "This is a stub reply.",
+    ]
+    assert {len(history) for history in histories[3:]} == {5}
+
+    ids = (await db_session.scalars(select(ChatHistory.id).order_by(ChatHistory.id))).all()
+    stored = await chat_summary_crud.get_by_session_id(db_session, session_id="s1")
+    assert len(ids) == 16
+    assert stored.last_message_id == ids[-5]
+    assert chat_memory.get_chat_summary_metrics()["messages_summarized"] == 12
+
+
+@pytest.mark.usefixtures("summary_memory")
+async def test_verbatim_turns_are_kept_within_the_token_budget(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_MAX_TOKENS", 300)
+    await chat_history_crud.add_messages(
+        db_session,
+        session_id="s2",
+        messages=[{"type": "human", "data": {"content": "word " * 100}}, {"type": "ai", "data": {"content": "Noted."}}]
+        * 3,
+    )
+
+    assert await chat_memory.summarize_session("s2") == 4  # only the latest turn fits next to the summary
+    history = await _turn("s2", "Short question")
+    assert [message.content for message in history[1:]] == ["word " * 100, "Noted."]
+
+    await chat_summary_crud.upsert(db_session, session_id="s2", summary="Stale", last_message_id=1)
+    assert (await chat_summary_crud.get_by_session_id(db_session, session_id="s2")).summary != "Stale"
+
+
+@pytest.mark.usefixtures("summary_memory")
+async def test_clearing_a_session_stops_its_summary_run(db_session, monkeypatch):
+    started = asyncio.Event()
+
+    async def slow_summarize(previous, messages):
+        started.set()
+        await asyncio.sleep(60)
+        return "Summary of a cleared conversation"
+
+    monkeypatch.setattr(chat_memory, "_summarize", slow_summarize)
+    await chat_history_crud.add_messages(
+        db_session,
+        session_id="s3",
+        messages=[{"type": "human", "data": {"content": "Hi"}}, {"type": "ai", "data": {"content": "Hello."}}] * 4,
+    )
+    assert chat_memory.start_summary("s3")
+    await started.wait()
+
+    await chat_memory.SummaryBufferMemory(session_id="s3").aclear()
+
+    assert "s3" not in chat_memory._runs
+    assert await chat_summary_crud.get_by_session_id(db_session, session_id="s3") is None
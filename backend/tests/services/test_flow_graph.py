@@ -0,0 +1,119 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.survey import Survey
+from app.models.survey_answer import SurveyAnswer
+from app.routers import survey_flow, surveys
+from app.schemas.survey_flow import AnswerIn
+from app.services import speculative_followup, survey_cache
+from app.services.flow_graph import next_node
+from app.services.survey_cache import InvalidSurveySchemaError, compile_survey, load_compiled_survey
+
+QUESTIONS = [
+    {
+        "id": "rating",
+        "text": "Rate the talk",
+        "type": "rating",
+        "can_followup": False,
+        "branches": [
+            {"when": {"lte": 2}, "goto": "why_low"},
+            {"when": {"skipped": True}, "goto": "end"},
+        ],
+    },
+    {"id": "best", "text": "What did you like most?", "can_followup": False, "next": "end"},
+    {"id": "why_low", "text": "What went wrong?", "can_followup": False},
+    {"text": "Anything else?", "can_followup": False},
+]
+
+
+def _survey(questions, *, is_published=False):
+    return Survey(
+        id=uuid.uuid4(),
+        org_id=uuid.uuid4(),
+        title="Keynote feedback",
+        schema={"questions": questions},
+        is_published=is_published,
+    )
+
+
+def test_flow_follows_branches_then_default_transition():
+    compiled = compile_survey(_survey(QUESTIONS))
+    end = len(QUESTIONS)
+
+    assert next_node(compiled, 0, {"value": 5}) == 1
+    assert next_node(compiled, 0, {"value": 2}) == 2
+    assert next_node(compiled, 0, None) == end
+    assert next_node(compiled, 1, {"value": "Demos"}) == end
+    assert next_node(compiled, 2, {"value": "Audio"}) == 3
+    assert next_node(compiled, 3, None) == end
+
+
+def test_surveys_without_routing_are_linear():
+    compiled = compile_survey(_survey([{"text": "One"}, {"text": "Two"}]))
+    assert [node.next for node in compiled.flow] == [1, 2]
+    assert all(node.branches == () for node in compiled.flow)
+
+
+@pytest.mark.parametrize(
+    "questions",
+    [
+        [{"id": "a", "text": "A", "next": "missing"}],
+        [{"id": "a", "text": "A"}, {"id": "b", "text": "B", "next": "a"}],
+        [{"id": "a", "text": "A"}, {"id": "a", "text": "B"}],
+        [{"text": "A", "branches": [{"when": {"resembles": 1}, "goto": "end"}]}],
+        [{"text": "A", "branches": [{"when": {"in": 1}, "goto": "end"}]}],
+    ],
+)
+def test_invalid_routing_is_rejected(questions):
+    with pytest.raises(InvalidSurveySchemaError):
+        compile_survey(_survey(questions))
+
+
+def test_stored_flow_is_used_instead_of_recompiling(monkeypatch):
+    survey = _survey(QUESTIONS, is_published=True)
+    survey.compiled_flow = compile_survey(survey).model_dump(mode="json")
+
+    def fail(survey):
+        raise AssertionError("published survey was recompiled")
+
+    monkeypatch.setattr(survey_cache, "compile_survey", fail)
+    assert load_compiled_survey(survey).flow[0].branches[0].target == 2
+
+
+async def test_publish_stores_the_flow_and_answers_follow_it(db_session, make_survey_instance, monkeypatch):
+    async def no_followup(**kwargs):
+        return None
+
+    monkeypatch.setattr(speculative_followup, "get_followup_question", no_followup)
+    instance = await make_survey_instance(QUESTIONS, is_published=False)
+
+    published = await surveys.publish_survey(id=instance.survey_id, db=db_session)
+    assert published.compiled_flow["flow"][0]["branches"][0]["target"] == 2
+
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+    low = await survey_flow.submit_answer(AnswerIn(answer={"value": 1}), response_id=started.response_id, db=db_session)
+    assert low.question.text == "What went wrong?"
+    last = await survey_flow.submit_answer(
+        AnswerIn(answer={"value": "Audio"}), response_id=started.response_id, db=db_session
+    )
+    assert last.question.text == "Anything else?"
+    done = await survey_flow.submit_answer(AnswerIn(skipped=True), response_id=started.response_id, db=db_session)
+    assert done.done
+
+    answered = await db_session.scalars(
+        select(SurveyAnswer.question_idx).where(SurveyAnswer.response_id == started.response_id)
+    )
+    assert sorted(answered) == [0, 2, 3]
+
+
+async def test_publish_rejects_invalid_routing(db_session, make_survey_instance):
+    instance = await make_survey_instance([{"id": "a", "text": "A", "next": "nowhere"}], is_published=False)
+
+    with pytest.raises(HTTPException) as err:
+        await surveys.publish_survey(id=instance.survey_id, db=db_session)
+    assert err.value.status_code == 400
+    survey = await db_session.get(Survey, instance.survey_id)
+    assert not survey.is_published and survey.compiled_flow is None
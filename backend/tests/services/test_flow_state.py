@@ -0,0 +1,266 @@
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from fastapi import HTTPException
+from pydantic import ValidationError
+from redis.exceptions import ResponseError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import Settings, settings
+from app.crud.survey_response import survey_response_crud
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_response import SurveyResponse
+from app.routers import survey_flow
+from app.schemas.survey_flow import AnswerIn
+from app.services import flow_state, speculative_followup
+from app.services.flow_state import MemoryFlowStateStore, RedisFlowStateStore
+
+QUESTIONS = [
+    {"text": "Rate the talk", "type": "rating", "can_followup": True},
+    {"text": "What should we change?", "can_followup": False},
+]
+
+
+@pytest.fixture
+def redis_server():
+    return FakeServer()
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def store(request, db_engine, redis_server, monkeypatch):
+    if request.param == "memory":
+        store = MemoryFlowStateStore(max_entries=100)
+    else:
+        store = RedisFlowStateStore(FakeRedis(server=redis_server), ttl_seconds=60)
+    monkeypatch.setattr(settings, "FLOW_STATE_BACKEND", request.param)
+    monkeypatch.setattr(flow_state, "_store", store)
+    monkeypatch.setattr(flow_state, "SessionLocal", async_sessionmaker(db_engine, expire_on_commit=False))
+    yield store
+    await flow_state.drain_flow_state()
+
+
+@pytest.fixture
+def followup_for_rating(monkeypatch):
+    async def followup(*, question_text, **kwargs):
+        return "Why that rating?" if question_text == "Rate the talk" else None
+
+    monkeypatch.setattr(speculative_followup, "get_followup_question", followup)
+
+
+async def _answer(db_session, response_id, value):
+    return await survey_flow.submit_answer(AnswerIn(answer={"value": value}), response_id=response_id, db=db_session)
+
+
+async def _stored_answers(db_session, response_id):
+    rows = await db_session.execute(
+        select(SurveyAnswer.question_idx, SurveyAnswer.is_followup, SurveyAnswer.question_text, SurveyAnswer.answer)
+        .where(SurveyAnswer.response_id == response_id)
+        .order_by(SurveyAnswer.question_idx, SurveyAnswer.is_followup)
+    )
+    return [tuple(row) for row in rows]
+
+
+EXPECTED_ANSWERS = [
+    (0, False, "Rate the talk", {"value": 2}),
+    (0, True, "Why that rating?", {"value": "Too long"}),
+    (1, False, "What should we change?", {"value": "Shorter"}),
+]
+
+
+@pytest.mark.usefixtures("store", "followup_for_rating")
+@pytest.mark.parametrize(
+    ("store", "write_mode"), [("memory", "async"), ("redis", "async"), ("redis", "completion")], indirect=["store"]
+)
+async def test_answers_reach_postgres_in_either_write_mode(db_session, make_survey_instance, monkeypatch, write_mode):
+    monkeypatch.setattr(settings, "FLOW_STATE_WRITE_MODE", write_mode)
+    instance = await make_survey_instance(QUESTIONS)
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+
+    followup = await _answer(db_session, started.response_id, 2)
+    assert followup.question.text == "Why that rating?"
+    assert (await _answer(db_session, started.response_id, "Too long")).question.text == "What should we change?"
+    assert (await _answer(db_session, started.response_id, "Shorter")).done
+    await flow_state.drain_flow_state()
+
+    db_session.expire_all()
+    response = await db_session.get(SurveyResponse, started.response_id)
+    assert response.finished_at is not None and response.current_index == len(QUESTIONS)
+    assert await _stored_answers(db_session, started.response_id) == EXPECTED_ANSWERS
+
+
+@pytest.mark.usefixtures("followup_for_rating")
+@pytest.mark.parametrize("store", ["redis"], indirect=True)
+async def test_completion_mode_reads_and_writes_postgres_only_at_the_end(
+    db_session, make_survey_instance, store, monkeypatch, count_statements
+):
+    monkeypatch.setattr(settings, "FLOW_STATE_WRITE_MODE", "completion")
+    instance = await make_survey_instance(QUESTIONS)
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+    await _answer(db_session, started.response_id, 5)  # warms the survey cache
+
+    with count_statements() as statements:
+        await _answer(db_session, started.response_id, "Great pacing")
+    assert statements == []
+
+    with count_statements() as statements:
+        assert (await _answer(db_session, started.response_id, "Nothing")).done
+    writes = [statement for statement in statements if statement.startswith(("INSERT", "UPDATE"))]
+    assert len(writes) == 2  # one multi-row answer upsert and the finishing update
+    assert await store.get(started.response_id) is None
+
+
+async def test_finished_responses_are_rejected_before_the_write_lands(
+    db_session, make_survey_instance, store, monkeypatch
+):
+    monkeypatch.setattr(settings, "FLOW_STATE_WRITE_MODE", "async")
+    instance = await make_survey_instance([{"text": "Only question", "can_followup": False}])
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+
+    assert (await _answer(db_session, started.response_id, "Done")).done
+    with pytest.raises(HTTPException) as err:
+        await _answer(db_session, started.response_id, "Again")
+    assert err.value.status_code == 400
+
+
+@pytest.mark.usefixtures("followup_for_rating")
+async def test_responses_missing_from_the_store_resume_from_postgres(
+    db_session, make_survey_instance, store, monkeypatch
+):
+    monkeypatch.setattr(settings, "FLOW_STATE_WRITE_MODE", "async")
+    instance = await make_survey_instance(QUESTIONS)
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+    await _answer(db_session, started.response_id, 2)
+    await flow_state.drain_flow_state()
+    await store.delete(started.response_id)  # e.g. expired or the store was flushed
+
+    monkeypatch.setattr(flow_state, "_store", store)
+    assert (await _answer(db_session, started.response_id, "Too long")).question.text == "What should we change?"
+    assert (await _answer(db_session, started.response_id, "Shorter")).done
+    await flow_state.drain_flow_state()
+
+    db_session.expire_all()
+    assert await _stored_answers(db_session, started.response_id) == EXPECTED_ANSWERS
+
+
+def test_completion_mode_needs_the_redis_backend():
+    with pytest.raises(ValidationError):
+        Settings(FLOW_STATE_BACKEND="memory", FLOW_STATE_WRITE_MODE="completion")
+
+
+@pytest.mark.usefixtures("followup_for_rating")
+@pytest.mark.parametrize("store", ["redis"], indirect=True)
+async def test_responses_fall_back_to_postgres_while_the_store_is_down(
+    db_session, make_survey_instance, store, redis_server, monkeypatch
+):
+    monkeypatch.setattr(settings, "FLOW_STATE_WRITE_MODE", "async")
+    instance = await make_survey_instance(QUESTIONS)
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+    await _answer(db_session, started.response_id, 2)
+    await flow_state.drain_flow_state()
+
+    monkeypatch.setattr(flow_state, "_store", store)
+    redis_server.connected = False
+    for value, expected in (("Too long", "What should we change?"), ("Shorter", None)):
+        db_session.expire_all()  # each request has a session of its own
+        result = await _answer(db_session, started.response_id, value)
+        assert (result.question.text if result.question else None) == expected
+
+    db_session.expire_all()
+    assert await _stored_answers(db_session, started.response_id) == EXPECTED_ANSWERS
+
+
+@pytest.mark.usefixtures("followup_for_rating")
+@pytest.mark.parametrize("store", ["redis"], indirect=True)
+async def test_buffered_answers_are_written_through_when_the_store_rejects_writes(
+    db_session, make_survey_instance, store, monkeypatch
+):
+    monkeypatch.setattr(settings, "FLOW_STATE_WRITE_MODE", "completion")
+    monkeypatch.setattr(flow_state, "_metrics", flow_state.FlowStateMetrics())
+    instance = await make_survey_instance(QUESTIONS)
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+    await _answer(db_session, started.response_id, 2)
+
+    async def out_of_memory(response_id, state):
+        raise ResponseError("OOM command not allowed when used memory > 'maxmemory'")
+
+    monkeypatch.setattr(store, "set", out_of_memory)
+    assert (await _answer(db_session, started.response_id, "Too long")).question.text == "What should we change?"
+    assert await store.get(started.response_id) is None
+    db_session.expire_all()
+    assert (await _answer(db_session, started.response_id, "Shorter")).done
+
+    db_session.expire_all()
+    assert await _stored_answers(db_session, started.response_id) == EXPECTED_ANSWERS
+    assert flow_state.get_flow_state_metrics()["store_errors"] == 1
+
+
+@pytest.mark.usefixtures("followup_for_rating")
+@pytest.mark.parametrize("store", ["redis"], indirect=True)
+async def test_responses_started_while_the_store_is_down_stay_in_postgres(
+    db_session, make_survey_instance, store, redis_server, monkeypatch
+):
+    monkeypatch.setattr(settings, "FLOW_STATE_WRITE_MODE", "completion")
+    instance = await make_survey_instance(QUESTIONS)
+    redis_server.connected = False
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+
+    redis_server.connected = True  # nothing is buffered for this response, even once the store is back
+    for value in (2, "Too long", "Shorter"):
+        db_session.expire_all()  # each request has a session of its own
+        result = await _answer(db_session, started.response_id, value)
+    assert result.done
+
+    db_session.expire_all()
+    assert await _stored_answers(db_session, started.response_id) == EXPECTED_ANSWERS
+    assert await store.get(started.response_id) is None
+
+
+@pytest.mark.usefixtures("followup_for_rating")
+@pytest.mark.parametrize("store", ["redis"], indirect=True)
+async def test_lost_buffered_answers_are_reported_instead_of_restarting(
+    db_session, make_survey_instance, store, redis_server, monkeypatch
+):
+    monkeypatch.setattr(settings, "FLOW_STATE_WRITE_MODE", "completion")
+    instance = await make_survey_instance(QUESTIONS)
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+    await _answer(db_session, started.response_id, 2)
+
+    redis_server.connected = False
+    with pytest.raises(HTTPException) as err:
+        await _answer(db_session, started.response_id, "Too long")
+    assert err.value.status_code == 503
+
+    redis_server.connected = True
+    await store.delete(started.response_id)  # e.g. expired or Redis restarted without persistence
+    with pytest.raises(HTTPException) as err:
+        await _answer(db_session, started.response_id, "Too long")
+    assert err.value.status_code == 409
+
+
+@pytest.mark.usefixtures("followup_for_rating")
+@pytest.mark.parametrize("store", ["redis"], indirect=True)
+async def test_background_writes_wait_out_an_unreachable_database(db_session, make_survey_instance, store, monkeypatch):
+    monkeypatch.setattr(settings, "FLOW_STATE_WRITE_MODE", "async")
+    monkeypatch.setattr(settings, "FLOW_STATE_RETRY_BACKOFF_MS", 1)
+    monkeypatch.setattr(flow_state, "_metrics", flow_state.FlowStateMetrics())
+    record_answer_and_advance = survey_response_crud.record_answer_and_advance
+    outages = iter([ConnectionRefusedError("database is down")] * 3)
+
+    async def flaky_record(db, **kwargs):
+        if (outage := next(outages, None)) is not None:
+            raise outage
+        await record_answer_and_advance(db, **kwargs)
+
+    monkeypatch.setattr(survey_response_crud, "record_answer_and_advance", flaky_record)
+    instance = await make_survey_instance(QUESTIONS)
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+    for value in (2, "Too long", "Shorter"):
+        await _answer(db_session, started.response_id, value)
+    await flow_state.drain_flow_state()
+
+    metrics = flow_state.get_flow_state_metrics()
+    assert metrics["write_retries"] == 3
+    assert metrics["write_failures"] == 0
+    db_session.expire_all()
+    assert await _stored_answers(db_session, started.response_id) == EXPECTED_ANSWERS
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from langchain.schema import AIMessage
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services import followup_cache, followup_service
+
+
+class SlowLLM:
+    """Stands in for the pooled chat model and records peak concurrency."""
+
+    def __init__(self, delay: float, reply: str = "NONE"):
+        self.delay = delay
+        self.reply = reply
+        self.active = 0
+        self.peak = 0
+
+    async def ainvoke(self, messages):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return AIMessage(content=self.reply)
+
+
+@pytest.fixture
+def fresh_followup_state(monkeypatch):
+    monkeypatch.setattr(followup_service, "_metrics", followup_service.FollowupMetrics())
+    monkeypatch.setattr(followup_service, "_limiter", None)
+    monkeypatch.setattr(followup_cache, "_decisions", LRUCache(max_entries=100))
+    monkeypatch.setattr(followup_cache, "_stats", followup_cache.FollowupCacheStats())
+
+
+async def _ask(answer=None):
+    return await followup_service.get_followup_question(
+        survey_description="Keynote feedback",
+        question_text="How was the keynote?",
+        participant_answer=answer or {"value": "fine"},
+    )
+
+
+async def test_concurrency_is_bounded(monkeypatch, fresh_followup_state):
+    llm = SlowLLM(delay=0.01, reply="What exactly was fine?")
+    monkeypatch.setattr(followup_service, "_get_llm", lambda: llm)
+    monkeypatch.setattr(settings, "FOLLOWUP_MAX_CONCURRENCY", 3)
+
+    results = await asyncio.gather(*(_ask() for _ in range(12)))
+
+    assert results == ["What exactly was fine?"] * 12
+    assert llm.peak == 3
+    metrics = followup_service.get_followup_metrics()
+    assert metrics["calls"] == 12
+    assert metrics["queue_wait_max_ms"] > 0
+
+
+async def test_slow_provider_degrades_to_no_followup(monkeypatch, fresh_followup_state):
+    monkeypatch.setattr(followup_service, "_get_llm", lambda: SlowLLM(delay=1.0, reply="Why?"))
+    monkeypatch.setattr(settings, "FOLLOWUP_TIMEOUT_SECONDS", 0.05)
+
+    assert await _ask() is None
+    assert followup_service.get_followup_metrics()["timeouts"] == 1
+
+
+def test_client_is_reused(monkeypatch):
+    monkeypatch.setattr(followup_service, "_llm", None)
+    monkeypatch.setattr(followup_service, "_http_client", None)
+
+    assert followup_service._get_llm() is followup_service._get_llm()
+    asyncio.run(followup_service.close_llm_client())
+
+
+async def test_repeated_answers_are_served_from_cache(monkeypatch, fresh_followup_state):
+    llm = SlowLLM(delay=0.01)
+    monkeypatch.setattr(followup_service, "_get_llm", lambda: llm)
+
+    assert await _ask({"value": 5}) is None
+    assert await _ask({"value": 5}) is None
+    assert await _ask({"value": 4}) is None
+
+    stats = followup_cache.get_followup_cache_stats()
+    assert followup_service.get_followup_metrics()["calls"] == 2
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["saved_latency_ms"] > 0
+
+
+def test_cache_key_ignores_formatting_noise():
+    key = followup_cache.make_key(
+        "Keynote", "How was it?", "", {"value": ["B", "A"], "note": "Great  talk"}, question_type="checkbox"
+    )
+    same = followup_cache.make_key(
+        "keynote ", "How  was it?", "", {"note": "great talk", "value": ["A", "B"]}, question_type="checkbox"
+    )
+    other = followup_cache.make_key("Keynote", "How was it?", "", {"value": ["A"]}, question_type="checkbox")
+
+    assert key == same
+    assert key != other
+
+
+def test_cache_key_keeps_the_order_of_ordered_answers():
+    ranking = followup_cache.make_key("Keynote", "Rank the talks", "", {"value": ["a", "b"]}, question_type="ranking")
+    reversed_ranking = followup_cache.make_key(
+        "Keynote", "Rank the talks", "", {"value": ["b", "a"]}, question_type="ranking"
+    )
+
+    assert ranking != reversed_ranking
@@ -0,0 +1,85 @@
+import base64
+import csv
+import io
+import json
+import zipfile
+
+import pytest
+import qrcode
+from PIL import Image
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.link import Link
+from app.routers import survey_instances
+from app.schemas.link import LinkBulkCreate, QRFormat
+from app.services import qr_codes
+from app.services.link_bundles import LinkBundleFormat
+
+
+@pytest.fixture(autouse=True)
+def _render_in_threads(monkeypatch):
+    monkeypatch.setattr(settings, "QR_RENDER_PROCESSES", 0)
+    qr_codes._images.clear()
+    yield
+    qr_codes._images.clear()
+
+
+async def _body(response):
+    return b"".join([chunk if isinstance(chunk, bytes) else chunk.encode() async for chunk in response.body_iterator])
+
+
+async def test_qr_codes_match_the_qrcode_library():
+    url = "/l/0b5c8f1e-3d47-4a8e-9a51-6f2f0c7d9e11"
+    expected = qrcode.QRCode(box_size=6, border=2, mask_pattern=settings.QR_MASK_PATTERN)
+    expected.add_data(url)
+    expected_pixels = expected.make_image().get_image().convert("L")
+
+    png = await qr_codes.render_qr(url, QRFormat.PNG, box_size=6, border=2)
+    svg = (await qr_codes.render_qr(url, QRFormat.SVG, box_size=6, border=2)).decode()
+
+    pixels = Image.open(io.BytesIO(png)).convert("L")
+    assert pixels.size == expected_pixels.size
+    assert pixels.tobytes() == expected_pixels.tobytes()
+    size = expected.modules_count + 4
+    assert f'viewBox="0 0 {size} {size}"' in svg and f'width="{size * 6}"' in svg
+    # Rendering the same code again comes from the cache
+    assert await qr_codes.render_qr(url, QRFormat.PNG, box_size=6, border=2) == png
+    assert qr_codes.get_qr_cache_stats()["hits"] == 1
+
+
+async def test_bulk_minting_inserts_every_link_at_once(db_session, make_survey_instance, count_statements):
+    instance = await make_survey_instance([{"text": "Rate the talk", "type": "rating"}])
+    links_in = LinkBulkCreate(
+        survey_instance_id=instance.id, attendees=["A-001", "A-002", "A-003"], qr_formats=[QRFormat.SVG, QRFormat.PNG]
+    )
+
+    with count_statements() as statements:
+        response = await survey_instances.create_survey_links_bulk(
+            links_in=links_in, format=LinkBundleFormat.ZIP, db=db_session
+        )
+    body = await _body(response)
+
+    assert sum(statement.startswith("INSERT INTO link") for statement in statements) == 1
+    assert await db_session.scalar(select(func.count()).where(Link.survey_instance_id == instance.id)) == 3
+    archive = zipfile.ZipFile(io.BytesIO(body))
+    manifest = list(csv.DictReader(io.StringIO(archive.read("links.csv").decode())))
+    assert [row["Attendee"] for row in manifest] == ["A-001", "A-002", "A-003"]
+    for row in manifest:
+        assert row["URL"] == f"/l/{row['Link ID']}"
+        assert archive.read(row["QR SVG"]).startswith(b"<svg")
+        assert Image.open(io.BytesIO(archive.read(row["QR PNG"]))).format == "PNG"
+
+
+async def test_bulk_minting_streams_ndjson(db_session, make_survey_instance):
+    instance = await make_survey_instance([{"text": "Rate the talk", "type": "rating"}])
+    links_in = LinkBulkCreate(survey_instance_id=instance.id, attendees=["Ada", "Grace"], qr_formats=[QRFormat.PNG])
+
+    response = await survey_instances.create_survey_links_bulk(
+        links_in=links_in, format=LinkBundleFormat.NDJSON, db=db_session
+    )
+    lines = [json.loads(line) for line in (await _body(response)).decode().splitlines()]
+
+    assert [line["attendee"] for line in lines] == ["Ada", "Grace"]
+    assert all(set(line) == {"link_id", "url", "attendee", "qr_png"} for line in lines)
+    assert Image.open(io.BytesIO(base64.b64decode(lines[0]["qr_png"]))).format == "PNG"
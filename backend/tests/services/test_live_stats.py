@@ -0,0 +1,103 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.models.link import Link
+from app.routers import public, stats, survey_flow
+from app.schemas.survey_flow import AnswerIn
+from app.services import live_stats, public_form_cache
+
+QUESTIONS = [
+    {"text": "Rate the talk", "type": "rating", "can_followup": False},
+    {"text": "Best part?", "type": "radio", "choices": ["Talks", "Food", "Venue"], "can_followup": False},
+    {"text": "Anything else?", "can_followup": False},
+]
+
+
+@pytest.fixture
+async def instance(db_engine, make_survey_instance, monkeypatch):
+    monkeypatch.setattr(live_stats, "ReadSessionLocal", async_sessionmaker(db_engine, expire_on_commit=False))
+    monkeypatch.setattr(settings, "LIVE_STATS_PUSH_INTERVAL_MS", 10)
+    public_form_cache._forms.clear()
+    yield await make_survey_instance(QUESTIONS)
+    public_form_cache._forms.clear()
+
+
+async def _respond(db_session, instance, *answers):
+    """Go through the survey flow; ``None`` skips a question and missing answers leave it unfinished."""
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+    for value in answers:
+        answer_in = AnswerIn(skipped=True) if value is None else AnswerIn(answer={"value": value})
+        await survey_flow.submit_answer(answer_in, response_id=started.response_id, db=db_session)
+
+
+async def _next_update(updates):
+    return json.loads(await asyncio.wait_for(updates.get(), timeout=5))
+
+
+async def test_live_counters_match_the_database(db_session, instance):
+    await _respond(db_session, instance, 5, "Talks", "Great")
+    await _respond(db_session, instance, 2)
+
+    async with live_stats.subscribe(instance.event_id) as updates:
+        initial = await _next_update(updates)
+        assert (initial["started_responses"], initial["finished_responses"]) == (2, 1)
+        assert initial["instances"][0]["questions"][0]["average_score"] == 3.5
+
+        await _respond(db_session, instance, 4, None, "Nothing")
+        await _respond(db_session, instance, 1, "Food")
+        link = Link(org_id=instance.org_id, survey_instance_id=instance.id)
+        db_session.add(link)
+        await db_session.commit()
+        await public.submit_survey_response(
+            uuid=str(link.id),
+            response_data={"answers": {"Rate the talk": 3, "Best part?": "Food"}},
+            db=db_session,
+        )
+
+        live = await _next_update(updates)
+        while live["started_responses"] < 5:  # earlier pushes may have caught only some of them
+            live = await _next_update(updates)
+        aggregator = live_stats._aggregators[instance.event_id]
+        await aggregator.load(db_session)
+        assert json.loads(aggregator.payload()) == live
+
+    assert (live["started_responses"], live["finished_responses"]) == (5, 3)
+    rating, best, other = live["instances"][0]["questions"]
+    assert rating["average_score"] == 3.0 and rating["distribution"] == {"1": 1, "2": 1, "3": 1, "4": 1, "5": 1}
+    assert best["answered"] == 3 and best["distribution"] == {"Talks": 1, "Food": 2, "Venue": 0}
+    assert other["answered"] == 2 and other["distribution"] is None
+
+
+async def test_dashboards_share_one_aggregator(db_session, instance):
+    async with live_stats.subscribe(instance.event_id) as first, live_stats.subscribe(instance.event_id) as second:
+        await _next_update(first)
+        await _next_update(second)
+        assert live_stats.get_live_stats_metrics() == {"events": 1, "subscribers": 2}
+
+        await _respond(db_session, instance, 5)
+        assert (await _next_update(first)) == (await _next_update(second))
+
+    assert live_stats.get_live_stats_metrics() == {"events": 0, "subscribers": 0}
+    assert instance.id not in live_stats._instance_aggregators
+
+
+async def test_stats_stream(db_session, instance):
+    response = await stats.stream_event_stats(id=instance.event_id, db=db_session)
+    events = response.body_iterator
+    try:
+        first = await anext(events)
+    finally:
+        await events.aclose()
+    assert first["event"] == "stats"
+    assert json.loads(first["data"])["event_id"] == str(instance.event_id)
+    assert live_stats.get_live_stats_metrics()["events"] == 0
+
+    with pytest.raises(HTTPException) as err:
+        await stats.stream_event_stats(id=uuid.uuid4(), db=db_session)
+    assert err.value.status_code == 404
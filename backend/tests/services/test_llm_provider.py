@@ -0,0 +1,99 @@
+import asyncio
+import statistics
+import time
+
+import pytest
+from langchain.schema import HumanMessage, SystemMessage
+
+from app.core.config import settings
+from app.services import followup_service, llm_provider
+from app.services.llm_provider import RecordingHandler, ReplayProvider, StubChatModel, StubLLMError, StubProvider
+
+
+def _prompt(text):
+    return [SystemMessage(content="You are a test."), HumanMessage(content=text)]
+
+
+@pytest.fixture
+def stub_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "stub")
+    monkeypatch.setattr(settings, "LLM_STUB_LATENCY_MS", 2.0)
+    monkeypatch.setattr(settings, "LLM_STUB_LATENCY_SIGMA", 0.5)
+    monkeypatch.setattr(llm_provider, "_providers", {})
+
+
+async def _outcomes(model, prompts):
+    results = await asyncio.gather(*(model.ainvoke(prompt) for prompt in prompts), return_exceptions=True)
+    return [type(result).__name__ if isinstance(result, Exception) else result.content for result in results]
+
+
+@pytest.mark.usefixtures("stub_settings")
+async def test_stub_draws_latency_and_errors_repeatably(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_STUB_ERROR_RATE", 0.2)
+    monkeypatch.setattr(settings, "LLM_STUB_TIMEOUT_RATE", 0.1)
+    monkeypatch.setattr(settings, "LLM_STUB_HANG_SECONDS", 0.01)
+    prompts = [_prompt(f"Answer {idx}") for idx in range(200)]
+
+    first = await _outcomes(llm_provider.get_llm_provider().chat_model(temperature=0), prompts)
+    second = await _outcomes(llm_provider.get_llm_provider().chat_model(temperature=0), list(reversed(prompts)))
+
+    assert first == list(reversed(second))  # the same outcome per prompt, whatever the order
+    counts = {outcome: first.count(outcome) for outcome in set(first)}
+    assert set(counts) == {"This is a stub reply.", "StubLLMError", "TimeoutError"}
+    assert 20 <= counts["StubLLMError"] <= 60
+    assert 5 <= counts["TimeoutError"] <= 35
+
+
+def test_stub_latency_is_log_normal_around_its_median():
+    model = StubChatModel(latency_ms=800.0, latency_sigma=0.5)
+    delays = sorted(model._plan(_prompt(f"Answer {idx}"))[1] for idx in range(1000))
+
+    assert 0.75 <= statistics.median(delays) <= 0.85
+    assert 1.6 <= delays[950] <= 2.0  # p95 = median * exp(1.645 * sigma)
+    assert StubChatModel(latency_ms=800.0, latency_sigma=0.0)._plan(_prompt("Answer"))[1] == pytest.approx(0.8)
+
+
+async def test_recorded_calls_are_replayed(tmp_path):
+    path = tmp_path / "calls.jsonl"
+    recorded = StubChatModel(
+        reply=lambda messages: f"Recorded: {messages[-1].content}",
+        latency_ms=30.0,
+        latency_sigma=0.0,
+        callbacks=[RecordingHandler(str(path))],
+    )
+    await recorded.ainvoke(_prompt("How was the keynote?"))
+    await recorded.ainvoke(_prompt("How was lunch?"))
+
+    model = ReplayProvider(str(path)).chat_model(temperature=0, stub_reply=lambda messages: "NONE")
+    started = time.perf_counter()
+    assert (await model.ainvoke(_prompt("How was lunch?"))).content == "Recorded: How was lunch?"
+    assert time.perf_counter() - started >= 0.025
+    # Prompts that were not recorded get the caller's stub reply with a recorded latency
+    assert (await model.ainvoke(_prompt("How was the venue?"))).content == "NONE"
+
+    with pytest.raises(StubLLMError):
+        await StubChatModel(latency_ms=0, error_rate=1.0).ainvoke(_prompt("Anything"))
+
+
+@pytest.mark.usefixtures("stub_settings")
+async def test_followups_run_offline_on_the_stub(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_STUB_FOLLOWUP_RATE", 0.5)
+    monkeypatch.setattr(settings, "FOLLOWUP_CACHE_SHARED", False)
+    monkeypatch.setattr(followup_service, "_llm", None)
+    assert isinstance(llm_provider.get_llm_provider(), StubProvider)
+
+    questions = await asyncio.gather(
+        *(
+            followup_service.get_followup_question(
+                survey_description="Keynote feedback",
+                question_text="How was the keynote?",
+                participant_answer={"value": f"Offline answer {idx}"},
+            )
+            for idx in range(40)
+        )
+    )
+    await followup_service.close_llm_client()
+
+    asked = [question for question in questions if question is not None]
+    assert set(asked) == {"Could you tell us a bit more about that?"}
+    assert 10 <= len(asked) <= 30
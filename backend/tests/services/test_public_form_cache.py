@@ -0,0 +1,90 @@
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.event import Event
+from app.models.link import Link
+from app.routers import public
+from app.services import public_form_cache
+from app.services.public_form_cache import cache_control, etag_matches
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    public_form_cache._forms.clear()
+    yield
+    public_form_cache._forms.clear()
+
+
+@pytest.fixture
+async def make_link(db_session, make_survey_instance):
+    async def _make(*, expires_at=None, is_published=True):
+        instance = await make_survey_instance([{"text": "Rate the talk", "type": "rating"}], is_published=is_published)
+        link = Link(org_id=instance.org_id, survey_instance_id=instance.id, expires_at=expires_at)
+        db_session.add(link)
+        await db_session.commit()
+        return instance, link
+
+    return _make
+
+
+def test_etag_matching_follows_if_none_match_rules():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+async def test_repeat_scans_are_served_from_cache_and_revalidated(db_session, make_link, count_statements):
+    _, link = await make_link()
+
+    with count_statements() as statements:
+        first = await public.get_public_form(uuid=str(link.id), if_none_match=None, db=db_session)
+        for _ in range(50):
+            repeat = await public.get_public_form(uuid=str(link.id), if_none_match=None, db=db_session)
+    assert len(statements) == 1
+
+    assert first.status_code == 200
+    assert json.loads(first.body)["title"] == "Benchmark survey"
+    assert json.loads(first.body)["event"]["name"] == "Benchmark event"
+    assert repeat.body == first.body
+    assert first.headers["Cache-Control"] == "public, max-age=60"
+
+    etag = first.headers["ETag"]
+    not_modified = await public.get_public_form(uuid=str(link.id), if_none_match=etag, db=db_session)
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["ETag"] == etag
+
+
+async def test_event_change_invalidates_the_form(db_session, make_link):
+    instance, link = await make_link()
+    first = await public.get_public_form(uuid=str(link.id), if_none_match=None, db=db_session)
+
+    event = await db_session.get(Event, instance.event_id)
+    event.name = "Renamed keynote"
+    await db_session.commit()
+    assert public_form_cache.invalidate_event_forms(instance.event_id) == 1
+
+    changed = await public.get_public_form(uuid=str(link.id), if_none_match=first.headers["ETag"], db=db_session)
+    assert changed.status_code == 200
+    assert json.loads(changed.body)["event"]["name"] == "Renamed keynote"
+    assert changed.headers["ETag"] != first.headers["ETag"]
+
+
+async def test_cache_honours_link_expiry_and_drafts_revalidate(db_session, make_link):
+    _, expired = await make_link(expires_at=datetime.now(UTC) - timedelta(minutes=1))
+    with pytest.raises(HTTPException) as err:
+        await public.get_public_form(uuid=str(expired.id), if_none_match=None, db=db_session)
+    assert err.value.status_code == 404
+
+    _, expiring = await make_link(expires_at=datetime.now(UTC) + timedelta(seconds=20))
+    form = await public_form_cache.get_public_form(db_session, expiring.id)
+    assert cache_control(form) in {"public, max-age=19", "public, max-age=20"}
+
+    _, draft = await make_link(is_published=False)
+    form = await public_form_cache.get_public_form(db_session, draft.id)
+    assert cache_control(form) == "no-cache"
@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.models.link import Link
+from app.routers import public, stats, survey_flow
+from app.schemas.survey_flow import AnswerIn
+from app.services import public_form_cache, question_rollups, speculative_followup
+
+QUESTIONS = [
+    {"text": "Rate the talk", "type": "rating", "can_followup": True},
+    {"text": "Best part?", "type": "checkbox", "choices": ["Talks", "Food", "Venue"], "can_followup": False},
+    {"text": "Anything else?", "can_followup": False},
+]
+
+
+@pytest.fixture(autouse=True)
+def rollup_settings(db_engine, monkeypatch):
+    async def followup(*, participant_answer, **kwargs):
+        return "What went wrong?" if participant_answer == {"value": 1} else None
+
+    monkeypatch.setattr(speculative_followup, "get_followup_question", followup)
+    monkeypatch.setattr(settings, "QUESTION_ROLLUP_LAG_SECONDS", 0)
+    public_form_cache._forms.clear()
+    yield
+    public_form_cache._forms.clear()
+
+
+async def _respond(db_session, instance, *answers):
+    """Go through the survey flow; ``None`` skips a question and missing answers leave it unfinished."""
+    started = await survey_flow.start_survey(survey_instance_id=instance.id, db=db_session)
+    for value in answers:
+        answer_in = AnswerIn(skipped=True) if value is None else AnswerIn(answer={"value": value})
+        await survey_flow.submit_answer(answer_in, response_id=started.response_id, db=db_session)
+
+
+async def _refresh(db_engine):
+    async with async_sessionmaker(db_engine)() as db:
+        return await question_rollups.refresh_rollups(db)
+
+
+async def test_question_stats_come_from_the_rollups(db_engine, db_session, make_survey_instance, count_statements):
+    instance = await make_survey_instance(QUESTIONS)
+    await _respond(db_session, instance, 5, ["Talks", "Food"], "Great")
+    await _respond(db_session, instance, 1, "Too long", None, None)  # the second answer replies to a follow-up
+    await _respond(db_session, instance, 4)
+    link = Link(org_id=instance.org_id, survey_instance_id=instance.id)
+    db_session.add(link)
+    await db_session.commit()
+    await public.submit_survey_response(
+        uuid=str(link.id), response_data={"answers": {"Rate the talk": 3, "Best part?": ["Food"]}}, db=db_session
+    )
+
+    assert await _refresh(db_engine) == 1
+    with count_statements() as statements:
+        out = await stats.get_question_stats(id=instance.id, db=db_session)
+
+    assert out.refreshed_at is not None
+    rating, best, other = out.questions
+    assert (rating.reached, rating.answered, rating.average_score) == (4, 4, 3.25)
+    assert rating.distribution == {"1": 1, "3": 1, "4": 1, "5": 1}
+    assert (rating.followups, rating.followups_answered, rating.followup_rate) == (1, 1, 0.25)
+    # The third response is still on this question and counts as not answered
+    assert (best.reached, best.answered, best.skip_rate) == (4, 2, 0.5)
+    assert best.distribution == {"Talks": 1, "Food": 2, "Venue": 0}
+    assert (other.reached, other.answered, other.distribution) == (2, 1, None)
+    assert len(statements) == 2  # the instance and its rollups; the survey is cached
+
+
+async def test_refresh_only_recomputes_instances_with_new_activity(db_engine, db_session, make_survey_instance):
+    first = await make_survey_instance(QUESTIONS)
+    second = await make_survey_instance(QUESTIONS)
+    await _respond(db_session, first, 5)
+    await _respond(db_session, second, 4)
+    assert await _refresh(db_engine) == 2
+    assert await _refresh(db_engine) == 0
+
+    await _respond(db_session, second, 2, ["Venue"])
+    assert await _refresh(db_engine) == 1
+
+    out = await stats.get_question_stats(id=second.id, db=db_session)
+    assert [question.answered for question in out.questions] == [2, 1, 0]
+    assert out.questions[1].distribution == {"Talks": 0, "Food": 0, "Venue": 1}
@@ -0,0 +1,100 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_response import SurveyResponse
+from app.routers import survey_flow
+from app.schemas.survey_flow import BulkResponsesIn
+
+QUESTIONS = [
+    {"text": "Rate the talk", "type": "rating"},
+    {"text": "What should we change?"},
+]
+
+
+def _upload(response_ids, **overrides):
+    started = datetime.now(UTC) - timedelta(hours=2)
+    return BulkResponsesIn.model_validate(
+        {
+            "responses": [
+                {
+                    "id": response_id,
+                    "started_at": started,
+                    "finished_at": started + timedelta(minutes=3),
+                    "answers": [
+                        {"question_idx": 0, "answer": {"value": idx % 5 + 1}},
+                        {"question_idx": 1, "skipped": True},
+                    ],
+                    **overrides,
+                }
+                for idx, response_id in enumerate(response_ids)
+            ]
+        }
+    )
+
+
+async def _count(db_session, model):
+    return await db_session.scalar(select(func.count()).select_from(model))
+
+
+async def test_kiosk_backlog_syncs_in_one_request(db_session, make_survey_instance, count_statements):
+    instance = await make_survey_instance(QUESTIONS)
+    response_ids = [uuid.uuid4() for _ in range(500)]
+
+    with count_statements() as statements:
+        out = await survey_flow.submit_responses_bulk(
+            responses_in=_upload(response_ids), survey_instance_id=instance.id, db=db_session
+        )
+    # instance + survey lookup, one response insert, one answer insert
+    assert len(statements) == 4
+    assert out.created == 500 and out.duplicates == 0 and out.rejected == 0
+    assert [result.id for result in out.results] == response_ids
+    assert await _count(db_session, SurveyResponse) == 500
+    assert await _count(db_session, SurveyAnswer) == 1000
+
+    stored = await db_session.get(SurveyResponse, response_ids[0])
+    assert stored.current_index == len(QUESTIONS)
+    assert stored.finished_at is not None
+
+
+async def test_reupload_is_idempotent(db_session, make_survey_instance):
+    instance = await make_survey_instance(QUESTIONS)
+    response_ids = [uuid.uuid4() for _ in range(3)]
+    await survey_flow.submit_responses_bulk(
+        responses_in=_upload(response_ids[:2], answers=[{"question_idx": 0, "answer": {"value": 5}}]),
+        survey_instance_id=instance.id,
+        db=db_session,
+    )
+
+    out = await survey_flow.submit_responses_bulk(
+        responses_in=_upload(response_ids), survey_instance_id=instance.id, db=db_session
+    )
+
+    assert [result.status for result in out.results] == ["duplicate", "duplicate", "created"]
+    assert await _count(db_session, SurveyResponse) == 3
+    # Missing answers are filled in, stored ones are kept
+    answers = (
+        await db_session.execute(select(SurveyAnswer).where(SurveyAnswer.response_id == response_ids[0]))
+    ).scalars()
+    assert {answer.question_idx: answer.answer for answer in answers} == {0: {"value": 5}, 1: None}
+
+
+async def test_invalid_and_foreign_responses_are_reported(db_session, make_survey_instance):
+    instance = await make_survey_instance(QUESTIONS)
+    other = await make_survey_instance(QUESTIONS)
+    foreign_id, bad_id, repeated_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    await survey_flow.submit_responses_bulk(
+        responses_in=_upload([foreign_id]), survey_instance_id=other.id, db=db_session
+    )
+
+    upload = _upload([foreign_id, bad_id, repeated_id, repeated_id])
+    upload.responses[1].answers[1].question_idx = 7
+    out = await survey_flow.submit_responses_bulk(responses_in=upload, survey_instance_id=instance.id, db=db_session)
+
+    assert [result.status for result in out.results] == ["conflict", "invalid", "created", "duplicate"]
+    assert out.results[1].detail == "Question 7 does not exist"
+    assert (out.created, out.duplicates, out.rejected) == (1, 1, 2)
+    foreign = await db_session.get(SurveyResponse, foreign_id)
+    assert foreign.survey_instance_id == other.id
@@ -0,0 +1,135 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.crud.survey_response import survey_response_crud
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_response import SurveyResponse
+from app.services import speculative_followup
+
+
+class FakeSession:
+    """Async session stand-in that only records commits."""
+
+    def __init__(self):
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def commit(self):
+        self.committed = True
+
+
+@pytest.fixture
+def offers(monkeypatch):
+    """Capture late follow-ups instead of writing them to the database."""
+    recorded = []
+
+    async def add_late_followup(db, *, response_id, question_idx, followup_text):
+        recorded.append((response_id, question_idx, followup_text))
+
+    monkeypatch.setattr(speculative_followup.survey_response_crud, "add_late_followup", add_late_followup)
+    monkeypatch.setattr(speculative_followup, "SessionLocal", FakeSession)
+    return recorded
+
+
+def _slow_followup(delay, reply):
+    state = {"cancelled": False}
+
+    async def get_followup_question(**kwargs):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        return reply
+
+    return get_followup_question, state
+
+
+async def _ask(response_id):
+    return await speculative_followup.get_followup_within_deadline(
+        response_id=response_id,
+        question_idx=2,
+        survey_description="Keynote feedback",
+        question_text="How was the keynote?",
+        participant_answer={"value": "fine"},
+    )
+
+
+async def test_followup_within_deadline_is_returned(monkeypatch, offers):
+    fake, _ = _slow_followup(0.01, "What exactly was fine?")
+    monkeypatch.setattr(speculative_followup, "get_followup_question", fake)
+    monkeypatch.setattr(settings, "FOLLOWUP_DEADLINE_MS", 500)
+
+    assert await _ask(uuid.uuid4()) == "What exactly was fine?"
+    assert offers == []
+
+
+async def test_late_followup_is_offered(monkeypatch, offers):
+    fake, _ = _slow_followup(0.1, "What exactly was fine?")
+    monkeypatch.setattr(speculative_followup, "get_followup_question", fake)
+    monkeypatch.setattr(settings, "FOLLOWUP_DEADLINE_MS", 10)
+    monkeypatch.setattr(settings, "FOLLOWUP_LATE_MODE", "offer")
+    response_id = uuid.uuid4()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await _ask(response_id) is None
+    assert loop.time() - started < 0.1
+
+    await speculative_followup.drain_late_followups()
+    assert offers == [(response_id, 2, "What exactly was fine?")]
+
+
+async def test_late_followup_is_dropped(monkeypatch, offers):
+    fake, state = _slow_followup(0.1, "What exactly was fine?")
+    monkeypatch.setattr(speculative_followup, "get_followup_question", fake)
+    monkeypatch.setattr(settings, "FOLLOWUP_DEADLINE_MS", 10)
+    monkeypatch.setattr(settings, "FOLLOWUP_LATE_MODE", "drop")
+
+    assert await _ask(uuid.uuid4()) is None
+    await asyncio.sleep(0)
+
+    assert state["cancelled"]
+    assert offers == []
+
+
+async def test_late_followup_offer_round_trip(db_session, make_survey_instance):
+    instance = await make_survey_instance([{"text": "How was the keynote?"}])
+    response = SurveyResponse(survey_id=instance.survey_id, survey_instance_id=instance.id, current_index=1)
+    db_session.add(response)
+    await db_session.commit()
+
+    await survey_response_crud.add_late_followup(
+        db_session, response_id=response.id, question_idx=0, followup_text="What exactly was fine?"
+    )
+    await db_session.commit()
+    await db_session.refresh(response)
+    assert response.meta == {"late_followups": {"0": "What exactly was fine?"}}
+
+    await survey_response_crud.answer_late_followup(
+        db_session,
+        response_id=response.id,
+        question_idx=0,
+        followup_text="What exactly was fine?",
+        answer={"value": "The demos"},
+    )
+    await db_session.commit()
+    await db_session.refresh(response)
+    assert response.meta == {"late_followups": {}}
+
+    followup = (
+        await db_session.execute(
+            select(SurveyAnswer).where(SurveyAnswer.response_id == response.id, SurveyAnswer.is_followup)
+        )
+    ).scalar_one()
+    assert followup.question_text == "What exactly was fine?"
+    assert followup.answer == {"value": "The demos"}
@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.models.link import Link
+from app.models.survey_answer import SurveyAnswer
+from app.models.survey_response import SurveyResponse
+from app.routers import public
+from app.services import public_form_cache, submission_queue
+
+QUESTIONS = [
+    {"text": "Rate the talk", "type": "rating"},
+    {"text": "What should we change?"},
+]
+
+
+@pytest.fixture
+async def link(db_engine, db_session, make_survey_instance, monkeypatch):
+    monkeypatch.setattr(submission_queue, "SessionLocal", async_sessionmaker(db_engine, expire_on_commit=False))
+    public_form_cache._forms.clear()
+    instance = await make_survey_instance(QUESTIONS)
+    link = Link(org_id=instance.org_id, survey_instance_id=instance.id)
+    db_session.add(link)
+    await db_session.commit()
+    yield link
+    await submission_queue.drain_submissions()
+    public_form_cache._forms.clear()
+
+
+async def _submit(db_session, link, rating):
+    return await public.submit_survey_response(
+        uuid=str(link.id),
+        response_data={"answers": {"Rate the talk": rating, "What should we change?": None}},
+        db=db_session,
+    )
+
+
+async def _count(db_session, model):
+    return await db_session.scalar(select(func.count()).select_from(model))
+
+
+async def test_sync_submissions_are_committed_before_the_reply(db_session, link):
+    out = await _submit(db_session, link, 4)
+
+    stored = await db_session.get(SurveyResponse, out.id)
+    assert stored is not None and stored.finished_at is not None
+    answers = (await db_session.execute(select(SurveyAnswer).where(SurveyAnswer.response_id == out.id))).scalars()
+    assert {answer.question_text: answer.answer for answer in answers} == {
+        "Rate the talk": {"value": 4},
+        "What should we change?": None,
+    }
+
+
+async def test_write_behind_batches_a_burst_and_drains_on_shutdown(db_session, link, monkeypatch, count_statements):
+    monkeypatch.setattr(settings, "SUBMIT_DURABILITY", "write_behind")
+    monkeypatch.setattr(settings, "SUBMIT_FLUSH_INTERVAL_MS", 10_000)
+    monkeypatch.setattr(settings, "SUBMIT_FLUSH_MAX_ROWS", 150)
+    await _submit(db_session, link, 5)  # warms the form and survey caches
+    await submission_queue.drain_submissions()
+
+    with count_statements() as statements:
+        acknowledged = await asyncio.gather(*(_submit(db_session, link, idx % 5 + 1) for idx in range(300)))
+        assert len({out.id for out in acknowledged}) == 300
+        assert await _count(db_session, SurveyResponse) == 1  # nothing written yet
+
+        # A full batch goes out without waiting for the flush interval
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if submission_queue.get_submission_metrics()["written"] >= 151:
+                break
+        await submission_queue.drain_submissions()
+
+    assert await _count(db_session, SurveyResponse) == 301
+    assert await _count(db_session, SurveyAnswer) == 602
+    inserts = [statement for statement in statements if statement.startswith("INSERT")]
+    assert len(inserts) == 4  # two batches of 150, one response and one answer insert each
+
+
+async def test_invalid_submissions_are_rejected_before_queueing(db_session, link, monkeypatch):
+    monkeypatch.setattr(settings, "SUBMIT_DURABILITY", "write_behind")
+
+    with pytest.raises(HTTPException) as err:
+        await public.submit_survey_response(uuid=str(link.id), response_data={"answers": {"Unknown": 1}}, db=db_session)
+    assert err.value.status_code == 400
+    assert submission_queue.get_submission_metrics()["pending"] == 0
+
+
+async def test_write_behind_waits_out_an_unreachable_database(db_session, link, monkeypatch):
+    monkeypatch.setattr(settings, "SUBMIT_DURABILITY", "write_behind")
+    monkeypatch.setattr(settings, "SUBMIT_RETRY_BACKOFF_MS", 1)
+    monkeypatch.setattr(submission_queue, "_metrics", submission_queue.SubmissionMetrics())
+    write_submissions = submission_queue.write_submissions
+    outages = iter([ConnectionRefusedError("database is down")] * 3)
+
+    async def flaky_write(db, submissions):
+        if (outage := next(outages, None)) is not None:
+            raise outage
+        await write_submissions(db, submissions)
+
+    monkeypatch.setattr(submission_queue, "write_submissions", flaky_write)
+    acknowledged = [await _submit(db_session, link, rating) for rating in range(1, 4)]
+    await submission_queue.drain_submissions()
+
+    metrics = submission_queue.get_submission_metrics()
+    assert metrics["retries"] == 3
+    assert metrics["failed"] == 0
+    assert await _count(db_session, SurveyResponse) == len(acknowledged)
+
+
+async def test_write_behind_drops_only_rejected_rows(db_session, link, monkeypatch):
+    monkeypatch.setattr(settings, "SUBMIT_DURABILITY", "write_behind")
+    monkeypatch.setattr(submission_queue, "_metrics", submission_queue.SubmissionMetrics())
+    orphan = submission_queue.Submission(
+        response={"id": uuid.uuid4(), "survey_id": uuid.uuid4(), "survey_instance_id": uuid.uuid4()},
+        answers=[],
+    )
+
+    await submission_queue.save_submission(db_session, orphan)  # violates the survey foreign keys
+    await _submit(db_session, link, 5)
+    await submission_queue.drain_submissions()
+
+    metrics = submission_queue.get_submission_metrics()
+    assert metrics["failed"] == 1
+    assert metrics["retries"] == 0
+    assert await _count(db_session, SurveyResponse) == 1
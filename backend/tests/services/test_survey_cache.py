@@ -0,0 +1,76 @@
+import math
+import uuid
+
+import pytest
+
+from app.core.cache import LRUCache
+from app.models.survey import Survey
+from app.services import survey_cache
+from app.services.survey_cache import InvalidSurveySchemaError, compile_survey
+
+
+def _survey(schema, *, is_published=True):
+    return Survey(
+        id=uuid.uuid4(), org_id=uuid.uuid4(), title="Keynote feedback", schema=schema, is_published=is_published
+    )
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache: LRUCache[str, int] = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now)
+    cache: LRUCache[str, int] = LRUCache(max_entries=10, ttl_seconds=5)
+    cache.set("draft", 1)
+    cache.set("published", 2, ttl_seconds=math.inf)
+
+    now += 10
+    assert cache.get("draft") is None
+    assert cache.get("published") == 2
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_compile_survey_builds_immutable_questions():
+    survey = _survey({"questions": [{"text": "Rate the talk", "type": "rating"}, {"text": "Why?"}]})
+
+    compiled = compile_survey(survey)
+
+    assert [question.text for question in compiled.questions] == ["Rate the talk", "Why?"]
+    assert compiled.questions[1].type == "text"
+    with pytest.raises(ValueError):
+        compiled.questions[0].text = "changed"
+
+
+@pytest.mark.parametrize("schema", [{}, {"questions": []}, {"questions": [{"type": "text"}]}])
+def test_compile_survey_rejects_unusable_schemas(schema):
+    with pytest.raises(InvalidSurveySchemaError):
+        compile_survey(_survey(schema))
+
+
+async def test_published_surveys_are_served_from_cache(monkeypatch):
+    survey = _survey({"questions": [{"text": "Rate the talk", "type": "rating"}]})
+    loads = []
+
+    async def fake_get(db, id):
+        loads.append(id)
+        return survey
+
+    monkeypatch.setattr(survey_cache.survey_crud, "get", fake_get)
+
+    first = await survey_cache.get_compiled_survey(None, survey.id)
+    second = await survey_cache.get_compiled_survey(None, survey.id)
+    survey_cache.invalidate_survey(survey.id)
+    await survey_cache.get_compiled_survey(None, survey.id)
+
+    assert first is second
+    assert loads == [survey.id, survey.id]